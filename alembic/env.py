@@ -17,6 +17,7 @@ from app.db.base import Base
 # Import models to ensure they are registered in metadata
 from app.db.models.user import User
 from app.db.models.flock import Flock
+from app.db.models.flock_stats import FlockStats
 from app.db.models.daily_check import DailyCheck
 from app.db.models.events import MortalityEvent, FeedConsumptionEvent, VaccinationEvent, WeightMeasurementEvent
 from app.db.models.alert import Alert
@@ -36,6 +37,7 @@ from app.db.models.farm import Farm
 from app.db.models.farm_member import FarmMember
 from app.db.models.resource import Resource
 from app.db.models.scheduled_task import ScheduledTask
+from app.db.models.sync import SyncTombstone
 from app.db.models.user_setting import UserSetting
 
 config = context.config
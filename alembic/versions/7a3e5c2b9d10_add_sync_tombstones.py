@@ -0,0 +1,88 @@
+"""add_sync_tombstones
+
+Revision ID: 7a3e5c2b9d10
+Revises: 60cf8fa5d065
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e5c2b9d10'
+down_revision = '60cf8fa5d065'
+branch_labels = None
+depends_on = None
+
+# Tables served by /data/sync whose deletes must reach offline clients
+SYNCED_TABLES = [
+    'flocks',
+    'mortality_events',
+    'feed_consumption_events',
+    'vaccination_events',
+    'weight_measurement_events',
+    'alerts',
+    'expenditures',
+    'sales',
+    'inventory_items',
+    'biosecurity_checks',
+    'vet_consultations',
+    'market_prices',
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('record_id', sa.UUID(), nullable=False),
+        sa.Column('farmer_id', sa.UUID(), nullable=True),
+        sa.Column('flock_id', sa.UUID(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_sync_tombstones')),
+    )
+    op.create_index(op.f('ix_sync_tombstones_deleted_at'), 'sync_tombstones', ['deleted_at'], unique=False)
+    op.create_index(op.f('ix_sync_tombstones_farmer_id'), 'sync_tombstones', ['farmer_id'], unique=False)
+    op.create_index(op.f('ix_sync_tombstones_flock_id'), 'sync_tombstones', ['flock_id'], unique=False)
+    op.create_index('ix_sync_tombstones_table_record', 'sync_tombstones', ['table_name', 'record_id'], unique=False)
+
+    # Owner / flock columns differ per table (alerts use user_id, market_prices
+    # has neither), so read them generically from the row as JSON.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        DECLARE
+            old_row jsonb := to_jsonb(OLD);
+        BEGIN
+            INSERT INTO sync_tombstones (id, table_name, record_id, farmer_id, flock_id, deleted_at)
+            VALUES (
+                gen_random_uuid(),
+                TG_TABLE_NAME,
+                OLD.id,
+                COALESCE(old_row->>'farmer_id', old_row->>'user_id')::uuid,
+                CASE WHEN TG_TABLE_NAME = 'flocks' THEN OLD.id
+                     ELSE (old_row->>'flock_id')::uuid END,
+                now()
+            );
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in SYNCED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_sync_tombstone
+            AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+        """)
+
+
+def downgrade() -> None:
+    for table in SYNCED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_sync_tombstone ON {table};")
+    op.execute("DROP FUNCTION IF EXISTS record_sync_tombstone();")
+    op.drop_index('ix_sync_tombstones_table_record', table_name='sync_tombstones')
+    op.drop_index(op.f('ix_sync_tombstones_flock_id'), table_name='sync_tombstones')
+    op.drop_index(op.f('ix_sync_tombstones_farmer_id'), table_name='sync_tombstones')
+    op.drop_index(op.f('ix_sync_tombstones_deleted_at'), table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,77 @@
+"""add_flock_stats
+
+Revision ID: 8b4f6d3c0e21
+Revises: 7a3e5c2b9d10
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4f6d3c0e21'
+down_revision = '7a3e5c2b9d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'flock_stats',
+        sa.Column('flock_id', sa.UUID(), nullable=False),
+        sa.Column('initial_count', sa.Integer(), nullable=False),
+        sa.Column('total_mortality', sa.Integer(), nullable=False),
+        sa.Column('total_sold', sa.Integer(), nullable=False),
+        sa.Column('current_birds', sa.Integer(), nullable=False),
+        sa.Column('total_feed_kg', sa.DECIMAL(precision=12, scale=2), nullable=False),
+        sa.Column('latest_weight_grams', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('latest_weight_date', sa.Date(), nullable=True),
+        sa.Column('fcr', sa.DECIMAL(precision=8, scale=3), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['flock_id'], ['flocks.id'], name=op.f('fk_flock_stats_flock_id_flocks'), ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('flock_id', name=op.f('pk_flock_stats')),
+    )
+
+    # Backfill existing flocks (same computation as FlockStatsService.rebuild)
+    op.execute("""
+        INSERT INTO flock_stats (
+            flock_id, initial_count, total_mortality, total_sold, current_birds,
+            total_feed_kg, latest_weight_grams, latest_weight_date, fcr, refreshed_at
+        )
+        SELECT
+            t.flock_id,
+            t.initial_count,
+            t.total_mortality,
+            t.total_sold,
+            t.initial_count - t.total_mortality - t.total_sold,
+            t.total_feed_kg,
+            t.latest_weight_grams,
+            t.latest_weight_date,
+            t.total_feed_kg / NULLIF(
+                (t.initial_count - t.total_mortality - t.total_sold) * t.latest_weight_grams / 1000, 0
+            ),
+            now()
+        FROM (
+            SELECT
+                f.id AS flock_id,
+                f.initial_count,
+                (SELECT COALESCE(SUM(m.count), 0) FROM mortality_events m WHERE m.flock_id = f.id) AS total_mortality,
+                (SELECT COALESCE(SUM(s.quantity), 0) FROM sales s WHERE s.flock_id = f.id) AS total_sold,
+                (SELECT COALESCE(SUM(fc.quantity_kg), 0) FROM feed_consumption_events fc WHERE fc.flock_id = f.id) AS total_feed_kg,
+                w.average_weight_grams AS latest_weight_grams,
+                w.event_date AS latest_weight_date
+            FROM flocks f
+            LEFT JOIN LATERAL (
+                SELECT wm.average_weight_grams, wm.event_date
+                FROM weight_measurement_events wm
+                WHERE wm.flock_id = f.id
+                ORDER BY wm.event_date DESC, wm.created_at DESC
+                LIMIT 1
+            ) w ON true
+        ) t
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('flock_stats')
@@ -1,11 +1,15 @@
+import copy
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy import select, text
+from sqlalchemy import case, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.config import settings
+from app.core.cache import TTLCache
 from app.core.security import ALGORITHM, SECRET_KEY
 from app.db.models.subscription import (PlanType, Subscription,
                                         SubscriptionStatus)
@@ -14,6 +18,48 @@ from app.db.session import get_db
 
 security = HTTPBearer()
 
+# Resolved principals keyed by the token ``sub`` claim. Each entry is a column
+# snapshot of the ``users`` row, so cache hits skip the SELECT entirely.
+_principal_cache = TTLCache(ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
+_USER_COLUMNS = User.__table__.columns.keys()
+
+
+def _snapshot_user(user: User) -> dict:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+def _restore_user(snapshot: dict) -> User:
+    """
+    Rebuild a detached User from a cached snapshot without touching the DB.
+    The instance behaves like a query-loaded row that has left its session.
+    """
+    user = User(**copy.deepcopy(snapshot))
+    make_transient_to_detached(user)
+    return user
+
+
+def _is_admin(user: User) -> bool:
+    return user.role == UserRole.ADMIN or bool(user.is_superuser)
+
+
+def invalidate_user_cache(user_id) -> None:
+    """
+    Drop the cached principal for a user.
+    Call after any write that changes role, status or profile fields.
+    """
+    _principal_cache.invalidate(str(user_id))
+
+
+async def _apply_rls_context(db: AsyncSession, user_id, is_admin: bool) -> None:
+    """Set every RLS session variable in a single round trip."""
+    await db.execute(
+        text(
+            "SELECT set_config('app.current_user_id', :uid, true), "
+            "set_config('app.is_admin', :is_admin, true)"
+        ),
+        {"uid": str(user_id), "is_admin": "true" if is_admin else "false"},
+    )
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -22,6 +68,10 @@ async def get_current_user(
     """
     Extract and validate JWT token, return current user.
     Usage: current_user: User = Depends(get_current_user)
+
+    The resolved user is cached per worker for AUTH_CACHE_TTL_SECONDS, so a
+    warm request costs one DB round trip (the RLS context) and a cold one
+    two (the SELECT, then the RLS context).
     """
     token = credentials.credentials
 
@@ -36,32 +86,36 @@ async def get_current_user(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        user_uuid = UUID(user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
 
-    # Set RLS context using parameterized query — never interpolate user-controlled
-    # values directly into SQL strings (SQL injection via SET LOCAL).
-    await db.execute(
-        text("SELECT set_config('app.current_user_id', :uid, true)"),
-        {"uid": str(user_id)},
-    )
+    snapshot = _principal_cache.get(user_id)
+    if snapshot is not None:
+        user = _restore_user(snapshot)
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
+            )
+        await _apply_rls_context(db, user_id, _is_admin(user))
+        return user
 
     # Async query
-    result = await db.execute(select(User).filter(User.id == UUID(user_id)))
+    result = await db.execute(select(User).filter(User.id == user_uuid))
     user = result.scalars().first()
 
     if user is None:
         raise credentials_exception
 
+    _principal_cache.set(user_id, _snapshot_user(user))
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
         )
 
-    # Also set admin flag if applicable for global bypass policies
-    if user.role == UserRole.ADMIN or user.is_superuser:
-        await db.execute(text("SELECT set_config('app.is_admin', 'true', true)"))
-
+    # User id and admin flag (for global bypass policies) in one statement
+    await _apply_rls_context(db, user_id, _is_admin(user))
     return user
 
 
@@ -71,12 +125,7 @@ async def set_tenant_context(db: AsyncSession, user: User):
     Call this after getting current_user in protected routes or
     during initial authentication lookups.
     """
-    await db.execute(
-        text("SELECT set_config('app.current_user_id', :uid, true)"),
-        {"uid": str(user.id)},
-    )
-    if user.role == UserRole.ADMIN or user.is_superuser:
-        await db.execute(text("SELECT set_config('app.is_admin', 'true', true)"))
+    await _apply_rls_context(db, user.id, _is_admin(user))
 
 
 async def set_rls_bypass(db: AsyncSession):
@@ -146,47 +195,79 @@ def get_current_non_viewer(
     return current_user
 
 
+# Effective plan type per user id. Filled by ``get_effective_plan`` and
+# cleared by billing / membership writes via ``invalidate_plan_cache``.
+_plan_cache = TTLCache(ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS)
+
+
+def invalidate_plan_cache(user_id=None) -> None:
+    """
+    Drop the cached plan for one user, or for every user when ``user_id`` is None.
+
+    A change to an owner's subscription also changes what their farm members
+    inherit, so subscription writes clear the whole cache; membership writes
+    only need to drop the affected member.
+    """
+    if user_id is None:
+        _plan_cache.clear()
+    else:
+        _plan_cache.invalidate(str(user_id))
+
+
+def get_cached_plan(user_id) -> str | None:
+    """This worker's cached plan for a user, or None (never hits the DB)."""
+    return _plan_cache.get(str(user_id))
+
+
 async def _get_effective_subscription(
     db: AsyncSession, user: User
 ) -> Subscription | None:
     """
     Looks up an active subscription for the user directly, or via Farm membership
     if they are a Manager/Viewer on a Farm owned by a subscriber.
+
+    Resolved in a single query: the user's own subscription wins over one
+    inherited from the owner of a farm they are a member of.
     """
     from app.db.models.farm import Farm
     from app.db.models.farm_member import FarmMember
 
-    # 1. Direct Ownership Lookup (e.g. Farmer)
+    owner_ids = (
+        select(Farm.owner_id)
+        .join(FarmMember, FarmMember.farm_id == Farm.id)
+        .where(FarmMember.user_id == user.id)
+    )
     result = await db.execute(
-        select(Subscription).filter(
-            Subscription.user_id == user.id,
+        select(Subscription)
+        .filter(
             Subscription.status == SubscriptionStatus.ACTIVE,
+            or_(Subscription.user_id == user.id, Subscription.user_id.in_(owner_ids)),
         )
+        .order_by(case((Subscription.user_id == user.id, 0), else_=1))
+        .limit(1)
     )
-    sub = result.scalars().first()
-    if sub:
-        return sub
+    return result.scalars().first()
 
-    # 2. Member Inheritance Lookup (e.g. Manager/Viewer)
-    member_result = await db.execute(
-        select(FarmMember).where(FarmMember.user_id == user.id)
-    )
-    membership = member_result.scalars().first()
-    if membership:
-        farm_result = await db.execute(
-            select(Farm).where(Farm.id == membership.farm_id)
-        )
-        farm = farm_result.scalar_one_or_none()
-        if farm:
-            owner_sub_result = await db.execute(
-                select(Subscription).filter(
-                    Subscription.user_id == farm.owner_id,
-                    Subscription.status == SubscriptionStatus.ACTIVE,
-                )
-            )
-            return owner_sub_result.scalars().first()
 
-    return None
+async def get_effective_plan(db: AsyncSession, user: User) -> str:
+    """
+    Returns the effective PlanType for a user, served from a per-worker cache
+    for PLAN_CACHE_TTL_SECONDS.
+
+    Admins and superusers are always ENTERPRISE (no DB hit needed).
+    """
+    if user.role == UserRole.ADMIN or user.is_superuser:
+        return PlanType.ENTERPRISE
+
+    cache_key = str(user.id)
+    plan = _plan_cache.get(cache_key)
+    if plan is not None:
+        return plan
+
+    sub = await _get_effective_subscription(db, user)
+    plan = sub.plan_type if sub else PlanType.STARTER
+    _plan_cache.set(cache_key, plan)
+    return plan
 
 
 async def check_professional_subscription(
@@ -201,9 +282,9 @@ async def check_professional_subscription(
     if current_user.role == UserRole.ADMIN or current_user.is_superuser:
         return True
 
-    sub = await _get_effective_subscription(db, current_user)
+    plan = await get_effective_plan(db, current_user)
 
-    if not sub or sub.plan_type == PlanType.STARTER:
+    if plan == PlanType.STARTER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="This feature requires a Professional Plan subscription on the Farm Account.",
@@ -224,9 +305,9 @@ async def check_enterprise_subscription(
     if current_user.role == UserRole.ADMIN or current_user.is_superuser:
         return True
 
-    sub = await _get_effective_subscription(db, current_user)
+    plan = await get_effective_plan(db, current_user)
 
-    if not sub or sub.plan_type != PlanType.ENTERPRISE:
+    if plan != PlanType.ENTERPRISE:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="This feature requires an Enterprise Plan subscription on the Farm Account.",
@@ -257,10 +338,4 @@ async def get_plan_type(
             if plan == PlanType.STARTER:
                 raise HTTPException(403, detail="Requires Professional Plan")
     """
-    # PlanType, Subscription, SubscriptionStatus are already imported at the top
-
-    if current_user.role == UserRole.ADMIN or current_user.is_superuser:
-        return PlanType.ENTERPRISE
-
-    sub = await _get_effective_subscription(db, current_user)
-    return sub.plan_type if sub else PlanType.STARTER
+    return await get_effective_plan(db, current_user)
@@ -0,0 +1,194 @@
+"""
+Redis token-bucket rate limiting for expensive endpoints.
+
+``RateLimit`` is a FastAPI dependency. Use it as a route or router
+``dependencies=[...]`` entry so it is solved before ``get_current_user``:
+it identifies the caller from the bearer token alone (or the client IP when
+there is none) and rejects with 429 before the request takes a pooled DB
+connection. Each check is one Lua script call.
+
+Anonymous callers are identified by ``client_ip``: behind TRUSTED_PROXY_HOPS
+proxies it is the X-Forwarded-For entry the outermost of them appended, never
+the client-supplied entries to its left, so a caller cannot pick its bucket.
+
+Buckets are per scope and caller. Authenticated callers get
+``per_minute`` scaled by their plan (PLAN_MULTIPLIERS); the plan comes from
+the per-worker plan cache, falling back to STARTER when it is cold.
+"""
+import logging
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, status
+from jose import JWTError, jwt
+from redis.exceptions import RedisError
+
+from app.api.deps import get_cached_plan
+from app.config import settings
+from app.core.redis_client import get_redis
+from app.core.security import ALGORITHM, SECRET_KEY
+from app.db.models.subscription import PlanType
+
+logger = logging.getLogger(__name__)
+
+PLAN_MULTIPLIERS = {
+    PlanType.STARTER: 1,
+    PlanType.PROFESSIONAL: 3,
+    PlanType.ENTERPRISE: 10,
+}
+
+# KEYS: bucket hash; ARGV: capacity, refill tokens per ms, tokens to take.
+# Returns {allowed, retry_after_ms, tokens_left}. Uses the server clock so all
+# workers agree on elapsed time.
+_TAKE_TOKEN = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed, retry_after = 0, 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_after, math.floor(tokens)}
+"""
+
+
+def _bearer_subject(request: Request) -> Optional[str]:
+    """User id from a valid bearer token, without touching the DB."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+def client_ip(request: Request) -> str:
+    """The caller's address as seen by the outermost trusted proxy."""
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [
+            host.strip()
+            for header in request.headers.getlist("X-Forwarded-For")
+            for host in header.split(",")
+            if host.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """
+    Allow ``per_minute`` requests per caller for ``scope`` (bursts up to the
+    same number), scaled by plan for authenticated callers.
+
+    Example::
+
+        @router.post("/login", dependencies=[Depends(RateLimit("login", 10))])
+
+    ``body_field`` also keys anonymous callers on that field of the JSON body
+    (e.g. the login email), so users sharing an IP, such as behind a carrier
+    NAT, do not share one bucket. Pair it with a plain per-IP limit, or one
+    address can try unlimited values.
+
+    ``cost_field`` charges one token per element of that list field of the
+    JSON body (e.g. the ``items`` of a batch request), and one for requests
+    without it. A request costing more than the caller's whole per-minute
+    allowance is rejected outright.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        per_minute: int,
+        by_plan: bool = True,
+        body_field: Optional[str] = None,
+        cost_field: Optional[str] = None,
+    ):
+        self.scope = scope
+        self.per_minute = per_minute
+        self.by_plan = by_plan
+        self.body_field = body_field
+        self.cost_field = cost_field
+        self._script = None
+
+    @staticmethod
+    async def _json_field(request: Request, name: str) -> Any:
+        """A top-level field of a JSON body (cached by Starlette for the route)."""
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            return None  # uploads: never buffer a file just to look for a field
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        return body.get(name) if isinstance(body, dict) else None
+
+    async def _body_value(self, request: Request) -> str:
+        value = await self._json_field(request, self.body_field)
+        return str(value).strip().lower()[:254] if value else ""
+
+    async def _cost(self, request: Request) -> int:
+        if not self.cost_field:
+            return 1
+        value = await self._json_field(request, self.cost_field)
+        return max(1, len(value)) if isinstance(value, list) else 1
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED or self.per_minute <= 0:
+            return
+
+        user_id = _bearer_subject(request)
+        if user_id:
+            caller = f"user:{user_id}"
+            plan = get_cached_plan(user_id) or PlanType.STARTER
+        else:
+            caller = f"ip:{client_ip(request)}"
+            if self.body_field:
+                caller += f":{await self._body_value(request)}"
+            plan = PlanType.STARTER
+        capacity = self.per_minute * (PLAN_MULTIPLIERS[plan] if self.by_plan else 1)
+        cost = await self._cost(request)
+        if cost > capacity:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=(
+                    f"This request counts as {cost} requests, more than your "
+                    f"limit of {capacity} per minute. Send fewer items at once."
+                ),
+                headers={"X-RateLimit-Limit": str(capacity)},
+            )
+
+        if self._script is None:
+            self._script = get_redis().register_script(_TAKE_TOKEN)
+        try:
+            allowed, retry_after_ms, remaining = await self._script(
+                keys=[f"rate_limit:{self.scope}:{caller}"],
+                args=[capacity, capacity / 60000, cost],
+            )
+        except RedisError as e:
+            # Fail open: losing Redis must not take the endpoints down with it
+            logger.warning(f"Rate limiter unavailable for {self.scope}: {e}")
+            return
+
+        if not allowed:
+            retry_after = max(1, -(-retry_after_ms // 1000))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded. Try again in {retry_after} seconds.",
+                headers={
+                    "Retry-After": str(retry_after),
+                    "X-RateLimit-Limit": str(capacity),
+                    "X-RateLimit-Remaining": str(remaining),
+                },
+            )
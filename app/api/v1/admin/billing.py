@@ -10,7 +10,8 @@ from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from app.api.deps import get_current_admin_user, get_db
+from app.api.deps import (get_current_admin_user, get_db,
+                          invalidate_plan_cache)
 from app.db.models.subscription import (Subscription,
                                         SubscriptionPlan, SubscriptionStatus)
 from app.db.models.user import User
@@ -100,6 +101,7 @@ async def update_user_subscription(
 
     await db.commit()
     await db.refresh(sub)
+    invalidate_plan_cache()
 
     await log_action(
         db=db,
@@ -144,6 +146,7 @@ async def assign_user_plan(
     )
     db.add(new_sub)
     await db.commit()
+    invalidate_plan_cache()
     return {"status": "success", "message": f"Assigned {payload.plan_type} to user"}
 
 
@@ -161,6 +164,7 @@ async def cancel_subscription(
     sub.status = SubscriptionStatus.CANCELLED
     sub.end_date = datetime.now(timezone.utc)
     await db.commit()
+    invalidate_plan_cache()
     return {"status": "success", "message": "Subscription cancelled"}
 
 
@@ -9,11 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.api.deps import get_current_admin_user, get_db
+from app.core.http_client import http_client_stats
 from app.db.models.audit import AuditLog
 from app.db.models.config import SystemConfig
 from app.db.models.user import User
 from app.schemas.audit import AuditLogResponse
 from app.schemas.config import (SystemConfigCreate, SystemConfigResponse)
+from app.services.ai.cache import ai_cache
 from app.services.audit_service import log_action
 
 router = APIRouter()
@@ -28,6 +30,28 @@ class PaginatedResponse(BaseModel, Generic[T]):
     current_page: int
 
 
+# ── Outbound HTTP ────────────────────────────────────────────────────────────
+
+
+@router.get("/http-clients")
+async def get_http_client_stats(
+    current_admin: User = Depends(get_current_admin_user),
+):
+    """Outbound HTTP requests and connection reuse per upstream host (Admin only)."""
+    return http_client_stats()
+
+
+# ── AI Cache ─────────────────────────────────────────────────────────────────
+
+
+@router.get("/ai-cache")
+async def get_ai_cache_stats(
+    current_admin: User = Depends(get_current_admin_user),
+):
+    """AI response cache hits, misses and hit ratio per endpoint (Admin only)."""
+    return await ai_cache.stats()
+
+
 # ── System Config ────────────────────────────────────────────────────────────
 
 _DEFAULT_CONFIGS = {
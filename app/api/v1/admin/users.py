@@ -7,7 +7,7 @@ from pydantic import BaseModel
 from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_admin_user, get_db
+from app.api.deps import get_current_admin_user, get_db, invalidate_user_cache
 from app.db.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 from app.services.audit_service import log_action
@@ -74,6 +74,7 @@ async def update_user_status(
 
     await db.commit()
     await db.refresh(user)
+    invalidate_user_cache(user.id)
 
     await log_action(
         db=db,
@@ -103,6 +104,7 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    invalidate_user_cache(user_id)
 
     await log_action(
         db=db,
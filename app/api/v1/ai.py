@@ -1,12 +1,18 @@
 import json
-from typing import Any
-
-from fastapi import APIRouter, Depends, HTTPException
-
-from app.api.deps import get_current_user
-from app.schemas.ai import (ChatRequest, ChatResponse, DiseaseRiskRequest,
-                            DiseaseRiskResponse, FcrInsightsRequest,
-                            FcrInsightsResponse, FeedRecommendationRequest,
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.api.deps import get_current_user, get_plan_type
+from app.api.rate_limit import RateLimit
+from app.config import settings
+from app.schemas.ai import (BatchAdvisoryRequest, ChatRequest, ChatResponse,
+                            DiseaseRiskRequest, DiseaseRiskResponse,
+                            FcrInsightsRequest, FcrInsightsResponse,
+                            FeedRecommendationRequest,
                             FeedRecommendationResponse,
                             HarvestOptimizationRequest,
                             HarvestOptimizationResponse,
@@ -15,50 +21,238 @@ from app.schemas.ai import (ChatRequest, ChatResponse, DiseaseRiskRequest,
                             MortalityAnalysisRequest,
                             MortalityAnalysisResponse,
                             VoiceObservationResponse)
+from app.services.ai import engine
+from app.services.ai.base import AIProvider
+from app.services.ai.batch import BatchResult, advise_many
+from app.services.ai.cache import ai_cache
 from app.services.ai.factory import get_ai_provider
+from app.services.ai.prompts import PROMPTS
+from app.services.ai.streaming import JSONStringFieldReader, sse_event
+
+logger = logging.getLogger(__name__)
+
+# The limiter runs first, before any DB work; get_plan_type then keeps the
+# plan cache warm so the limiter can apply the caller's plan quota.
+router = APIRouter(
+    dependencies=[
+        Depends(
+            RateLimit("ai", settings.RATE_LIMIT_AI_PER_MINUTE, cost_field="items")
+        ),
+        Depends(get_plan_type),
+    ]
+)
+
+
+async def _advise(
+    endpoint: str,
+    provider: AIProvider,
+    payload: BaseModel,
+    image_base64: Optional[str] = None,
+    **fields: Any,
+):
+    """
+    Answer ``endpoint`` for ``payload`` from its registered prompt, through
+    the AI response cache. ``fields`` are the user-section values the
+    template needs besides ``payload``; ``figures``, if given, is also part
+    of the cache key.
+    """
+    prompt = PROMPTS[endpoint]
+    return await ai_cache.get_or_generate(
+        endpoint,
+        provider,
+        payload,
+        prompt.response_model,
+        lambda: provider.generate_structured_response(
+            prompt.system_prompt,
+            prompt.render(payload=payload, **fields),
+            prompt.json_schema,
+            image_base64=image_base64,
+            cache_key=prompt.cache_key,
+        ),
+        version=prompt.version,
+        context=fields.get("figures", ""),
+    )
+
+
+def _local_answer(endpoint: str, payload: BaseModel) -> BaseModel:
+    try:
+        return engine.LOCAL_ANSWERS[endpoint].compute(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def _advise_locally(
+    endpoint: str, provider: AIProvider, payload: BaseModel, fast: bool, **fields: Any
+):
+    """
+    Compute ``endpoint``'s figures with the local engine and ask the LLM only
+    for the narrative around them. In fast mode, with no provider configured,
+    or when the provider fails, the engine's own answer is served.
+    """
+    local = _local_answer(endpoint, payload)
+    if fast or not settings.LLM_API_KEY:
+        return local
+    try:
+        answer = await _advise(
+            endpoint,
+            provider,
+            payload,
+            figures=engine.figures(endpoint, local),
+            **fields,
+        )
+    except Exception as e:
+        logger.warning(f"{endpoint}: AI provider failed, serving local answer: {e}")
+        return local
+    return engine.merge(endpoint, local, answer)
 
-router = APIRouter()
+
+def _fcr_fields(payload: FcrInsightsRequest) -> Dict[str, Any]:
+    total_estimated_mass = payload.current_avg_weight_kg * payload.current_bird_count
+    return {"total_estimated_mass": round(total_estimated_mass, 2)}
+
+
+# Streams (SSE and NDJSON batches) are sent unbuffered: "identity" also makes
+# GZipMiddleware pass the body through instead of compressing it to the end
+_STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Content-Encoding": "identity",
+    "X-Accel-Buffering": "no",
+}
+
+
+def _stream_batch(
+    endpoint: str,
+    items: List[BaseModel],
+    fields: Optional[Callable[[Any], Dict[str, Any]]] = None,
+    fast: bool = False,
+) -> StreamingResponse:
+    if len(items) > settings.AI_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.AI_BATCH_MAX_ITEMS} items per batch",
+        )
+    if endpoint not in engine.LOCAL_ANSWERS:
+        results = advise_many(endpoint, get_ai_provider(), items, fields)
+
+        async def body():
+            async for result in results:
+                yield result.to_json() + "\n"
+
+        return StreamingResponse(
+            body(), media_type="application/x-ndjson", headers=_STREAM_HEADERS
+        )
+
+    # Figures come from the local engine, as in _advise_locally; an item it
+    # cannot answer gets an error line instead of failing the whole batch
+    compute = engine.LOCAL_ANSWERS[endpoint].compute
+    local: Dict[int, BaseModel] = {}
+    errors: List[BatchResult] = []
+    for index, item in enumerate(items):
+        try:
+            local[index] = compute(item)
+        except ValueError as e:
+            errors.append(BatchResult(index, error=str(e)))
+    answerable = list(local)
+
+    def prompt_fields(item: BaseModel) -> Dict[str, Any]:
+        return {
+            **(fields(item) if fields else {}),
+            "figures": engine.figures(endpoint, compute(item)),
+        }
+
+    async def body():
+        for error in errors:
+            yield error.to_json() + "\n"
+        if fast or not settings.LLM_API_KEY:
+            for index, answer in local.items():
+                yield BatchResult(index, answer).to_json() + "\n"
+            return
+        async for result in advise_many(
+            endpoint,
+            get_ai_provider(),
+            [items[index] for index in answerable],
+            prompt_fields,
+        ):
+            index = answerable[result.index]
+            answer = local[index]
+            if result.error is None:
+                answer = engine.merge(endpoint, answer, result.result)
+            merged = BatchResult(index, answer, cached=result.cached)
+            yield merged.to_json() + "\n"
+
+    return StreamingResponse(
+        body(), media_type="application/x-ndjson", headers=_STREAM_HEADERS
+    )
+
+
+async def _chat_events(provider: AIProvider, user_prompt: str):
+    """
+    Relay the streamed chat answer as SSE. A client disconnect cancels this
+    generator, which closes the upstream stream.
+    """
+    prompt = PROMPTS["chat"]
+    reader = JSONStringFieldReader("response")
+    try:
+        async for chunk in provider.stream_structured_response(
+            prompt.system_prompt,
+            user_prompt,
+            prompt.json_schema,
+            cache_key=prompt.cache_key,
+        ):
+            text = reader.feed(chunk)
+            if text:
+                yield sse_event("token", json.dumps({"text": text}))
+        answer = ChatResponse.model_validate_json(reader.buffer)
+    except Exception as e:
+        yield sse_event("error", json.dumps({"detail": str(e)}))
+        return
+    yield sse_event("done", answer.model_dump_json())
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def get_ai_chat(
-    payload: ChatRequest, current_user: Any = Depends(get_current_user)
+    payload: ChatRequest,
+    stream: bool = False,
+    current_user: Any = Depends(get_current_user),
 ):
     """
     6. General Conversational Advice
     Safety conversational buffer housing East-African contextual memory buffers.
+
+    With ``?stream=true`` the answer is sent as server-sent events: ``token``
+    events ({"text": ...}) carry the ``response`` text as it is generated,
+    then one ``done`` event carries the validated ChatResponse, or an
+    ``error`` event ({"detail": ...}) if the answer was not valid.
     """
     provider = get_ai_provider()
-    system_prompt = """
-You are a helpful East African poultry farming expert.
-Provide safe, practical advice for raising broilers securely.
-Return response STRICTLY as a JSON object matching the requested schema.
-"""
-    user_prompt = payload.message
+    prompt = PROMPTS["chat"]
+    message = payload.message
     if payload.history:
         # Optionally inject history into prompt context for memory buffering
         hist_str = "\n".join(
             [f"{h.role.upper()}: {h.content}" for h in payload.history]
         )
-        user_prompt = f"Chat History:\n{hist_str}\n\nUser: {payload.message}"
+        message = f"Chat History:\n{hist_str}\n\nUser: {payload.message}"
 
-    expected_schema = ChatResponse.model_json_schema()
-    system_prompt += (
-        f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(expected_schema, indent=2)}"
-    )
+    if stream:
+        return StreamingResponse(
+            _chat_events(provider, prompt.render(message=message)),
+            media_type="text/event-stream",
+            headers=_STREAM_HEADERS,
+        )
 
     try:
         raw_json = await provider.generate_structured_response(
-            system_prompt, user_prompt, expected_schema
+            prompt.system_prompt,
+            prompt.render(message=message),
+            prompt.json_schema,
+            cache_key=prompt.cache_key,
         )
         return ChatResponse(**raw_json)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-from fastapi import File, UploadFile
-
-
 @router.post("/feed-recommendation", response_model=FeedRecommendationResponse)
 async def get_feed_recommendation(
     payload: FeedRecommendationRequest, current_user: Any = Depends(get_current_user)
@@ -69,41 +263,9 @@ async def get_feed_recommendation(
     """
     provider = get_ai_provider()
 
-    system_prompt = """
-You are an expert East African poultry farming AI assistant specialized in broiler management.
-Given the following flock data, calculate the optimal daily feed requirement in kilograms for the entire flock.
-Compare the current average weight against standard growth curves for the provided breed.
-If the current weight implies significant underfeeding or overfeeding, flag it.
-Return your response STRICTLY as a JSON object matching the requested schema exactly.
-"""
-
-    user_prompt = f"""
-Flock Parameters:
-- Age: {payload.flock_age_days} days
-- Current Avg Weight: {payload.current_avg_weight_kg} kg
-- Breed: {payload.breed}
-- Total Birds: {payload.bird_count}
-
-Please analyze and generate the optimal daily feed in kilograms.
-"""
-
-    # The schema constraint for OpenAI's json_object parser
-    expected_schema = FeedRecommendationResponse.model_json_schema()
-
-    system_prompt += (
-        f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(expected_schema, indent=2)}"
-    )
-
     try:
-        raw_json = await provider.generate_structured_response(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            json_schema=expected_schema,
-        )
-
-        # Pydantic automatic validation and conversion from the dictionary return
-        return FeedRecommendationResponse(**raw_json)
-
+        # Pydantic validates the provider's dictionary into the response model
+        return await _advise("feed-recommendation", provider, payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Integration Error: {str(e)}")
 
@@ -117,79 +279,31 @@ async def get_mortality_analysis(
     Analyzes bird mortality logs to flag potential anomalies or risk vectors (e.g., thermal shock, disease).
     """
     provider = get_ai_provider()
-
-    system_prompt = """
-You are an expert East African poultry farming AI assistant specialized in mortality diagnostics for broilers.
-Given the following daily mortality logs and flock state, analyze the cumulative and daily mortality rate.
-Compare against acceptable broiler industry benchmarks (e.g. cumulative < 5% by day 42, daily spikes < 0.1%).
-Identify any potential disease triggers, thermal shock risks, or management errors based on given causes.
-Flag it if a threshold was exceeded.
-Return your response STRICTLY as a JSON object matching the requested schema exactly.
-"""
-
-    user_prompt = f"""
-Flock State:
-- Breed: {payload.breed}
-- Initial Birds: {payload.initial_bird_count}
-- Current Birds: {payload.current_bird_count}
-
-Recent Daily Mortality Logs:
-{json.dumps([m.model_dump() for m in payload.recent_mortality], indent=2)}
-
-Please analyze the spikes and generate a structured analytics report.
-"""
-
-    expected_schema = MortalityAnalysisResponse.model_json_schema()
-
-    system_prompt += (
-        f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(expected_schema, indent=2)}"
+    mortality_log = json.dumps(
+        [m.model_dump() for m in payload.recent_mortality], indent=2
     )
 
     try:
-        raw_json = await provider.generate_structured_response(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            json_schema=expected_schema,
+        return await _advise(
+            "mortality-analysis", provider, payload, mortality_log=mortality_log
         )
-        return MortalityAnalysisResponse(**raw_json)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Integration Error: {str(e)}")
 
 
 @router.post("/harvest-prediction", response_model=HarvestPredictionResponse)
 async def get_harvest_prediction(
-    payload: HarvestPredictionRequest, current_user: Any = Depends(get_current_user)
+    payload: HarvestPredictionRequest,
+    fast: bool = False,
+    current_user: Any = Depends(get_current_user),
 ):
     """
     3. Harvest Readiness Prediction
     Estimates remaining days to target weights basing off breed growth curves.
+    Figures come from the local engine; ``fast`` skips the LLM narrative.
     """
     provider = get_ai_provider()
-    system_prompt = """
-You are an expert East African poultry farming AI assistant.
-Compare the flock's current average weight against the target weight for the provided breed.
-Calculate days remaining to target based on standard daily weight gain metrics (g/day) for this lifecycle stage.
-Return response STRICTLY as a JSON object matching the requested schema.
-"""
-    user_prompt = f"""
-Flock State:
-- Breed: {payload.breed}
-- Age: {payload.flock_age_days} days
-- Current Weight: {payload.current_avg_weight_kg} kg
-- Target Weight: {payload.target_weight_kg} kg
-"""
-    expected_schema = HarvestPredictionResponse.model_json_schema()
-    system_prompt += (
-        f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(expected_schema, indent=2)}"
-    )
-
-    try:
-        raw_json = await provider.generate_structured_response(
-            system_prompt, user_prompt, expected_schema
-        )
-        return HarvestPredictionResponse(**raw_json)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _advise_locally("harvest-prediction", provider, payload, fast)
 
 
 @router.post("/disease-risk", response_model=DiseaseRiskResponse)
@@ -201,75 +315,36 @@ async def detect_disease_risk(
     Correlates symptoms and missed vaccines to flag potential outbreaks.
     """
     provider = get_ai_provider()
-    system_prompt = """
-You are an expert East African poultry vet AI assistant.
-Analyze observed symptoms against common East African broiler diseases (NDV, IBD, Coccidiosis).
-Evaluate risk level mapping vaccines reported.
-Return response STRICTLY as a JSON object matching the requested schema.
-"""
-    user_prompt = f"""
-Diagnostics:
-- Symptoms: {", ".join(payload.symptoms)}
-- Recent Vaccinations: {", ".join(payload.recent_vaccinations)}
-- Mortality Risk: {payload.mortality_alert_level}
-"""
-    expected_schema = DiseaseRiskResponse.model_json_schema()
-    system_prompt += (
-        f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(expected_schema, indent=2)}"
-    )
 
     try:
-        raw_json = await provider.generate_structured_response(
-            system_prompt,
-            user_prompt,
-            expected_schema,
+        return await _advise(
+            "disease-risk",
+            provider,
+            payload,
             image_base64=payload.image_base64,
+            symptoms=", ".join(payload.symptoms),
+            vaccinations=", ".join(payload.recent_vaccinations),
         )
-        return DiseaseRiskResponse(**raw_json)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/fcr-insights", response_model=FcrInsightsResponse)
 async def get_fcr_insights(
-    payload: FcrInsightsRequest, current_user: Any = Depends(get_current_user)
+    payload: FcrInsightsRequest,
+    fast: bool = False,
+    current_user: Any = Depends(get_current_user),
 ):
     """
     5. Feed Conversion Ratio Insights
     Tracks feed waste analytics and yields optimal profitability feedback lists.
+    Figures come from the local engine; ``fast`` skips the LLM narrative.
     """
     provider = get_ai_provider()
-    system_prompt = """
-You are an expert East African poultry economics AI assistant.
-Calculate the FCR = (Total Feed Consumed / Total Weight of current flock).
-State whether FCR is EXCELLENT (<1.6), GOOD (1.6-1.9), or POOR (>1.9).
-Explain cost impact scaling.
-Return response STRICTLY as a JSON object matching the requested schema.
-"""
-    total_estimated_mass = payload.current_avg_weight_kg * payload.current_bird_count
-    user_prompt = f"""
-Stats:
-- Total Feed Consumed: {payload.total_feed_consumed_kg} kg
-- Total Flock Mass (est): {total_estimated_mass} kg ({payload.current_avg_weight_kg}kg * {payload.current_bird_count} birds)
-"""
-    expected_schema = FcrInsightsResponse.model_json_schema()
-    system_prompt += (
-        f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(expected_schema, indent=2)}"
+    return await _advise_locally(
+        "fcr-insights", provider, payload, fast, **_fcr_fields(payload)
     )
 
-    try:
-        raw_json = await provider.generate_structured_response(
-            system_prompt, user_prompt, expected_schema
-        )
-        return FcrInsightsResponse(**raw_json)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-
-
-# ... imports continued
-
 
 @router.post("/voice-record", response_model=VoiceObservationResponse)
 async def process_voice_record(
@@ -280,24 +355,19 @@ async def process_voice_record(
     Transcribes audio and extracts structured farm observations.
     """
     provider = get_ai_provider()
+    prompt = PROMPTS["voice-record"]
     audio_bytes = await file.read()
 
     # 1. Transcribe
     transcript = await provider.transcribe_audio(audio_bytes, file.filename)
 
     # 2. Extract Structure
-    system_prompt = """
-You are an expert East African poultry management assistant.
-Extract structured observations from the following transcript.
-Look for: mortality counts, bird symptoms, mentioned equipment, or feed issues.
-Return response STRICTLY as a JSON object matching the requested schema.
-"""
-    user_prompt = f"Transcript: {transcript}"
-    expected_schema = VoiceObservationResponse.model_json_schema()
-
     try:
         raw_json = await provider.generate_structured_response(
-            system_prompt, user_prompt, expected_schema
+            prompt.system_prompt,
+            prompt.render(transcript=transcript),
+            prompt.json_schema,
+            cache_key=prompt.cache_key,
         )
         # Ensure transcript is included in response
         raw_json["transcript"] = transcript
@@ -308,36 +378,48 @@ Return response STRICTLY as a JSON object matching the requested schema.
 
 @router.post("/harvest-optimization", response_model=HarvestOptimizationResponse)
 async def get_harvest_optimization(
-    payload: HarvestOptimizationRequest, current_user: Any = Depends(get_current_user)
+    payload: HarvestOptimizationRequest,
+    fast: bool = False,
+    current_user: Any = Depends(get_current_user),
 ):
     """
     8. Predictive Harvest Profit-Maximizer
     Calculates the best day to sell birds based on FCR, feed cost, and market weight.
+    Figures come from the local engine; ``fast`` skips the LLM narrative.
     """
     provider = get_ai_provider()
-    system_prompt = """
-You are an expert East African poultry economist.
-Analyze the provided flock data and market prices.
-Predict the optimal harvest date (in days of age) where profit is maximized.
-Profit = (Weight * Price) - (Feed Consumed * Feed Cost) - Other Costs.
-Note that FCR increases and growth rate slows as birds age past 42 days.
-Return response STRICTLY as a JSON object matching the requested schema.
-"""
-    user_prompt = f"""
-Flock Data:
-- ID: {payload.flock_id}
-- Age: {payload.current_age_days} days
-- Weight: {payload.current_avg_weight_kg} kg
-- Breed: {payload.breed}
-- Feed Cost: {payload.feed_cost_per_kg} KES/kg
-- Expected Bird Price: {payload.expected_sale_price_per_kg} KES/kg
-"""
-    expected_schema = HarvestOptimizationResponse.model_json_schema()
+    return await _advise_locally("harvest-optimization", provider, payload, fast)
 
-    try:
-        raw_json = await provider.generate_structured_response(
-            system_prompt, user_prompt, expected_schema
-        )
-        return HarvestOptimizationResponse(**raw_json)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Optimization Error: {str(e)}")
+
+# Batch variants: one NDJSON line per flock as soon as its answer is ready,
+# {"index": <position in items>, "result": {...} | null, "error": str | null,
+#  "cached": bool}.
+
+
+@router.post("/batch/feed-recommendation")
+async def batch_feed_recommendation(
+    payload: BatchAdvisoryRequest[FeedRecommendationRequest],
+    current_user: Any = Depends(get_current_user),
+):
+    """Feed recommendations for many flocks, streamed as they complete."""
+    return _stream_batch("feed-recommendation", payload.items)
+
+
+@router.post("/batch/harvest-prediction")
+async def batch_harvest_prediction(
+    payload: BatchAdvisoryRequest[HarvestPredictionRequest],
+    fast: bool = False,
+    current_user: Any = Depends(get_current_user),
+):
+    """Harvest readiness for many flocks, streamed as they complete."""
+    return _stream_batch("harvest-prediction", payload.items, fast=fast)
+
+
+@router.post("/batch/fcr-insights")
+async def batch_fcr_insights(
+    payload: BatchAdvisoryRequest[FcrInsightsRequest],
+    fast: bool = False,
+    current_user: Any = Depends(get_current_user),
+):
+    """FCR insights for many flocks, streamed as they complete."""
+    return _stream_batch("fcr-insights", payload.items, _fcr_fields, fast)
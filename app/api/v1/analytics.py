@@ -1,13 +1,12 @@
-import csv
-import io
-from typing import Any, Dict, List
+from datetime import date
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import (get_current_user, get_db, get_plan_type)
+from app.core.export import EXPORT_FORMATS, date_window, streaming_export
 from app.db.models.finance import Expenditure, Sale
 from app.db.models.flock import Flock
 from app.db.models.inventory import InventoryItem
@@ -72,69 +71,117 @@ async def get_revenue_expenses_chart(
 @router.get("/reports/export")
 async def export_report(
     report_type: str = Query(..., pattern="^(financial|inventory|production)$"),
-    file_format: str = Query("csv", pattern="^csv$"),
+    file_format: str = Query("csv", pattern=EXPORT_FORMATS),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     current_plan: str = Depends(get_plan_type),
 ):
     """
-    Export data as CSV. Requires Professional Plan.
+    Export data as CSV or NDJSON. Requires Professional Plan.
+
+    Rows are streamed from the database. ``start_date``/``end_date`` (inclusive)
+    slice financial rows by date and production rows by flock start date.
     """
     if current_plan == PlanType.STARTER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Exporting reports requires a Professional Plan subscription.",
         )
-    output = io.StringIO()
-    writer = csv.writer(output)
 
     if report_type == "financial":
-        writer.writerow(["Date", "Type", "Category/Item", "Amount", "Description"])
-
-        # Sales
-        sales_res = await db.execute(
-            select(Sale).filter(Sale.farmer_id == current_user.id)
-        )
-        sales = sales_res.scalars().all()
-        for s in sales:
-            writer.writerow(
-                [s.date, "Income", "Chicken Sales", s.total_amount, s.notes or ""]
-            )
-
-        # Expenses
-        expenses_res = await db.execute(
-            select(Expenditure).filter(Expenditure.farmer_id == current_user.id)
-        )
-        expenses = expenses_res.scalars().all()
-        for e in expenses:
-            writer.writerow([e.date, "Expense", e.category, e.amount, e.description])
+        fields = [
+            ("date", "Date"),
+            ("type", "Type"),
+            ("category", "Category/Item"),
+            ("amount", "Amount"),
+            ("description", "Description"),
+        ]
+        queries = [
+            # Sales
+            (
+                date_window(
+                    select(Sale.date, Sale.total_amount, Sale.notes).filter(
+                        Sale.farmer_id == current_user.id
+                    ),
+                    Sale.date,
+                    start_date,
+                    end_date,
+                ),
+                lambda s: [
+                    s.date,
+                    "Income",
+                    "Chicken Sales",
+                    s.total_amount,
+                    s.notes or "",
+                ],
+            ),
+            # Expenses
+            (
+                date_window(
+                    select(
+                        Expenditure.date,
+                        Expenditure.category,
+                        Expenditure.amount,
+                        Expenditure.description,
+                    ).filter(Expenditure.farmer_id == current_user.id),
+                    Expenditure.date,
+                    start_date,
+                    end_date,
+                ),
+                lambda e: [e.date, "Expense", e.category, e.amount, e.description],
+            ),
+        ]
 
     elif report_type == "inventory":
-        writer.writerow(["Item Name", "Category", "Quantity", "Unit", "Cost Per Unit"])
-        items_res = await db.execute(
-            select(InventoryItem).filter(InventoryItem.farmer_id == current_user.id)
-        )
-        items = items_res.scalars().all()
-        for i in items:
-            writer.writerow([i.name, i.category, i.quantity, i.unit, i.cost_per_unit])
-
-    elif report_type == "production":
-        writer.writerow(
-            ["Flock Name", "Start Date", "Initial Chicks", "Current Status"]
-        )
-        flocks_res = await db.execute(
-            select(Flock).filter(Flock.farmer_id == current_user.id)
-        )
-        flocks = flocks_res.scalars().all()
-        for f in flocks:
-            writer.writerow([f.name, f.start_date, f.initial_count, f.status])
-
-    output.seek(0)
-
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename={report_type}_report.csv"
-        },
+        fields = [
+            ("name", "Item Name"),
+            ("category", "Category"),
+            ("quantity", "Quantity"),
+            ("unit", "Unit"),
+            ("cost_per_unit", "Cost Per Unit"),
+        ]
+        queries = [
+            (
+                select(
+                    InventoryItem.name,
+                    InventoryItem.category,
+                    InventoryItem.quantity,
+                    InventoryItem.unit,
+                    InventoryItem.cost_per_unit,
+                )
+                .filter(InventoryItem.farmer_id == current_user.id)
+                .order_by(InventoryItem.name),
+                list,
+            )
+        ]
+
+    else:  # production
+        fields = [
+            ("name", "Flock Name"),
+            ("start_date", "Start Date"),
+            ("initial_count", "Initial Chicks"),
+            ("status", "Current Status"),
+        ]
+        queries = [
+            (
+                date_window(
+                    select(
+                        Flock.name, Flock.start_date, Flock.initial_count, Flock.status
+                    ).filter(Flock.farmer_id == current_user.id),
+                    Flock.start_date,
+                    start_date,
+                    end_date,
+                ),
+                list,
+            )
+        ]
+
+    return await streaming_export(
+        db,
+        fields=fields,
+        queries=queries,
+        filename=f"{report_type}_report",
+        file_format=file_format,
     )
@@ -1,13 +1,13 @@
-import csv
-import io
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.api.deps import get_current_admin_user, get_db
+from app.core.export import EXPORT_FORMATS, date_window, streaming_export
 from app.db.models.audit import AuditLog
 from app.db.models.user import User
 from app.schemas.audit import AuditLogResponse
@@ -52,50 +52,59 @@ async def get_audit_logs(
 
 @router.get("/export")
 async def export_audit_logs(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    file_format: str = Query("csv", pattern=EXPORT_FORMATS),
     db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user),
 ):
     """
-    Export all audit logs as CSV.
-    """
-    stmt = (
-        select(AuditLog)
-        .options(joinedload(AuditLog.user))
-        .order_by(AuditLog.timestamp.desc())
-    )
-    result = await db.execute(stmt)
-    logs = result.scalars().all()
+    Export audit logs as CSV or NDJSON, oldest first.
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "Timestamp",
-            "Action",
-            "User Email",
-            "Resource Type",
-            "Resource ID",
-            "IP Address",
-            "Details",
-        ]
+    Rows are streamed from the database. ``since``/``until`` (inclusive) bound
+    the slice; an interrupted export can resume with ``since`` set to the last
+    timestamp received.
+    """
+    stmt = date_window(
+        select(
+            AuditLog.timestamp,
+            AuditLog.action,
+            User.email,
+            AuditLog.resource_type,
+            AuditLog.resource_id,
+            AuditLog.ip_address,
+            AuditLog.details,
+        ).outerjoin(User, User.id == AuditLog.user_id),
+        AuditLog.timestamp,
+        since,
+        until,
     )
 
-    for log in logs:
-        email = log.user.email if log.user else "Unknown"
-        writer.writerow(
-            [
-                log.timestamp,
-                log.action,
-                email,
-                log.resource_type,
-                log.resource_id,
-                log.ip_address,
-                log.details,
-            ]
-        )
-
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"},
+    return await streaming_export(
+        db,
+        fields=[
+            ("timestamp", "Timestamp"),
+            ("action", "Action"),
+            ("user_email", "User Email"),
+            ("resource_type", "Resource Type"),
+            ("resource_id", "Resource ID"),
+            ("ip_address", "IP Address"),
+            ("details", "Details"),
+        ],
+        queries=[
+            (
+                stmt,
+                lambda log: [
+                    log.timestamp,
+                    log.action,
+                    log.email or "Unknown",
+                    log.resource_type,
+                    log.resource_id,
+                    log.ip_address,
+                    log.details,
+                ],
+            )
+        ],
+        filename="audit_logs",
+        file_format=file_format,
     )
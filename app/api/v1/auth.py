@@ -1,14 +1,16 @@
-import base64
-import json
 from datetime import timedelta
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, status
+from jose import JWTError
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import (get_current_user, get_db, set_rls_bypass)
+from app.api.deps import (get_current_user, get_db, invalidate_user_cache,
+                          set_rls_bypass)
+from app.api.rate_limit import RateLimit
 from app.config import settings
+from app.core.jwks import (JWKSUnavailableError, UnknownSigningKeyError,
+                           apple_keys, google_keys)
 from app.core.security import create_access_token
 from app.db.models.user import User
 from app.schemas.user import (OTPRequest, OTPSendResponse, OTPVerify, Token,
@@ -50,7 +52,25 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.post("/login", response_model=Token)
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[
+        Depends(
+            RateLimit(
+                "login_ip", settings.RATE_LIMIT_LOGIN_PER_IP_PER_MINUTE, by_plan=False
+            )
+        ),
+        Depends(
+            RateLimit(
+                "login",
+                settings.RATE_LIMIT_LOGIN_PER_MINUTE,
+                by_plan=False,
+                body_field="email",
+            )
+        ),
+    ],
+)
 async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """
         Login to get access token.
@@ -116,6 +136,7 @@ async def update_profile(
     updated_user = await service.update_user(
         user_id=str(current_user.id), **update_data
     )
+    invalidate_user_cache(current_user.id)
 
     return updated_user
 
@@ -204,25 +225,17 @@ async def google_sso(
             detail="Google SSO is not configured on this server.",
         )
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://oauth2.googleapis.com/tokeninfo",
-            params={"id_token": payload.id_token},
-        )
-
-    if resp.status_code != 200:
+    # Verified locally against Google's cached signing keys
+    try:
+        claims = await google_keys.verify(payload.id_token, settings.GOOGLE_CLIENT_ID)
+    except JWKSUnavailableError as exc:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid Google ID token.",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
         )
-
-    claims = resp.json()
-
-    # Audience check — the token must be issued for our app
-    if claims.get("aud") != settings.GOOGLE_CLIENT_ID:
+    except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Google ID token audience mismatch.",
+            detail="Invalid Google ID token.",
         )
 
     email: str | None = claims.get("email")
@@ -280,63 +293,17 @@ async def apple_sso(
             detail="Apple SSO is not configured on this server.",
         )
 
-    # Fetch Apple's public JWKS
-    async with httpx.AsyncClient() as client:
-        jwks_resp = await client.get("https://appleid.apple.com/auth/keys")
-
-    if jwks_resp.status_code != 200:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Could not fetch Apple public keys.",
-        )
-
-    # Decode the JWT header to find the matching key id
+    # Verified locally against Apple's cached signing keys
     try:
-        header_segment = payload.identity_token.split(".")[0]
-        # Pad base64 string
-        padded = header_segment + "=" * (4 - len(header_segment) % 4)
-        header = json.loads(base64.urlsafe_b64decode(padded))
-        kid = header.get("kid")
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Malformed Apple identity token.",
+        claims = await apple_keys.verify(
+            payload.identity_token, settings.APPLE_CLIENT_ID
         )
-
-    jwks = jwks_resp.json().get("keys", [])
-    matching_key = next((k for k in jwks if k.get("kid") == kid), None)
-
-    if not matching_key:
+    except JWKSUnavailableError as exc:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Apple public key not found for this token.",
-        )
-
-    try:
-        from cryptography.hazmat.backends import default_backend
-        from cryptography.hazmat.primitives.asymmetric.rsa import \
-            RSAPublicNumbers
-        from jose import JWTError
-        from jose import jwt as jose_jwt
-
-        def _base64url_to_int(val: str) -> int:
-            padded = val + "=" * (4 - len(val) % 4)
-            data = base64.urlsafe_b64decode(padded)
-            return int.from_bytes(data, "big")
-
-        public_numbers = RSAPublicNumbers(
-            e=_base64url_to_int(matching_key["e"]),
-            n=_base64url_to_int(matching_key["n"]),
-        )
-        public_key = public_numbers.public_key(default_backend())
-
-        claims = jose_jwt.decode(
-            payload.identity_token,
-            public_key,
-            algorithms=["RS256"],
-            audience=settings.APPLE_CLIENT_ID,
-            issuer="https://appleid.apple.com",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
         )
+    except UnknownSigningKeyError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc))
     except JWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
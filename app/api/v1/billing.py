@@ -7,7 +7,8 @@ from fastapi import (APIRouter, BackgroundTasks, Depends, HTTPException,
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_admin_user, get_current_user, get_db
+from app.api.deps import (get_current_admin_user, get_current_user, get_db,
+                          get_effective_plan, invalidate_plan_cache)
 from app.config import settings
 from app.db.models.subscription import (PlanType, Subscription,
                                         SubscriptionPlan, SubscriptionStatus)
@@ -41,16 +42,8 @@ async def get_active_plan_details(
     """
     Returns the feature details for the user's current active plan.
     """
-    from app.api.deps import _get_effective_subscription
-
     # 1. Get current plan type (STARTER default)
-    plan_type = "STARTER"
-    if current_user.role == "ADMIN" or current_user.is_superuser:
-        plan_type = "ENTERPRISE"
-    else:
-        sub = await _get_effective_subscription(db, current_user)
-        if sub:
-            plan_type = sub.plan_type
+    plan_type = await get_effective_plan(db, current_user)
 
     # 2. Fetch full plan details from DB
     result = await db.execute(
@@ -268,6 +261,7 @@ async def _handle_callback_entity(
                 _log.info("Payment failed for sub", extra={"ref": subscription.mpesa_reference})
                 subscription.status = SubscriptionStatus.CANCELLED
             await db.commit()
+            invalidate_plan_cache()
 
     elif sale:
         if sale.mpesa_transaction_id:
@@ -383,4 +377,5 @@ async def simulate_callback(
         sub.end_date = datetime.now(timezone.utc) + timedelta(days=30)
 
     await db.commit()
+    invalidate_plan_cache()
     return {"status": "success", "message": "Subscription activated (DEV simulation)"}
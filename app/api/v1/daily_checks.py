@@ -1,7 +1,7 @@
 from datetime import date, timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -23,11 +23,15 @@ router = APIRouter()
 )
 async def create_daily_check(
     check_data: DailyCheckCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Submit daily check with observations and events (batch endpoint).
+
+    Everything is written in one transaction. Stage durations are returned in
+    the ``Server-Timing`` header.
     """
     # Set tenant context for RLS
     await set_tenant_context(db, current_user)
@@ -68,6 +72,10 @@ async def create_daily_check(
             events=check_data.events,
         )
 
+        response.headers["Server-Timing"] = ", ".join(
+            f"{stage};dur={ms}" for stage, ms in result["timings"].items()
+        )
+
         # Queue alert evaluation (async background task)
         evaluate_alerts_task.delay(
             flock_id=str(check_data.flock_id), check_date=str(check_data.check_date)
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.api.rate_limit import RateLimit
+from app.config import settings
+from app.db.fanout import fan_out
 from app.db.models.alert import Alert
 from app.db.models.biosecurity import BiosecurityCheck
 from app.db.models.events import (FeedConsumptionEvent, MortalityEvent,
@@ -16,6 +20,7 @@ from app.db.models.flock import Flock
 from app.db.models.health import VetConsultation
 from app.db.models.inventory import InventoryItem
 from app.db.models.market import MarketPrice
+from app.db.models.sync import SyncTombstone
 from app.db.models.user import User
 from app.schemas.alert import AlertResponse
 from app.schemas.biosecurity import BiosecurityCheckResponse
@@ -59,7 +64,14 @@ class MarketCollection(BaseModel):
     prices: List[MarketPriceResponse]
 
 
+class TombstoneResponse(BaseModel):
+    table: str
+    id: UUID
+
+
 class SyncResponse(BaseModel):
+    server_time: datetime
+    full_sync: bool
     user: UserResponse
     flocks: List[FlockResponse]
     events: EventsCollection
@@ -69,103 +81,142 @@ class SyncResponse(BaseModel):
     health: HealthCollection
     market: MarketCollection
     alerts: List[AlertResponse]
+    deleted: List[TombstoneResponse] = []
+
+
+# Rows are stamped with the app server's clock and may commit after a
+# concurrent sync has read past them, so each delta re-reads a small window
+# before the client's cursor. Clients upsert by id, so repeats are harmless.
+_WATERMARK_OVERLAP = timedelta(seconds=5)
 
 
-@router.get("/sync", response_model=SyncResponse)
+@router.get(
+    "/sync",
+    response_model=SyncResponse,
+    dependencies=[
+        Depends(RateLimit("sync", settings.RATE_LIMIT_SYNC_PER_MINUTE))
+    ],
+)
 async def sync_data(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    updated_since: Optional[datetime] = Query(
+        None,
+        description="server_time from the previous sync; omit for a full sync",
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Fetch all user data in a single request.
     Optimized for initial load and sync.
+
+    With ``updated_since`` only rows changed after that cursor are returned,
+    plus tombstones for rows deleted since then. Clients store the returned
+    ``server_time`` and send it back on the next call. Cursors older than the
+    tombstone retention window fall back to a full sync.
     """
+    server_time = datetime.now(timezone.utc)
 
-    # 1. Flocks
-    result = await db.execute(select(Flock).filter(Flock.farmer_id == current_user.id))
-    flocks = result.scalars().all()
+    since = None
+    if updated_since is not None:
+        if updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=timezone.utc)
+        retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        if updated_since > server_time - retention:
+            since = updated_since - _WATERMARK_OVERLAP
 
     # Optimization: Only fetch events for ACTIVE flocks to speed up sync
     # Historical data for closed batches won't be loaded in full detail on sync
-    active_flock_ids = [f.id for f in flocks if f.status == "active"]
-
-    # 2. Events (linked to ACTIVE flocks only)
-    if active_flock_ids:
-        # Mortality
-        result = await db.execute(
-            select(MortalityEvent).filter(MortalityEvent.flock_id.in_(active_flock_ids))
-        )
-        mortality = result.scalars().all()
-
-        # Feed
-        result = await db.execute(
-            select(FeedConsumptionEvent).filter(
-                FeedConsumptionEvent.flock_id.in_(active_flock_ids)
-            )
-        )
-        feed = result.scalars().all()
-
-        # Vaccination
-        result = await db.execute(
-            select(VaccinationEvent).filter(
-                VaccinationEvent.flock_id.in_(active_flock_ids)
-            )
-        )
-        vaccination = result.scalars().all()
+    active_flock_ids = select(Flock.id).filter(
+        Flock.farmer_id == current_user.id, Flock.status == "active"
+    )
+    ninety_days_ago = datetime.now(timezone.utc).date() - timedelta(days=90)
 
-        # Weight
-        result = await db.execute(
-            select(WeightMeasurementEvent).filter(
-                WeightMeasurementEvent.flock_id.in_(active_flock_ids)
+    statements = [
+        # 1. Flocks
+        select(Flock).filter(Flock.farmer_id == current_user.id),
+        # 2. Events & alerts (linked to ACTIVE flocks only)
+        select(MortalityEvent).filter(MortalityEvent.flock_id.in_(active_flock_ids)),
+        select(FeedConsumptionEvent).filter(
+            FeedConsumptionEvent.flock_id.in_(active_flock_ids)
+        ),
+        select(VaccinationEvent).filter(
+            VaccinationEvent.flock_id.in_(active_flock_ids)
+        ),
+        select(WeightMeasurementEvent).filter(
+            WeightMeasurementEvent.flock_id.in_(active_flock_ids)
+        ),
+        select(Alert).filter(Alert.flock_id.in_(active_flock_ids)),
+        # 3. Finance
+        select(Expenditure).filter(Expenditure.farmer_id == current_user.id),
+        select(Sale).filter(Sale.farmer_id == current_user.id),
+        # 4. Inventory & Biosecurity
+        select(InventoryItem).filter(InventoryItem.farmer_id == current_user.id),
+        select(BiosecurityCheck).filter(BiosecurityCheck.farmer_id == current_user.id),
+        # 5. Health & Market (market prices: last 90 days, global)
+        select(VetConsultation).filter(VetConsultation.farmer_id == current_user.id),
+        select(MarketPrice).filter(MarketPrice.price_date >= ninety_days_ago),
+    ]
+    if since is not None:
+        # Served by the ix_<table>_updated_at indexes
+        models = [
+            Flock,
+            MortalityEvent,
+            FeedConsumptionEvent,
+            VaccinationEvent,
+            WeightMeasurementEvent,
+            Alert,
+            Expenditure,
+            Sale,
+            InventoryItem,
+            BiosecurityCheck,
+            VetConsultation,
+            MarketPrice,
+        ]
+        statements = [
+            stmt.filter(model.updated_at > since)
+            for model, stmt in zip(models, statements)
+        ]
+
+        # 6. Deletions since the cursor: rows owned by the user, rows on any of
+        # their flocks, and global rows (market prices) that have no owner.
+        # Children of a deleted flock are covered by the flock's own tombstone.
+        user_flock_ids = select(Flock.id).filter(Flock.farmer_id == current_user.id)
+        statements.append(
+            select(SyncTombstone.table_name, SyncTombstone.record_id).filter(
+                SyncTombstone.deleted_at > since,
+                or_(
+                    SyncTombstone.farmer_id == current_user.id,
+                    SyncTombstone.flock_id.in_(user_flock_ids),
+                    SyncTombstone.farmer_id.is_(None)
+                    & SyncTombstone.flock_id.is_(None),
+                ),
             )
         )
-        weight = result.scalars().all()
-
-        # Alerts
-        result = await db.execute(
-            select(Alert).filter(Alert.flock_id.in_(active_flock_ids))
-        )
-        alerts = result.scalars().all()
-    else:
-        mortality = []
-        feed = []
-        vaccination = []
-        weight = []
-        alerts = []
-
-    # 3. Finance
-    result = await db.execute(
-        select(Expenditure).filter(Expenditure.farmer_id == current_user.id)
-    )
-    expenditures = result.scalars().all()
-
-    result = await db.execute(select(Sale).filter(Sale.farmer_id == current_user.id))
-    sales = result.scalars().all()
-
-    # 4. Inventory & Biosecurity
-    result = await db.execute(
-        select(InventoryItem).filter(InventoryItem.farmer_id == current_user.id)
-    )
-    inventory = result.scalars().all()
 
-    result = await db.execute(
-        select(BiosecurityCheck).filter(BiosecurityCheck.farmer_id == current_user.id)
-    )
-    biosecurity = result.scalars().all()
-
-    # 5. Health & Market
-    result = await db.execute(
-        select(VetConsultation).filter(VetConsultation.farmer_id == current_user.id)
-    )
-    vet_consultations = result.scalars().all()
-
-    # Market prices (last 90 days, global)
-    ninety_days_ago = datetime.now(timezone.utc).date() - timedelta(days=90)
-    result = await db.execute(
-        select(MarketPrice).filter(MarketPrice.price_date >= ninety_days_ago)
-    )
-    market_prices = result.scalars().all()
+    # The reads are independent, so run them concurrently
+    results = await fan_out(db, *statements)
+    (
+        flocks,
+        mortality,
+        feed,
+        vaccination,
+        weight,
+        alerts,
+        expenditures,
+        sales,
+        inventory,
+        biosecurity,
+        vet_consultations,
+        market_prices,
+    ) = (result.scalars().all() for result in results[:12])
+
+    deleted = []
+    if since is not None:
+        deleted = [{"table": t, "id": record_id} for t, record_id in results[12].all()]
 
     return {
+        "server_time": server_time,
+        "full_sync": since is None,
         "user": current_user,
         "flocks": flocks,
         "events": {
@@ -180,4 +231,5 @@ async def sync_data(
         "health": {"consultations": vet_consultations},
         "market": {"prices": market_prices},
         "alerts": alerts,
+        "deleted": deleted,
     }
@@ -11,7 +11,8 @@ from app.db.models.events import (FeedConsumptionEvent, MortalityEvent,
                                   VaccinationEvent, WeightMeasurementEvent)
 from app.db.models.flock import Flock
 from app.db.models.user import User
-from app.schemas.daily_check import (FeedConsumptionEventCreate,
+from app.schemas.daily_check import (BulkEventIngest, BulkEventIngestResponse,
+                                     FeedConsumptionEventCreate,
                                      FeedConsumptionEventResponse,
                                      FeedConsumptionEventUpdate,
                                      MortalityEventCreate,
@@ -23,11 +24,29 @@ from app.schemas.daily_check import (FeedConsumptionEventCreate,
                                      WeightMeasurementEventCreate,
                                      WeightMeasurementEventResponse,
                                      WeightMeasurementEventUpdate)
+from app.services.event_ingest_service import EventIngestService
 from app.services.finance_service import FinanceService
+from app.services.flock_stats_service import FlockStatsService
 
 router = APIRouter()
 
 
+@router.post("/bulk", response_model=BulkEventIngestResponse)
+async def ingest_events(
+    payload: BulkEventIngest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_non_viewer),
+):
+    """
+    Upload a backlog of events (e.g. after a long offline period).
+
+    Events already stored (same ``event_id``) are reported as duplicates rather
+    than errors, so a partially uploaded backlog can simply be resent.
+    """
+    service = EventIngestService(db)
+    return await service.ingest(current_user.id, payload.events)
+
+
 @router.get("/mortality", response_model=List[MortalityEventResponse])
 async def read_mortality_events(
     flock_id: UUID = None,
@@ -78,6 +97,7 @@ async def create_mortality_event(
         event_date=event_date,
     )
     db.add(event)
+    await FlockStatsService(db).refresh(flock_id)
     await db.commit()
     await db.refresh(event)
     return event
@@ -107,6 +127,7 @@ async def update_mortality_event(
         setattr(event, field, value)
 
     # db.add(event)
+    await FlockStatsService(db).refresh(event.flock_id)
     await db.commit()
     await db.refresh(event)
     return event
@@ -131,6 +152,7 @@ async def delete_mortality_event(
         raise HTTPException(status_code=404, detail="Mortality event not found")
 
     await db.delete(event)
+    await FlockStatsService(db).refresh(event.flock_id)
     await db.commit()
     return None
 
@@ -205,6 +227,7 @@ async def create_feed_event(
             related_id=event.id,
             related_type="feed",
         )
+    await FlockStatsService(db).refresh(flock_id)
     await db.commit()
     await db.refresh(event)
     return event
@@ -251,6 +274,7 @@ async def update_feed_event(
         await finance_service.delete_linked_expenditure(event.id, "feed")
 
     # db.add(event)
+    await FlockStatsService(db).refresh(event.flock_id)
     await db.commit()
     await db.refresh(event)
     return event
@@ -279,6 +303,7 @@ async def delete_feed_event(
     await finance_service.delete_linked_expenditure(event.id, "feed")
 
     await db.delete(event)
+    await FlockStatsService(db).refresh(event.flock_id)
     await db.commit()
     return None
 
@@ -484,6 +509,7 @@ async def create_weight_event(
         event_date=event_date,
     )
     db.add(event)
+    await FlockStatsService(db).refresh(flock_id)
     await db.commit()
     await db.refresh(event)
     return event
@@ -515,6 +541,7 @@ async def update_weight_event(
         setattr(event, field, value)
 
     # db.add(event)
+    await FlockStatsService(db).refresh(event.flock_id)
     await db.commit()
     await db.refresh(event)
     return event
@@ -541,5 +568,6 @@ async def delete_weight_event(
         raise HTTPException(status_code=404, detail="Weight event not found")
 
     await db.delete(event)
+    await FlockStatsService(db).refresh(event.flock_id)
     await db.commit()
     return None
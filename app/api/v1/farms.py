@@ -6,7 +6,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import (check_enterprise_subscription,
-                          get_current_non_viewer, get_current_user, get_db)
+                          get_current_non_viewer, get_current_user, get_db,
+                          invalidate_plan_cache)
 from app.db.models.farm import Farm
 from app.db.models.user import User
 from app.schemas.farm import FarmCreate, FarmResponse, FarmUpdate
@@ -117,6 +118,8 @@ async def add_farm_member(
     member = FarmMember(farm_id=farm_id, user_id=user_id)
     db.add(member)
     await db.commit()
+    # The new member now inherits the owner's plan
+    invalidate_plan_cache(user_id)
     return {"status": "success", "message": "Member added to farm"}
 
 
@@ -142,4 +145,6 @@ async def delete_farm(
 
     await db.delete(farm)
     await db.commit()
+    # Members of the deleted farm lose the owner's plan
+    invalidate_plan_cache()
     return None
@@ -6,20 +6,18 @@ the shared ``get_plan_type`` dependency from ``deps.py`` — no inline duplicate
 subscription lookups.
 """
 
-import csv
-import io
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import (check_professional_subscription,
                           get_current_non_viewer, get_current_user, get_db,
                           get_plan_type)
+from app.core.export import EXPORT_FORMATS, date_window, streaming_export
 from app.db.models.finance import Expenditure, Sale
 from app.db.models.inventory import InventoryItem
 from app.db.models.subscription import PlanType
@@ -30,6 +28,7 @@ from app.schemas.finance import (ExpenditureCreate, ExpenditureResponse,
 from app.services.alert_service import AlertService
 from app.services.finance_service import (STARTER_EXPENSE_CATEGORIES,
                                           FinanceService)
+from app.services.flock_stats_service import FlockStatsService
 from app.services.mpesa_service import mpesa_service
 
 router = APIRouter()
@@ -45,7 +44,6 @@ router = APIRouter()
 )
 async def create_expenditure(
     item_in: ExpenditureCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_non_viewer),
     current_plan: str = Depends(get_plan_type),
@@ -81,7 +79,7 @@ async def create_expenditure(
                 item_name=inv_item.name,
                 current_qty=float(inv_item.quantity),
                 min_qty=float(inv_item.minimum_stock),
-                background_tasks=background_tasks,
+                recipient=current_user,
                 flock_id=item.flock_id,
             )
 
@@ -197,6 +195,7 @@ async def create_sale(
                 detail=f"Failed to initiate M-Pesa push: {e}",
             )
 
+    await FlockStatsService(db).refresh(item.flock_id)
     await db.commit()
     await db.refresh(item)
     return item
@@ -238,9 +237,11 @@ async def update_sale(
     if not item:
         raise HTTPException(status_code=404, detail="Sale record not found")
 
+    previous_flock_id = item.flock_id
     for field, value in item_in.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
 
+    await FlockStatsService(db).refresh(previous_flock_id, item.flock_id)
     await db.commit()
     await db.refresh(item)
     return item
@@ -260,6 +261,7 @@ async def delete_sale(
     if not item:
         raise HTTPException(status_code=404, detail="Sale record not found")
     await db.delete(item)
+    await FlockStatsService(db).refresh(item.flock_id)
     await db.commit()
 
 
@@ -268,32 +270,70 @@ async def delete_sale(
 
 @router.get("/export", dependencies=[Depends(check_professional_subscription)])
 async def export_financials(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    file_format: str = Query("csv", pattern=EXPORT_FORMATS),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Export financial data (Sales & Expenditures) as CSV.
+    Export financial data (Sales & Expenditures) as CSV or NDJSON.
     Requires Professional Plan.
-    """
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Date", "Type", "Category/Item", "Amount (KES)", "Description"])
-
-    sales_res = await db.execute(select(Sale).filter(Sale.farmer_id == current_user.id))
-    for s in sales_res.scalars().all():
-        writer.writerow(
-            [s.date, "Income", "Chicken Sales", float(s.total_amount), s.notes or ""]
-        )
 
-    expenses_res = await db.execute(
-        select(Expenditure).filter(Expenditure.farmer_id == current_user.id)
+    Streamed from the database; ``start_date``/``end_date`` (inclusive) limit
+    the slice so large histories can be fetched, or resumed, in ranges.
+    """
+    sales_stmt = date_window(
+        select(Sale.date, Sale.total_amount, Sale.notes).filter(
+            Sale.farmer_id == current_user.id
+        ),
+        Sale.date,
+        start_date,
+        end_date,
     )
-    for e in expenses_res.scalars().all():
-        writer.writerow([e.date, "Expense", e.category, float(e.amount), e.description])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=financial_report.csv"},
+    expenses_stmt = date_window(
+        select(
+            Expenditure.date,
+            Expenditure.category,
+            Expenditure.amount,
+            Expenditure.description,
+        ).filter(Expenditure.farmer_id == current_user.id),
+        Expenditure.date,
+        start_date,
+        end_date,
+    )
+
+    return await streaming_export(
+        db,
+        fields=[
+            ("date", "Date"),
+            ("type", "Type"),
+            ("category", "Category/Item"),
+            ("amount", "Amount (KES)"),
+            ("description", "Description"),
+        ],
+        queries=[
+            (
+                sales_stmt,
+                lambda s: [
+                    s.date,
+                    "Income",
+                    "Chicken Sales",
+                    float(s.total_amount),
+                    s.notes or "",
+                ],
+            ),
+            (
+                expenses_stmt,
+                lambda e: [
+                    e.date,
+                    "Expense",
+                    e.category,
+                    float(e.amount),
+                    e.description,
+                ],
+            ),
+        ],
+        filename="financial_report",
+        file_format=file_format,
     )
@@ -12,6 +12,7 @@ from app.db.models.subscription import (PlanType, Subscription,
 from app.db.models.user import User
 from app.schemas.flock import FlockCreate, FlockResponse, FlockUpdate
 from app.services.finance_service import FinanceService
+from app.services.flock_stats_service import FlockStatsService
 from app.services.vaccination_service import VaccinationService
 
 router = APIRouter()
@@ -76,6 +77,8 @@ async def create_flock(
             )
 
     db.add(flock)
+    await db.flush()  # assign the flock id for its stats row
+    await FlockStatsService(db).refresh(flock.id)
     await db.commit()
     await db.refresh(flock)
 
@@ -162,6 +165,9 @@ async def update_flock(
     for field, value in update_data.items():
         setattr(flock, field, value)
 
+    if "initial_count" in update_data:
+        await FlockStatsService(db).refresh(flock.id)
+
     await db.commit()
     await db.refresh(flock)
 
@@ -2,7 +2,7 @@ from datetime import date
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -78,7 +78,6 @@ async def read_inventory_items(
 async def update_inventory_item(
     item_id: UUID,
     item_in: InventoryItemUpdate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_non_viewer),
 ):
@@ -124,7 +123,7 @@ async def update_inventory_item(
         item_name=item.name,
         current_qty=float(item.quantity),
         min_qty=float(item.minimum_stock),
-        background_tasks=background_tasks,
+        recipient=current_user,
         flock_id=None,  # Global alert
     )
 
@@ -65,13 +65,66 @@ class Settings(BaseSettings):
             args["ssl"] = True
         return args
 
+    # Max pooled connections a single request may use to run independent
+    # reads concurrently (app/db/fanout.py). 1 disables the fan-out.
+    DB_FANOUT_MAX_CONCURRENCY: int = 4
+    # Extra connections all fan-outs in a process may hold at once; keep it
+    # well below the pool (10 + 20 overflow) so request sessions always fit.
+    DB_FANOUT_MAX_CONNECTIONS: int = 8
+
+    # Rows fetched per server-side cursor batch and written per chunk by the
+    # streaming CSV/NDJSON exports (app/core/export.py).
+    EXPORT_CHUNK_ROWS: int = 1000
+
+    # Events written (and committed) per batch by POST /events/bulk.
+    BULK_INGEST_BATCH_SIZE: int = 1000
+
+    # Max queued (flock, day) alert jobs evaluated together by one worker task.
+    ALERT_BATCH_SIZE: int = 200
+    # Hourly alert sweep: active flocks per shard task, and how many days back
+    # a daily check still counts as the flock's current observations.
+    ALERT_SWEEP_SHARD_SIZE: int = 1000
+    ALERT_SWEEP_CHECK_LOOKBACK_DAYS: int = 1
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Connections in the shared per-process pool (app/core/redis_client.py)
+    REDIS_MAX_CONNECTIONS: int = 50
+    # Seconds a caller waits for a free pooled connection before the command
+    # fails with a RedisError (callers then fall back as on a Redis outage)
+    REDIS_POOL_TIMEOUT_SECONDS: float = 2.0
 
     # JWT
     SECRET_KEY: str = "change-me-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # bcrypt cost for new hashes; older hashes are upgraded on next login.
+    # Hashing runs on a pool of PASSWORD_HASH_WORKERS threads per process.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    # How long a resolved user principal is reused before re-reading `users`.
+    # Set to 0 to disable the per-worker auth cache.
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    # How long a user's effective subscription plan is reused per worker.
+    PLAN_CACHE_TTL_SECONDS: int = 60
+
+    # Token-bucket rate limits (app/api/rate_limit.py), requests per minute
+    # per caller. AI and sync limits are for STARTER and scale up with plan;
+    # the login limit is per client IP and submitted email, within an overall
+    # per-IP limit.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_AI_PER_MINUTE: int = 10
+    RATE_LIMIT_SYNC_PER_MINUTE: int = 30
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10
+    RATE_LIMIT_LOGIN_PER_IP_PER_MINUTE: int = 60
+    # Proxies in front of the app that append to X-Forwarded-For (1 behind
+    # Render's). The client IP is the entry that many places from the right;
+    # anything further left is client-supplied. 0 uses the TCP peer address.
+    TRUSTED_PROXY_HOPS: int = 0
+
+    # Delta sync: how long deleted-row tombstones are kept. Clients whose
+    # cursor is older than this get a full sync instead of a delta.
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
 
     # Application
     APP_NAME: str = "Broiler Farm Management API"
@@ -86,6 +139,28 @@ class Settings(BaseSettings):
     EMAIL_API_KEY: Optional[str] = None
     PUSH_NOTIFICATION_KEY: Optional[str] = None
 
+    # Notifications queued for a recipient within this window go out as one
+    # digest; the same alert is not re-sent within the dedupe window.
+    NOTIFICATION_BATCH_WINDOW_SECONDS: int = 60
+    NOTIFICATION_DEDUPE_WINDOW_SECONDS: int = 6 * 3600
+
+    # SMS dispatch (app/services/sms_service.py): identical texts sent within
+    # the coalesce window share one gateway call of up to N recipients; at
+    # most SMS_MAX_CONCURRENCY calls in flight per process. Transient failures
+    # are retried up to SMS_MAX_ATTEMPTS times, backing off from
+    # SMS_RETRY_BACKOFF_SECONDS and doubling each time.
+    SMS_COALESCE_WINDOW_MS: int = 50
+    SMS_MAX_RECIPIENTS_PER_CALL: int = 100
+    SMS_MAX_CONCURRENCY: int = 8
+    SMS_MAX_ATTEMPTS: int = 4
+    SMS_RETRY_BACKOFF_SECONDS: int = 30
+
+    # OTP lifetime, and max OTP requests per phone number in a sliding
+    # window (not enforced in DEBUG).
+    OTP_TTL_SECONDS: int = 300
+    OTP_RATE_LIMIT: int = 3
+    OTP_RATE_LIMIT_WINDOW_SECONDS: int = 15 * 60
+
     # Email / SMTP
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
@@ -93,6 +168,14 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: Optional[str] = None
     EMAILS_FROM_EMAIL: Optional[str] = "notifications@broiler-manager.com"
     EMAILS_FROM_NAME: Optional[str] = "Broiler Manager"
+    # False for plain local servers such as scripts/smtp_sink.py
+    SMTP_STARTTLS: bool = True
+    # Pooled SMTP sessions (app/services/email_service.py): max open sessions,
+    # seconds an idle session is kept, and messages sent per session before
+    # it is recycled.
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_SECONDS: int = 60
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
 
     # M-Pesa
     MPESA_CONSUMER_KEY: str = "place_holder"
@@ -107,12 +190,39 @@ class Settings(BaseSettings):
     LLM_PROVIDER: str = "openai"
     LLM_API_KEY: Optional[str] = None
     GEMINI_MODEL: str = "gemini-1.5-flash"
+    # Cache structured AI answers in Redis (app/services/ai/cache.py); TTLs
+    # and input bucketing are per endpoint.
+    AI_CACHE_ENABLED: bool = True
+    # Batch advisory (/ai/batch/*): max flocks per request, concurrent
+    # provider calls, flocks packed into one prompt, and the timeout for
+    # each provider call.
+    AI_BATCH_MAX_ITEMS: int = 50
+    AI_BATCH_CONCURRENCY: int = 5
+    AI_BATCH_PACK_SIZE: int = 5
+    AI_BATCH_ITEM_TIMEOUT_SECONDS: float = 45.0
+
+    # Shared outbound HTTP clients (app/core/http_client.py), per upstream
+    # host: default timeout (endpoints may pass longer ones), connect timeout,
+    # max connections, and seconds an idle keep-alive connection is kept.
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 30
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: float = 5
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_SECONDS: float = 60
 
     # OAuth / SSO
     GOOGLE_CLIENT_ID: Optional[str] = None  # From GCP Console
     APPLE_CLIENT_ID: Optional[str] = None  # Apple Service ID (e.g. com.kukufiti.app)
     APPLE_TEAM_ID: Optional[str] = None  # 10-char Apple Team ID
     APPLE_KEY_ID: Optional[str] = None  # Key ID from Apple Developer Portal
+    # Provider signing keys (app/core/jwks.py): TTL when the provider sends
+    # no max-age, how early before expiry to refresh in the background, and
+    # the minimum gap between refreshes forced by an unknown key id.
+    JWKS_DEFAULT_TTL_SECONDS: int = 3600
+    JWKS_REFRESH_MARGIN_SECONDS: int = 300
+    JWKS_MIN_REFRESH_INTERVAL_SECONDS: int = 60
+    # Directory with google.json / apple.json JWKS to use instead of fetching
+    # (tests and offline development)
+    SSO_JWKS_FIXTURE_DIR: Optional[str] = None
 
     # ────────────────────────────────────────────────────────────────
     # MONITORING & ERROR TRACKING
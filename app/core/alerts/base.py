@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+# Columnar batch of rule contexts: context key -> one value per flock
+ContextColumns = Dict[str, Sequence[Any]]
 
 
 class AlertSeverity(str, Enum):
@@ -21,6 +24,25 @@ class AlertResult:
     metadata: Optional[Dict[str, Any]] = None
 
 
+@dataclass
+class BatchAlertResult:
+    """Result of evaluating a rule over a columnar batch, one entry per row"""
+
+    triggered: List[bool]
+    severities: List[Optional[AlertSeverity]]
+
+
+def batch_size(columns: ContextColumns) -> int:
+    """Number of rows in ``columns`` (all columns have the same length)."""
+    return len(next(iter(columns.values()), ()))
+
+
+def column(columns: ContextColumns, key: str, default: Any = None) -> Sequence[Any]:
+    """``columns[key]``, or ``default`` repeated when the key is absent."""
+    values = columns.get(key)
+    return values if values is not None else [default] * batch_size(columns)
+
+
 class AlertRule(ABC):
     """Base class for all alert rules"""
 
@@ -44,5 +66,21 @@ class AlertRule(ABC):
         """
         pass
 
+    def evaluate_batch(self, columns: ContextColumns) -> BatchAlertResult:
+        """
+        Evaluate the rule for every row of ``columns`` (keys as in the
+        context dict). Equivalent to calling ``evaluate`` per row; rules on
+        the hourly sweep override it with a single columnar pass.
+        """
+        keys = list(columns)
+        results = [
+            self.evaluate(dict(zip(keys, row))) for row in zip(*columns.values())
+        ]
+        triggered = [bool(r and r.should_alert) for r in results]
+        return BatchAlertResult(
+            triggered=triggered,
+            severities=[r.severity if t else None for r, t in zip(results, triggered)],
+        )
+
     def __repr__(self):
         return f"<{self.__class__.__name__}(name='{self.rule_name}')>"
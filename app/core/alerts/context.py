@@ -0,0 +1,153 @@
+"""
+Bulk loading of alert-rule contexts.
+
+A context is the flat dict the rules in ``rules.py`` read (temperature,
+days_old, mortality_rate_percent, ...). ``load_contexts`` builds them for
+many ``(flock_id, check_date)`` jobs with three set-based queries instead of
+a round trip per flock: flocks joined to their ``flock_stats`` rollup
+(mortality and the latest weight event), daily checks, and the latest
+``vaccination_events.next_due_date`` per flock.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.daily_check import DailyCheck
+from app.db.models.events import VaccinationEvent
+from app.db.models.flock import Flock
+from app.db.models.flock_stats import FlockStats
+
+AlertJob = Tuple[UUID, date]
+
+_OBSERVATIONS = ("feed_level", "water_level", "chick_behavior")
+
+
+def _as_float(value):
+    return float(value) if value is not None else None
+
+
+async def load_contexts(
+    db: AsyncSession, jobs: Iterable[AlertJob], check_lookback_days: int = 0
+) -> Dict[AlertJob, Dict[str, Any]]:
+    """
+    Build one rule context per ``(flock_id, check_date)`` job.
+
+    Observations come from the daily check on ``check_date``, or with
+    ``check_lookback_days`` from the flock's latest check up to that many
+    days earlier (used by the periodic sweep, which runs before the day's
+    check may exist). Jobs whose flock no longer exists are dropped. Jobs
+    without a daily check still get flock-level data (mortality,
+    vaccination, growth).
+    """
+    jobs = list(dict.fromkeys(jobs))
+    flock_ids = list({flock_id for flock_id, _ in jobs})
+    if not flock_ids:
+        return {}
+
+    flock_rows = await db.execute(
+        select(
+            Flock.id,
+            Flock.start_date,
+            Flock.initial_count,
+            FlockStats.total_mortality,
+            FlockStats.latest_weight_grams,
+            FlockStats.latest_weight_date,
+        )
+        .outerjoin(FlockStats, FlockStats.flock_id == Flock.id)
+        .where(Flock.id.in_(flock_ids))
+    )
+    flocks = {row.id: row for row in flock_rows}
+
+    if check_lookback_days:
+        # Latest check per flock in [earliest job date - lookback, latest date];
+        # matched to each job below by date
+        dates = [check_date for _, check_date in jobs]
+        check_rows = await db.execute(
+            select(DailyCheck)
+            .where(
+                DailyCheck.flock_id.in_(flock_ids),
+                DailyCheck.check_date
+                >= min(dates) - timedelta(days=check_lookback_days),
+                DailyCheck.check_date <= max(dates),
+            )
+            .order_by(DailyCheck.flock_id, DailyCheck.check_date.desc())
+        )
+        recent: Dict[UUID, List[DailyCheck]] = {}
+        for check in check_rows.scalars():
+            recent.setdefault(check.flock_id, []).append(check)
+        checks = {}
+        for flock_id, check_date in jobs:
+            checks[(flock_id, check_date)] = next(
+                (
+                    c
+                    for c in recent.get(flock_id, ())
+                    if check_date - timedelta(days=check_lookback_days)
+                    <= c.check_date
+                    <= check_date
+                ),
+                None,
+            )
+    else:
+        check_rows = await db.execute(
+            select(DailyCheck).where(
+                tuple_(DailyCheck.flock_id, DailyCheck.check_date).in_(jobs)
+            )
+        )
+        checks = {(c.flock_id, c.check_date): c for c in check_rows.scalars()}
+
+    # Latest scheduled booster per flock
+    vaccination_rows = await db.execute(
+        select(
+            VaccinationEvent.flock_id,
+            VaccinationEvent.vaccine_name,
+            VaccinationEvent.next_due_date,
+        )
+        .where(
+            VaccinationEvent.flock_id.in_(flock_ids),
+            VaccinationEvent.next_due_date.isnot(None),
+        )
+        .distinct(VaccinationEvent.flock_id)
+        .order_by(
+            VaccinationEvent.flock_id,
+            VaccinationEvent.event_date.desc(),
+            VaccinationEvent.event_time.desc(),
+        )
+    )
+    vaccinations = {row.flock_id: row for row in vaccination_rows}
+
+    contexts: Dict[AlertJob, Dict[str, Any]] = {}
+    for flock_id, check_date in jobs:
+        flock = flocks.get(flock_id)
+        if flock is None:
+            continue
+
+        total_deaths = flock.total_mortality or 0
+        context: Dict[str, Any] = {
+            "days_old": (check_date - flock.start_date).days,
+            "total_deaths": total_deaths,
+            "mortality_rate_percent": (
+                round(total_deaths / flock.initial_count * 100, 2)
+                if flock.initial_count
+                else None
+            ),
+        }
+
+        if flock.latest_weight_date == check_date:
+            context["average_weight_grams"] = _as_float(flock.latest_weight_grams)
+
+        vaccination = vaccinations.get(flock_id)
+        if vaccination is not None:
+            context["next_vaccination_due_date"] = vaccination.next_due_date
+            context["vaccine_name"] = vaccination.vaccine_name
+
+        check = checks.get((flock_id, check_date))
+        if check is not None:
+            context["temperature_celsius"] = _as_float(check.temperature_celsius)
+            for key in _OBSERVATIONS:
+                context[key] = getattr(check, key)
+
+        contexts[(flock_id, check_date)] = context
+    return contexts
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.alerts.base import AlertResult, AlertRule
 from app.core.alerts.rules import (HighMortalityAlert, HighTemperatureAlert,
@@ -13,9 +14,16 @@ from app.db.models.alert import Alert
 
 
 class AlertEngine:
-    """Evaluates alert rules and manages alert lifecycle"""
+    """
+    Evaluates alert rules and manages alert lifecycle.
 
-    def __init__(self, db: Session):
+    Works on an AsyncSession, so the same engine serves API handlers and
+    Celery tasks. Evaluation is set-based: rules run in Python, then one query
+    loads the active alerts of every flock involved, new alerts are inserted
+    in one multi-row INSERT and escalations are flushed together.
+    """
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.rules: List[AlertRule] = [
             LowTemperatureAlert(),
@@ -28,100 +36,147 @@ class AlertEngine:
             PoorGrowthAlert(),
         ]
 
-    def evaluate_all(self, flock_id: UUID, context: Dict[str, Any]) -> List[Alert]:
+    async def evaluate_all(
+        self, flock_id: UUID, context: Dict[str, Any], commit: bool = True
+    ) -> List[Alert]:
         """
         Evaluate all rules against provided context.
         Returns list of alerts that were triggered.
         """
-        triggered_alerts = []
+        return await self.evaluate_batch([(flock_id, context)], commit=commit)
 
-        for rule in self.rules:
-            result = rule.evaluate(context)
-            if result and result.should_alert:
-                # Check for existing active alert of same type
-                existing = self._get_active_alert(flock_id, rule.alert_type)
-
-                if existing:
-                    # Update existing alert if severity changed
-                    if existing.severity != result.severity.value:
-                        existing.severity = result.severity.value
-                        existing.message = result.message
-                        existing.metadata = result.metadata
-                        existing.triggered_at = datetime.now(timezone.utc)
-                        self.db.commit()
-                        triggered_alerts.append(existing)
-                else:
-                    # Create new alert
-                    alert = self._create_alert(flock_id, rule.alert_type, result)
-                    triggered_alerts.append(alert)
+    async def evaluate_batch(
+        self, contexts: Iterable[Tuple[UUID, Dict[str, Any]]], commit: bool = True
+    ) -> List[Alert]:
+        """
+        Evaluate all rules for many ``(flock_id, context)`` pairs.
+
+        For each flock and alert type an active alert is created if none
+        exists, or escalated/de-escalated when the severity changed. When the
+        same flock appears more than once, the later context wins. Returns the
+        alerts that were created or changed.
+        """
+        contexts = list(contexts)
+        keys = sorted({key for _, context in contexts for key in context})
+        columns = {key: [context.get(key) for _, context in contexts] for key in keys}
 
+        fired: Dict[Tuple[UUID, str], AlertResult] = {}
+        for rule in self.rules:
+            # Columnar pass to find the rows that fire, then the scalar rule
+            # only for those to build the message and metadata
+            batch = rule.evaluate_batch(columns)
+            for (flock_id, context), hit in zip(contexts, batch.triggered):
+                if hit:
+                    fired[(flock_id, rule.alert_type)] = rule.evaluate(context)
+
+        triggered_alerts: List[Alert] = []
+        if fired:
+            active = await self._get_active_alerts(
+                {flock_id for flock_id, _ in fired},
+                {alert_type for _, alert_type in fired},
+            )
+            now = datetime.now(timezone.utc)
+            new_rows = []
+            for key, result in fired.items():
+                existing = active.get(key)
+                if existing is None:
+                    new_rows.append(self._alert_row(*key, result, now))
+                elif existing.severity != result.severity.value:
+                    existing.severity = result.severity.value
+                    existing.message = result.message
+                    existing.alert_metadata = result.metadata
+                    existing.triggered_at = now
+                    triggered_alerts.append(existing)
+
+            await self.db.flush()
+            if new_rows:
+                created = await self.db.execute(
+                    insert(Alert).returning(Alert), new_rows
+                )
+                triggered_alerts.extend(created.scalars().all())
+
+        if commit:
+            await self.db.commit()
         return triggered_alerts
 
-    def _get_active_alert(self, flock_id: UUID, alert_type: str) -> Alert:
-        """Get active alert of specific type for a flock"""
-        return (
-            self.db.query(Alert)
+    async def _get_active_alerts(
+        self, flock_ids: Iterable[UUID], alert_types: Iterable[str]
+    ) -> Dict[Tuple[UUID, str], Alert]:
+        """Active alerts keyed by (flock, type); the newest wins on duplicates."""
+        result = await self.db.execute(
+            select(Alert)
             .filter(
-                Alert.flock_id == flock_id,
-                Alert.alert_type == alert_type,
+                Alert.flock_id.in_(list(flock_ids)),
+                Alert.alert_type.in_(list(alert_types)),
                 Alert.status == "active",
             )
-            .first()
-        )
-
-    def _create_alert(
-        self, flock_id: UUID, alert_type: str, result: AlertResult
-    ) -> Alert:
-        """Create a new alert"""
-        alert = Alert(
-            flock_id=flock_id,
-            alert_type=alert_type,
-            severity=result.severity.value,
-            title=result.title,
-            message=result.message,
-            metadata=result.metadata,
-            status="active",
+            .order_by(Alert.triggered_at)
         )
-        self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
-        return alert
-
-    def acknowledge_alert(self, alert_id: UUID) -> bool:
+        return {
+            (alert.flock_id, alert.alert_type): alert
+            for alert in result.scalars().all()
+        }
+
+    @staticmethod
+    def _alert_row(
+        flock_id: UUID, alert_type: str, result: AlertResult, now: datetime
+    ) -> Dict[str, Any]:
+        """Column values for a new alert"""
+        return {
+            "flock_id": flock_id,
+            "alert_type": alert_type,
+            "severity": result.severity.value,
+            "title": result.title,
+            "message": result.message,
+            "alert_metadata": result.metadata,
+            "status": "active",
+            "triggered_at": now,
+        }
+
+    async def acknowledge_alert(self, alert_id: UUID) -> bool:
         """Mark alert as acknowledged"""
-        alert = self.db.query(Alert).filter(Alert.id == alert_id).first()
-        if not alert:
-            return False
-
-        alert.status = "acknowledged"
-        alert.acknowledged_at = datetime.now(timezone.utc)
-        self.db.commit()
-        return True
+        return await self._set_status(
+            alert_id,
+            status="acknowledged",
+            acknowledged_at=datetime.now(timezone.utc),
+        )
 
-    def resolve_alert(self, alert_id: UUID) -> bool:
+    async def resolve_alert(self, alert_id: UUID) -> bool:
         """Mark alert as resolved"""
-        alert = self.db.query(Alert).filter(Alert.id == alert_id).first()
-        if not alert:
-            return False
-
-        alert.status = "resolved"
-        alert.resolved_at = datetime.now(timezone.utc)
-        self.db.commit()
-        return True
-
-    def auto_resolve_stale_alerts(self, hours: int = 24):
-        """Auto-resolve alerts that haven't been updated in N hours"""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-
-        stale_alerts = (
-            self.db.query(Alert)
-            .filter(Alert.status == "active", Alert.triggered_at < cutoff)
-            .all()
+        return await self._set_status(
+            alert_id, status="resolved", resolved_at=datetime.now(timezone.utc)
         )
 
-        for alert in stale_alerts:
-            alert.status = "resolved"
-            alert.resolved_at = datetime.now(timezone.utc)
+    async def _set_status(self, alert_id: UUID, **values) -> bool:
+        result = await self.db.execute(
+            update(Alert)
+            .where(Alert.id == alert_id)
+            .values(**values)
+            .returning(Alert.id)
+        )
+        updated = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        return updated
 
-        self.db.commit()
-        return len(stale_alerts)
+    async def auto_resolve_stale_alerts(
+        self, hours: int = 24, flock_ids: Optional[Iterable[UUID]] = None
+    ) -> List[UUID]:
+        """
+        Auto-resolve alerts that haven't been updated in N hours, optionally
+        only for ``flock_ids``, in one UPDATE. Returns the resolved alert ids.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = update(Alert).where(
+            Alert.status == "active", Alert.triggered_at < now - timedelta(hours=hours)
+        )
+        if flock_ids is not None:
+            stmt = stmt.where(Alert.flock_id.in_(list(flock_ids)))
+
+        result = await self.db.execute(
+            stmt.values(status="resolved", resolved_at=now)
+            .returning(Alert.id)
+            .execution_options(synchronize_session=False)
+        )
+        resolved = list(result.scalars().all())
+        await self.db.commit()
+        return resolved
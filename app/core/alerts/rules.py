@@ -1,7 +1,9 @@
+from bisect import bisect_left
 from datetime import date
 from typing import Any, Dict, Optional
 
-from app.core.alerts.base import AlertResult, AlertRule, AlertSeverity
+from app.core.alerts.base import (AlertResult, AlertRule, AlertSeverity,
+                                  BatchAlertResult, ContextColumns, column)
 
 
 class LowTemperatureAlert(AlertRule):
@@ -57,6 +59,26 @@ class LowTemperatureAlert(AlertRule):
 
         return None
 
+    def evaluate_batch(self, columns: ContextColumns) -> BatchAlertResult:
+        # Upper day bound of weeks 1-3; later ages use the week 4+ minimum
+        bounds = (7, 14, 21)
+        minimums = (
+            self.MIN_TEMP_WEEK_1,
+            self.MIN_TEMP_WEEK_2,
+            self.MIN_TEMP_WEEK_3,
+            self.MIN_TEMP_WEEK_4_PLUS,
+        )
+        triggered = [
+            temp is not None and temp < minimums[bisect_left(bounds, days or 0)]
+            for temp, days in zip(
+                column(columns, "temperature_celsius"), column(columns, "days_old", 0)
+            )
+        ]
+        return BatchAlertResult(
+            triggered=triggered,
+            severities=[AlertSeverity.CRITICAL if t else None for t in triggered],
+        )
+
 
 class HighTemperatureAlert(AlertRule):
     """Alert when brooding temperature is too high"""
@@ -153,6 +175,31 @@ class HighMortalityAlert(AlertRule):
 
         return None
 
+    def evaluate_batch(self, columns: ContextColumns) -> BatchAlertResult:
+        week_1 = self.MAX_MORTALITY_RATE_WEEK_1
+        overall = self.MAX_MORTALITY_RATE_OVERALL
+        critical, warning = AlertSeverity.CRITICAL, AlertSeverity.WARNING
+
+        def severity(rate, days):
+            if rate is None:
+                return None
+            if (days or 0) <= 7 and rate > week_1:
+                return critical
+            if rate > overall:
+                return critical if rate > 8.0 else warning
+            return None
+
+        severities = list(
+            map(
+                severity,
+                column(columns, "mortality_rate_percent"),
+                column(columns, "days_old", 0),
+            )
+        )
+        return BatchAlertResult(
+            triggered=[s is not None for s in severities], severities=severities
+        )
+
 
 class LowFeedAlert(AlertRule):
     """Alert when feed level is low or empty"""
@@ -374,3 +421,16 @@ class PoorGrowthAlert(AlertRule):
             )
 
         return None
+
+    def evaluate_batch(self, columns: ContextColumns) -> BatchAlertResult:
+        expected = self.EXPECTED_WEIGHT_DAY_7
+        triggered = [
+            bool(days and weight) and days == 7 and weight < expected
+            for days, weight in zip(
+                column(columns, "days_old"), column(columns, "average_weight_grams")
+            )
+        ]
+        return BatchAlertResult(
+            triggered=triggered,
+            severities=[AlertSeverity.WARNING if t else None for t in triggered],
+        )
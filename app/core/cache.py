@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Small in-process cache with per-entry expiry and LRU eviction.
+
+    Intended for hot, cheap-to-rebuild lookups (e.g. the authenticated
+    principal) where a few seconds of staleness is acceptable. Entries live in
+    the memory of a single worker process, so writers must call
+    ``invalidate`` locally and keep ``ttl_seconds`` short enough to bound
+    staleness on the other workers.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.ttl_seconds <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry (no-op if absent)."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,27 @@
+"""
+Reference broiler growth curves (as-hatched, mixed sex).
+
+Body weight (g) and cumulative FCR at day 0, 7, 14, ..., 56, rounded from the
+breeders' published performance objectives. Good enough to place a flock on
+its curve and project it forward; not a substitute for the breeder's tables.
+"""
+
+CURVE_INTERVAL_DAYS = 7
+
+BREED_CURVES = {
+    "Ross 308": {
+        "weight_g": [44, 202, 551, 1070, 1715, 2418, 3099, 3718, 4254],
+        "cumulative_fcr": [0, 0.87, 1.06, 1.21, 1.35, 1.48, 1.62, 1.76, 1.90],
+    },
+    "Cobb 500": {
+        "weight_g": [42, 185, 485, 947, 1537, 2174, 2804, 3393, 3921],
+        "cumulative_fcr": [0, 0.86, 1.05, 1.21, 1.35, 1.49, 1.62, 1.76, 1.90],
+    },
+}
+
+# Used for breeds without a curve of their own
+DEFAULT_BREED = "Ross 308"
+
+# Expected daily mortality (fraction of birds) from the given age on; it
+# rises as heavy birds become prone to heat stress and leg disorders.
+DAILY_MORTALITY = [(0, 0.0005), (35, 0.001), (42, 0.002)]
@@ -0,0 +1,111 @@
+"""
+Process-wide pool of outbound HTTP clients, one per upstream host.
+
+Integrations (AI providers, M-Pesa, SMS, SSO keys) call
+``get_http_client(url)`` instead of opening an ``httpx.AsyncClient`` per
+request, so keep-alive connections (and HTTP/2, when the optional ``h2``
+package is installed) are reused across calls and each upstream costs a TCP
+and TLS handshake only when the pool has no idle connection. The API closes
+the clients in ``main.py``'s lifespan.
+
+Each client counts requests and new connections (via httpcore trace events);
+``http_client_stats()`` reports them per host, and the reuse ratio confirms
+the handshakes saved.
+"""
+import logging
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_metrics: Dict[str, Dict[str, int]] = {}
+
+
+def _host_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _tracer(counters: Dict[str, int]):
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            counters["connections"] += 1
+        elif event_name == "connection.start_tls.complete":
+            counters["tls_handshakes"] += 1
+
+    return trace
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """
+    Shared client for ``url``'s scheme and host. Pass per-call timeouts to
+    the request methods where an endpoint needs longer than the default.
+    """
+    host = _host_of(url)
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        counters = _metrics.setdefault(
+            host, {"requests": 0, "connections": 0, "tls_handshakes": 0}
+        )
+        trace = _tracer(counters)
+
+        async def on_request(request: httpx.Request) -> None:
+            counters["requests"] += 1
+            request.extensions["trace"] = trace
+
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(
+                settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+                connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            ),
+            event_hooks={"request": [on_request]},
+        )
+        _clients[host] = client
+    return client
+
+
+def http_client_stats() -> Dict[str, Dict[str, Any]]:
+    """Requests, new connections and connection reuse per upstream host."""
+    stats = {}
+    for host, counters in _metrics.items():
+        requests = counters["requests"]
+        stats[host] = {
+            **counters,
+            "reuse_ratio": (
+                round(1 - counters["connections"] / requests, 3) if requests else 0.0
+            ),
+        }
+    return stats
+
+
+async def close_http_clients() -> None:
+    """Close every pooled client (lifespan shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+    if _metrics:
+        logger.info(f"Outbound HTTP stats: {http_client_stats()}")
+
+
+def reset_http_clients() -> None:
+    """Forget pooled clients without closing them (after fork, in the child)."""
+    _clients.clear()
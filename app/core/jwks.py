@@ -0,0 +1,208 @@
+"""
+Identity-provider signing keys for SSO token verification.
+
+``JWKSCache`` fetches a provider's JWKS once, keeps the parsed RSA public keys
+in memory, and verifies tokens locally, so an SSO login makes no outbound
+HTTP call on the hot path. Keys expire after the response's Cache-Control
+max-age (or JWKS_DEFAULT_TTL_SECONDS); within JWKS_REFRESH_MARGIN_SECONDS of
+expiry a background refresh revalidates them with If-None-Match. A token
+signed with an unknown ``kid`` (key rotation) triggers one early refresh,
+at most every JWKS_MIN_REFRESH_INTERVAL_SECONDS.
+
+For tests and offline development, ``load_fixture`` (or SSO_JWKS_FIXTURE_DIR,
+holding ``google.json`` / ``apple.json``) pins the keys and disables fetching.
+"""
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Set
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSUnavailableError(Exception):
+    """Raised when a provider's keys cannot be fetched and none are cached."""
+
+
+class UnknownSigningKeyError(JWTError):
+    """Raised when a token's ``kid`` is not in the provider's JWKS."""
+
+
+def _base64url_to_int(val: str) -> int:
+    padded = val + "=" * (-len(val) % 4)
+    return int.from_bytes(base64.urlsafe_b64decode(padded), "big")
+
+
+def _parse_keys(jwks: Dict[str, Any]) -> Dict[str, Any]:
+    keys = {}
+    for key in jwks.get("keys", []):
+        if key.get("kty") != "RSA" or "kid" not in key:
+            continue
+        keys[key["kid"]] = RSAPublicNumbers(
+            e=_base64url_to_int(key["e"]), n=_base64url_to_int(key["n"])
+        ).public_key()
+    return keys
+
+
+def _max_age(cache_control: str) -> Optional[int]:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+class JWKSCache:
+    def __init__(self, name: str, url: str, issuers: Sequence[str]):
+        self.name = name
+        self.url = url
+        self.issuers = list(issuers)
+        self._keys: Dict[str, Any] = {}
+        self._etag: Optional[str] = None
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._fixture = False
+        self._lock: Optional[asyncio.Lock] = None
+        self._background: Set[asyncio.Task] = set()
+
+    def load_fixture(self, jwks: Dict[str, Any]) -> None:
+        """Pin keys from a JWKS document; no HTTP is made afterwards."""
+        self._keys = _parse_keys(jwks)
+        self._fixture = True
+
+    async def refresh(self, force: bool = False) -> None:
+        """Fetch (or revalidate) the JWKS; single-flight across callers."""
+        if self._fixture:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not force and time.monotonic() < self._expires_at - (
+                settings.JWKS_REFRESH_MARGIN_SECONDS
+            ):
+                return  # Another caller refreshed while we waited
+            await self._fetch()
+
+    async def _fetch(self) -> None:
+        headers = {"If-None-Match": self._etag} if self._etag and self._keys else {}
+        self._last_fetch = time.monotonic()
+        try:
+            response = await get_http_client(self.url).get(
+                self.url, headers=headers, timeout=10
+            )
+            if response.status_code != 304:
+                response.raise_for_status()
+                self._keys = _parse_keys(response.json())
+                self._etag = response.headers.get("ETag")
+        except (httpx.HTTPError, ValueError) as e:
+            if not self._keys:
+                raise JWKSUnavailableError(
+                    f"Could not fetch {self.name} public keys: {e}"
+                ) from e
+            # Keep serving the keys we have; try again shortly
+            logger.warning(f"{self.name} JWKS refresh failed, using cached keys: {e}")
+            self._expires_at = time.monotonic() + 60
+            return
+
+        ttl = _max_age(response.headers.get("Cache-Control"))
+        self._expires_at = time.monotonic() + (
+            ttl if ttl is not None else settings.JWKS_DEFAULT_TTL_SECONDS
+        )
+
+    def _refresh_in_background(self) -> None:
+        if self._background:
+            return
+        task = asyncio.create_task(self.refresh(force=True))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        task.add_done_callback(self._log_failure)
+
+    def _log_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"{self.name} JWKS refresh failed: {task.exception()}")
+
+    async def get_key(self, kid: Optional[str]) -> Any:
+        if not self._fixture:
+            now = time.monotonic()
+            if not self._keys or now >= self._expires_at:
+                await self.refresh()
+            elif now >= self._expires_at - settings.JWKS_REFRESH_MARGIN_SECONDS:
+                self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if (
+            key is None
+            and not self._fixture
+            and time.monotonic() - self._last_fetch
+            >= settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS
+        ):
+            # Possibly a freshly rotated key
+            await self.refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise UnknownSigningKeyError(
+                f"{self.name} public key not found for this token."
+            )
+        return key
+
+    async def verify(self, token: str, audience: str) -> Dict[str, Any]:
+        """
+        Verify an RS256 ID token's signature, audience, issuer and expiry and
+        return its claims. Raises JWTError (or JWKSUnavailableError).
+        """
+        header = jwt.get_unverified_header(token)
+        key = await self.get_key(header.get("kid"))
+        return jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=audience,
+            issuer=self.issuers,
+            # ID tokens are verified without their access token
+            options={"verify_at_hash": False},
+        )
+
+
+google_keys = JWKSCache(
+    "Google",
+    "https://www.googleapis.com/oauth2/v3/certs",
+    issuers=["https://accounts.google.com", "accounts.google.com"],
+)
+apple_keys = JWKSCache(
+    "Apple",
+    "https://appleid.apple.com/auth/keys",
+    issuers=["https://appleid.apple.com"],
+)
+
+
+def load_jwks_fixtures(directory: str) -> None:
+    """Pin provider keys from ``<directory>/google.json`` / ``apple.json``."""
+    for name, cache in (("google", google_keys), ("apple", apple_keys)):
+        path = Path(directory) / f"{name}.json"
+        if path.exists():
+            cache.load_fixture(json.loads(path.read_text()))
+
+
+if settings.SSO_JWKS_FIXTURE_DIR:
+    load_jwks_fixtures(settings.SSO_JWKS_FIXTURE_DIR)
+
+
+async def warm_sso_keys() -> None:
+    """Fetch keys for the configured providers ahead of the first login."""
+    for client_id, cache in (
+        (settings.GOOGLE_CLIENT_ID, google_keys),
+        (settings.APPLE_CLIENT_ID, apple_keys),
+    ):
+        if client_id:
+            try:
+                await cache.refresh()
+            except JWKSUnavailableError as e:
+                logger.warning(str(e))
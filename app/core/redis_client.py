@@ -0,0 +1,48 @@
+"""
+Process-wide Redis connection pool.
+
+The API opens it in ``main.py``'s lifespan and closes it on shutdown; Celery
+workers get one per process via ``app.workers.runtime``. Services take their
+client from ``get_redis()`` instead of calling ``redis.from_url`` per
+instance, so requests reuse pooled connections rather than opening new ones.
+
+The pool blocks: when all REDIS_MAX_CONNECTIONS are in use, a burst queues for
+up to REDIS_POOL_TIMEOUT_SECONDS instead of failing at once.
+"""
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.config import settings
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Shared client; created on first use if the lifespan has not run."""
+    global _client
+    if _client is None:
+        _client = redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+            )
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared pool (lifespan / worker shutdown)."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+        await client.connection_pool.disconnect()
+
+
+def reset_redis() -> None:
+    """Forget the pool without closing it (after fork, in the child)."""
+    global _client
+    _client = None
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -6,10 +8,21 @@ from jose import JWTError, jwt
 
 from app.config import settings
 
+# bcrypt releases the GIL while hashing, so a small thread pool runs hashes in
+# parallel without blocking the event loop. Its size caps the CPU a login
+# burst can take; extra calls queue for a free thread.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _password_bytes(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes (newer versions reject longer input)
+    return password.encode("utf-8")[:72]
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a raw password against its bcrypt hash.
+    Blocking; from async code use ``verify_password_async``.
 
     Args:
         plain_password (str): Raw password input.
@@ -19,29 +32,60 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         bool: True if password matches, False otherwise.
     """
     return bcrypt.checkpw(
-        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+        _password_bytes(plain_password), hashed_password.encode("utf-8")
     )
 
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
     """
     Generate a bcrypt hash for a password.
+    Blocking; from async code use ``get_password_hash_async``.
 
     Args:
         password (str): Raw password to hash.
+        rounds (int, optional): Cost factor, defaults to BCRYPT_ROUNDS.
 
     Returns:
         str: Bcrypt hash string.
     """
-    # Ensure password is not longer than 72 bytes
-    if len(password.encode("utf-8")) > 72:
-        password = password[:72]
-
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(_password_bytes(password), salt)
     return hashed.decode("utf-8")
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        # $2b$<cost>$<salt+hash>
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt",
+        )
+    return _hash_executor
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the bounded hashing pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` on the bounded hashing pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_hash_executor(), get_password_hash, password
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
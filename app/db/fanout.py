@@ -0,0 +1,133 @@
+"""
+Run independent read-only statements concurrently on separate pooled
+connections, each carrying the caller's tenant (RLS) context.
+
+A single AsyncSession can only run one statement at a time, so endpoints that
+issue many unrelated SELECTs pay the sum of their latencies. ``fan_out`` checks
+out one connection per statement (bounded by DB_FANOUT_MAX_CONCURRENCY) and
+returns buffered results in the same order, so the caller waits roughly as long
+as the slowest query.
+
+Extra connections are capped process-wide by DB_FANOUT_MAX_CONNECTIONS, kept
+below the pool size. A request never waits for one: when no slot is free, or
+the pool has no idle connection, the statement runs on the request's own
+session instead, so concurrent requests cannot starve the pool.
+
+Only use it for reads: the extra connections run in their own READ ONLY
+transactions and cannot see uncommitted writes made on the request session.
+"""
+import asyncio
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+from app.config import settings
+from app.db.session import (DB_MAX_OVERFLOW, DB_POOL_SIZE, AsyncSessionLocal,
+                            engine)
+
+_RLS_SETTINGS = ("app.current_user_id", "app.is_admin", "app.bypass_rls")
+
+# Extra connections in use by fan-outs across all requests in this process
+_connection_slots = asyncio.Semaphore(settings.DB_FANOUT_MAX_CONNECTIONS)
+
+
+async def read_rls_context(db: AsyncSession) -> dict:
+    """Reads the transaction-local RLS settings applied to ``db`` by deps.py."""
+    row = (
+        await db.execute(
+            text(
+                "SELECT coalesce(current_setting('app.current_user_id', true), ''),"
+                " coalesce(current_setting('app.is_admin', true), ''),"
+                " coalesce(current_setting('app.bypass_rls', true), '')"
+            )
+        )
+    ).one()
+    return dict(zip(_RLS_SETTINGS, row))
+
+
+async def apply_rls_context(session: AsyncSession, context: dict) -> None:
+    """Marks the open transaction on ``session`` READ ONLY and applies ``context``."""
+    await session.execute(text("SET TRANSACTION READ ONLY"))
+    await session.execute(
+        text(
+            "SELECT set_config('app.current_user_id', :uid, true),"
+            " set_config('app.is_admin', :is_admin, true),"
+            " set_config('app.bypass_rls', :bypass, true)"
+        ),
+        {
+            "uid": context["app.current_user_id"],
+            "is_admin": context["app.is_admin"],
+            "bypass": context["app.bypass_rls"],
+        },
+    )
+
+
+def _pool_has_room() -> bool:
+    return engine.pool.checkedout() < DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+
+async def _run_isolated(stmt: Executable, context: dict) -> Result:
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await apply_rls_context(session, context)
+            result = await session.execute(stmt)
+            # Buffer rows before the connection goes back to the pool
+            return result.freeze()()
+
+
+async def _run(
+    db: AsyncSession,
+    db_lock: asyncio.Lock,
+    stmt: Executable,
+    context: dict,
+    semaphore: asyncio.Semaphore,
+) -> Result:
+    async with semaphore:
+        # Never wait for a connection while holding the request's own
+        if _connection_slots.locked() or not _pool_has_room():
+            async with db_lock:
+                return await db.execute(stmt)
+        async with _connection_slots:
+            return await _run_isolated(stmt, context)
+
+
+def uses_app_engine(db: AsyncSession) -> bool:
+    """
+    True when ``db`` talks to the application engine, so other pooled
+    connections see the same committed data. Test sessions bound to a single
+    connection inside an outer transaction return False.
+    """
+    return db.bind is engine
+
+
+async def fan_out(db: AsyncSession, *statements: Executable) -> List[Result]:
+    """
+    Execute ``statements`` concurrently and return their results in order.
+
+    Results are fully buffered, so ``.scalars().all()``, ``.all()`` and
+    ``.scalar()`` work as they would on ``db.execute``. ORM objects come back
+    detached with their columns loaded.
+
+    Falls back to running the statements one by one on ``db`` when fan-out is
+    disabled (DB_FANOUT_MAX_CONCURRENCY <= 1) or when ``db`` is not bound to
+    the application engine (e.g. a test session wrapped in an outer
+    transaction, whose rows other connections could not see).
+    """
+    if (
+        len(statements) <= 1
+        or settings.DB_FANOUT_MAX_CONCURRENCY <= 1
+        or not uses_app_engine(db)
+    ):
+        return [await db.execute(stmt) for stmt in statements]
+
+    context = await read_rls_context(db)
+    semaphore = asyncio.Semaphore(settings.DB_FANOUT_MAX_CONCURRENCY)
+    db_lock = asyncio.Lock()
+    return list(
+        await asyncio.gather(
+            *(_run(db, db_lock, stmt, context, semaphore) for stmt in statements)
+        )
+    )
@@ -10,10 +10,12 @@ from app.db.models.farm import Farm
 from app.db.models.farm_member import FarmMember
 from app.db.models.finance import Expenditure, Sale
 from app.db.models.flock import Flock
+from app.db.models.flock_stats import FlockStats
 from app.db.models.inventory import InventoryItem
 from app.db.models.people import Customer, Employee, Supplier
 from app.db.models.resource import Resource
 from app.db.models.scheduled_task import ScheduledTask
+from app.db.models.sync import SyncTombstone
 from app.db.models.user import User
 from app.db.models.user_setting import UserSetting
 
@@ -21,6 +23,7 @@ __all__ = [
     "User",
     "Farm",
     "Flock",
+    "FlockStats",
     "DailyCheck",
     "MortalityEvent",
     "FeedConsumptionEvent",
@@ -41,4 +44,5 @@ __all__ = [
     "AuditLog",
     "FarmMember",
     "ApiKey",
+    "SyncTombstone",
 ]
@@ -0,0 +1,46 @@
+from sqlalchemy import (DECIMAL, Column, Date, DateTime, ForeignKey, Integer,
+                        func)
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class FlockStats(Base):
+    """
+    Running totals for one flock, kept in step with its event and sale rows.
+
+    Maintained by ``FlockStatsService.refresh`` inside the same transaction as
+    each write, so readers (dashboard, stats task, benchmarks, alerts) can use
+    a primary-key lookup instead of re-aggregating the event tables.
+    """
+
+    __tablename__ = "flock_stats"
+
+    flock_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("flocks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    initial_count = Column(Integer, nullable=False, default=0)
+    total_mortality = Column(Integer, nullable=False, default=0)
+    total_sold = Column(Integer, nullable=False, default=0)
+    current_birds = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        doc="initial_count - total_mortality - total_sold (not clamped)",
+    )
+    total_feed_kg = Column(DECIMAL(12, 2), nullable=False, default=0)
+    latest_weight_grams = Column(DECIMAL(10, 2), nullable=True)
+    latest_weight_date = Column(Date, nullable=True)
+    fcr = Column(
+        DECIMAL(8, 3),
+        nullable=True,
+        doc="Feed kg per kg of current live weight; NULL until a weight is recorded",
+    )
+    refreshed_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<FlockStats(flock={self.flock_id}, birds={self.current_birds})>"
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base, UUIDMixin
+
+
+class SyncTombstone(Base, UUIDMixin):
+    """
+    Records a deleted row so delta syncs (/data/sync?updated_since=...) can tell
+    clients what to drop locally.
+
+    Rows are written by the ``record_sync_tombstone`` trigger on every synced
+    table, so cascaded deletes (e.g. a flock's events) are captured too.
+    """
+
+    __tablename__ = "sync_tombstones"
+
+    table_name = Column(String(64), nullable=False, doc="Source table of the row")
+    record_id = Column(UUID(as_uuid=True), nullable=False, doc="ID of the deleted row")
+    farmer_id = Column(
+        UUID(as_uuid=True),
+        nullable=True,
+        index=True,
+        doc="Owner of the deleted row, if the table has one",
+    )
+    flock_id = Column(
+        UUID(as_uuid=True),
+        nullable=True,
+        index=True,
+        doc="Flock of the deleted row, if the table has one",
+    )
+    deleted_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        index=True,
+    )
+
+    __table_args__ = (Index("ix_sync_tombstones_table_record", "table_name", "record_id"),)
+
+    def __repr__(self):
+        return f"<SyncTombstone(table='{self.table_name}', id='{self.record_id}')>"
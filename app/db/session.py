@@ -5,13 +5,16 @@ from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
 
 from app.config import settings
 
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 20
+
 # Create async engine
 engine = create_async_engine(
     settings.ASYNC_DATABASE_URL,
     connect_args=settings.ASYNC_CONNECT_ARGS,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=30,
     pool_recycle=1800,
     echo=settings.DEBUG,
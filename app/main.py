@@ -1,7 +1,7 @@
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
-import redis.asyncio as redis
 import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,7 +24,10 @@ from app.api.v1 import (admin, ai, alerts, analytics, api_keys, audit, auth,
 from app.api.v1 import settings as settings_router
 from app.api.v1 import tasks
 from app.config import settings
+from app.core.http_client import close_http_clients
+from app.core.jwks import warm_sso_keys
 from app.core.logging import setup_logging
+from app.core.redis_client import close_redis, get_redis
 from app.db.session import engine
 
 # Configure logging on startup
@@ -56,8 +59,15 @@ async def lifespan(app: FastAPI):
     # Startup logic
     logger = structlog.get_logger()
     logger.info("application_started", environment="production")
+    # Shared Redis pool for OTP, rate limits, caches and notifications
+    get_redis()
+    # SSO signing keys are fetched off the startup path
+    warm_keys = asyncio.create_task(warm_sso_keys())
     yield
-    # Shutdown logic (if any)
+    # Shutdown logic
+    warm_keys.cancel()
+    await close_redis()
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -236,9 +246,7 @@ async def health_check():
         database_status = "disconnected"
 
     try:
-        redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-        await redis_client.ping()
-        await redis_client.aclose()
+        await get_redis().ping()
     except Exception:
         redis_status = "disconnected"
 
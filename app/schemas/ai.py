@@ -1,4 +1,4 @@
-from typing import Dict, Literal
+from typing import Dict, Generic, Literal, TypeVar
 
 from pydantic import UUID4, BaseModel, Field
 
@@ -222,3 +222,13 @@ class HarvestOptimizationResponse(BaseModel):
     risk_factors: List[str] = Field(
         ..., description="Potential risks of waiting (e.g. mortality spike at late age)"
     )
+
+
+# --- Batch advisory
+T = TypeVar("T")
+
+
+class BatchAdvisoryRequest(BaseModel, Generic[T]):
+    items: List[T] = Field(
+        ..., min_length=1, description="One request per flock, answered in any order"
+    )
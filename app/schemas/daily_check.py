@@ -184,6 +184,46 @@ class EventData(BaseModel):
     )
 
 
+# Bulk ingest (offline backlog upload)
+class BulkEventItem(EventData):
+    """One event in a bulk upload, carrying its own flock and date."""
+
+    flock_id: UUID4
+    event_date: date = Field(default_factory=date.today)
+
+
+class BulkEventIngest(BaseModel):
+    """Backlog of events across flocks, deduplicated on ``data.event_id``."""
+
+    events: List[BulkEventItem] = Field(..., min_length=1, max_length=5000)
+
+
+class BulkEventStatus(str, Enum):
+    """Outcome of a single item in a bulk upload."""
+
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    REJECTED = "rejected"
+
+
+class BulkEventResult(BaseModel):
+    """Per-item outcome, in request order."""
+
+    index: int
+    event_id: UUID4
+    status: BulkEventStatus
+    detail: Optional[str] = None
+
+
+class BulkEventIngestResponse(BaseModel):
+    """Summary of a bulk upload."""
+
+    created: int
+    duplicates: int
+    rejected: int
+    results: List[BulkEventResult]
+
+
 # Daily check schema (batch endpoint)
 class DailyCheckCreate(BaseModel):
     """Batch submission of daily check with multiple events.
@@ -1,5 +1,6 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 
 class AIProvider(ABC):
@@ -8,6 +9,12 @@ class AIProvider(ABC):
     Subclasses should handle provider-specific authentication, HTTP parsing, and structured completions.
     """
 
+    # Identify the upstream in cache keys and metrics
+    name: str = ""
+    model: str = ""
+    # Can answer several packed items in one JSON reply (batch advisory)
+    supports_batching: bool = False
+
     @abstractmethod
     async def generate_structured_response(
         self,
@@ -15,12 +22,31 @@ class AIProvider(ABC):
         user_prompt: str,
         json_schema: Dict[str, Any],
         image_base64: str = None,
+        cache_key: str = None,
     ) -> Dict[str, Any]:
         """
         Request a structured JSON response from the LLM provider.
+        ``cache_key`` names the (static) system prompt for providers that
+        cache prompt prefixes.
         """
         pass
 
+    async def stream_structured_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: Dict[str, Any],
+        cache_key: str = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the text of the JSON response as it is generated. Providers
+        without streaming support yield the whole answer once.
+        """
+        result = await self.generate_structured_response(
+            system_prompt, user_prompt, json_schema, cache_key=cache_key
+        )
+        yield json.dumps(result)
+
     @abstractmethod
     async def transcribe_audio(self, audio_bytes: bytes, filename: str) -> str:
         """
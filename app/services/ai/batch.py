@@ -0,0 +1,213 @@
+"""
+Batch advisory: answer one endpoint's question for many flocks at once.
+
+``advise_many`` serves what it can from the AI response cache and sends the
+rest to the provider. Uncached items are
+packed, AI_BATCH_PACK_SIZE at a time, into a single multi-item prompt when
+the provider ``supports_batching``; a packed answer that does not parse is
+retried item by item. At most AI_BATCH_CONCURRENCY provider calls run at
+once and each is bounded by AI_BATCH_ITEM_TIMEOUT_SECONDS. Results are
+yielded as they complete, so callers can stream them; closing the iterator
+(e.g. on client disconnect) cancels the calls still in flight.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from app.config import settings
+
+from .base import AIProvider
+from .cache import ai_cache
+from .prompts import PROMPTS
+
+logger = logging.getLogger(__name__)
+
+_PACKED_INSTRUCTIONS = """
+
+You will receive several independent flocks, each headed "ITEM <n>".
+Answer each one on its own and return a JSON object {"items": [...]} holding
+one answer per item, in the same order, each matching the schema above.
+"""
+
+
+@dataclass
+class BatchResult:
+    index: int
+    result: Optional[BaseModel] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    def to_json(self) -> str:
+        result = self.result.model_dump(mode="json") if self.result else None
+        return json.dumps(
+            {
+                "index": self.index,
+                "result": result,
+                "error": self.error,
+                "cached": self.cached,
+            }
+        )
+
+
+@lru_cache(maxsize=None)
+def _packed_system_prompt(endpoint: str) -> str:
+    return PROMPTS[endpoint].system_prompt + _PACKED_INSTRUCTIONS
+
+
+@lru_cache(maxsize=None)
+def _packed_schema(endpoint: str) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {
+            "items": {"type": "array", "items": PROMPTS[endpoint].json_schema}
+        },
+        "required": ["items"],
+    }
+
+
+class _BatchRun:
+    def __init__(
+        self,
+        endpoint: str,
+        provider: AIProvider,
+        payloads: List[BaseModel],
+        fields: Optional[Callable[[BaseModel], Dict[str, Any]]],
+    ):
+        self.endpoint = endpoint
+        self.prompt = PROMPTS[endpoint]
+        self.provider = provider
+        self.payloads = payloads
+        self.fields = [fields(p) if fields else {} for p in payloads]
+        self.semaphore = asyncio.Semaphore(settings.AI_BATCH_CONCURRENCY)
+
+    def context(self, index: int) -> str:
+        """Cache context of an item: the local engine's figures, if any."""
+        return self.fields[index].get("figures", "")
+
+    def _render(self, index: int) -> str:
+        return self.prompt.render(payload=self.payloads[index], **self.fields[index])
+
+    async def _call(self, system_prompt, user_prompt, json_schema, cache_key):
+        async with self.semaphore:
+            return await asyncio.wait_for(
+                self.provider.generate_structured_response(
+                    system_prompt, user_prompt, json_schema, cache_key=cache_key
+                ),
+                timeout=settings.AI_BATCH_ITEM_TIMEOUT_SECONDS,
+            )
+
+    async def _finish(self, index: int, raw: Dict[str, Any]) -> BatchResult:
+        response = self.prompt.response_model(**raw)
+        await ai_cache.store(
+            self.endpoint,
+            self.provider,
+            self.payloads[index],
+            response,
+            self.prompt.version,
+            self.context(index),
+        )
+        return BatchResult(index, response)
+
+    async def single(self, index: int) -> List[BatchResult]:
+        try:
+            raw = await self._call(
+                self.prompt.system_prompt,
+                self._render(index),
+                self.prompt.json_schema,
+                self.prompt.cache_key,
+            )
+            return [await self._finish(index, raw)]
+        except asyncio.TimeoutError:
+            return [BatchResult(index, error="AI provider timed out")]
+        except Exception as e:
+            return [BatchResult(index, error=str(e))]
+
+    async def packed(self, indexes: Sequence[int]) -> List[BatchResult]:
+        user_prompt = "\n".join(
+            f"ITEM {n}:{self._render(index)}" for n, index in enumerate(indexes)
+        )
+        try:
+            raw = await self._call(
+                _packed_system_prompt(self.endpoint),
+                user_prompt,
+                _packed_schema(self.endpoint),
+                f"{self.prompt.cache_key}:packed",
+            )
+        except asyncio.TimeoutError:
+            return [BatchResult(i, error="AI provider timed out") for i in indexes]
+        except Exception as e:
+            return [BatchResult(i, error=str(e)) for i in indexes]
+
+        try:
+            answers = raw["items"]
+            if len(answers) != len(indexes):
+                raise ValueError(
+                    f"expected {len(indexes)} answers, got {len(answers)}"
+                )
+            return [
+                await self._finish(index, answer)
+                for index, answer in zip(indexes, answers)
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            # Includes pydantic's ValidationError
+            logger.warning(
+                f"Packed {self.endpoint} answer unusable, retrying singly: {e}"
+            )
+        results = await asyncio.gather(*(self.single(i) for i in indexes))
+        return [r for batch in results for r in batch]
+
+
+async def advise_many(
+    endpoint: str,
+    provider: AIProvider,
+    payloads: Sequence[BaseModel],
+    fields: Optional[Callable[[BaseModel], Dict[str, Any]]] = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    Yield a ``BatchResult`` per payload, in completion order. ``fields``
+    returns the user-section values a payload's template needs besides the
+    payload itself; its ``figures`` value, if any, is part of the cache key.
+    """
+    prompt = PROMPTS[endpoint]
+    run = _BatchRun(endpoint, provider, list(payloads), fields)
+
+    cached = await asyncio.gather(
+        *(
+            ai_cache.lookup(
+                endpoint,
+                provider,
+                payload,
+                prompt.response_model,
+                prompt.version,
+                run.context(index),
+            )
+            for index, payload in enumerate(run.payloads)
+        )
+    )
+    pending = []
+    for index, response in enumerate(cached):
+        if response is None:
+            pending.append(index)
+        else:
+            yield BatchResult(index, response, cached=True)
+
+    size = settings.AI_BATCH_PACK_SIZE if provider.supports_batching else 1
+    chunks = [pending[i : i + size] for i in range(0, len(pending), size)]
+    tasks = [
+        asyncio.create_task(
+            run.packed(chunk) if len(chunk) > 1 else run.single(chunk[0])
+        )
+        for chunk in chunks
+    ]
+    try:
+        for done in asyncio.as_completed(tasks):
+            for result in await done:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,246 @@
+"""
+Content-addressed cache of structured AI responses.
+
+A response is stored in Redis under a hash of the endpoint, provider, model,
+response schema and the *normalized* request: strings are case- and
+whitespace-folded, unordered lists sorted, and numeric fields rounded to the
+significant figures in the endpoint's ``CachePolicy``, so "Ross 308, 21 days,
+0.912 kg" and "ross 308, 21 days, 0.908 kg" share one upstream call. Buckets
+are relative, so small flocks and weights are never rounded to zero.
+
+Normalization applies to the key only; prompts are always rendered from the
+request as sent. Endpoints whose figures come from the local engine pass them
+as ``context``, which is keyed exactly, so a cached narrative always matches
+the figures it is served with.
+
+Hits and misses are counted per endpoint in a Redis hash (``stats()``).
+Redis errors bypass the cache rather than failing the request.
+"""
+import hashlib
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import (Any, Awaitable, Callable, Dict, Optional, Tuple, Type,
+                    TypeVar)
+
+import redis.asyncio as redis
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.redis_client import get_redis
+
+from .base import AIProvider
+
+logger = logging.getLogger(__name__)
+
+_KEY = "ai_cache:{digest}"
+_STATS_KEY = "ai_cache:stats"
+
+R = TypeVar("R", bound=BaseModel)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How one endpoint's requests are keyed and how long answers live."""
+
+    ttl_seconds: int
+    # field name -> significant figures kept for numeric inputs
+    significant_figures: Dict[str, int] = field(default_factory=dict)
+    # list fields whose order does not matter
+    unordered: Tuple[str, ...] = ()
+    # fields left out of the key (ids that do not change the answer)
+    exclude: Tuple[str, ...] = ()
+    # fields keyed byte-for-byte (not case-folded), e.g. encoded images
+    verbatim: Tuple[str, ...] = ()
+
+
+_HOUR = 3600
+
+POLICIES: Dict[str, CachePolicy] = {
+    "feed-recommendation": CachePolicy(
+        ttl_seconds=24 * _HOUR,
+        significant_figures={"current_avg_weight_kg": 2, "bird_count": 2},
+    ),
+    "harvest-prediction": CachePolicy(
+        ttl_seconds=24 * _HOUR,
+        significant_figures={"current_avg_weight_kg": 2, "target_weight_kg": 2},
+    ),
+    "fcr-insights": CachePolicy(
+        ttl_seconds=12 * _HOUR,
+        significant_figures={
+            "total_feed_consumed_kg": 2,
+            "current_avg_weight_kg": 2,
+            "initial_bird_count": 2,
+            "current_bird_count": 2,
+        },
+    ),
+    "mortality-analysis": CachePolicy(ttl_seconds=_HOUR, exclude=("flock_id",)),
+    "disease-risk": CachePolicy(
+        ttl_seconds=6 * _HOUR,
+        unordered=("symptoms", "recent_vaccinations"),
+        verbatim=("image_base64",),
+    ),
+    "harvest-optimization": CachePolicy(
+        ttl_seconds=6 * _HOUR,
+        significant_figures={
+            "current_avg_weight_kg": 2,
+            "feed_cost_per_kg": 2,
+            "expected_sale_price_per_kg": 2,
+        },
+        exclude=("flock_id",),
+    ),
+}
+
+
+def _normalize_value(value):
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, list):
+        return [_normalize_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize_value(v) for k, v in value.items()}
+    return value
+
+
+def _round_significant(value, figures: int):
+    """``value`` to ``figures`` significant figures; zero stays zero."""
+    if not value:
+        return value
+    rounded = round(value, figures - 1 - math.floor(math.log10(abs(value))))
+    return int(rounded) if isinstance(value, int) else rounded
+
+
+class AIResponseCache:
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        return self._redis or get_redis()
+
+    @staticmethod
+    def key(
+        endpoint: str,
+        provider: AIProvider,
+        payload: BaseModel,
+        response_model: Type[BaseModel],
+        version: str = "",
+        context: str = "",
+    ) -> str:
+        policy = POLICIES.get(endpoint) or CachePolicy(ttl_seconds=0)
+        fields = {}
+        for name, value in payload.model_dump(mode="json").items():
+            if name in policy.exclude:
+                continue
+            if name not in policy.verbatim:
+                value = _normalize_value(value)
+            if name in policy.significant_figures:
+                value = _round_significant(value, policy.significant_figures[name])
+            elif name in policy.unordered and value is not None:
+                value = sorted(value)
+            fields[name] = value
+        identity = {
+            "endpoint": endpoint,
+            "provider": provider.name,
+            "model": provider.model,
+            "schema": response_model.__name__,
+            "version": version,
+            "payload": fields,
+            "context": context,
+        }
+        digest = hashlib.sha256(
+            json.dumps(identity, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+        return _KEY.format(digest=digest)
+
+    async def lookup(
+        self,
+        endpoint: str,
+        provider: AIProvider,
+        payload: BaseModel,
+        response_model: Type[R],
+        version: str = "",
+        context: str = "",
+    ) -> Optional[R]:
+        """The cached answer for ``payload`` (or one that normalizes alike)."""
+        if endpoint not in POLICIES or not settings.AI_CACHE_ENABLED:
+            return None
+        key = self.key(endpoint, provider, payload, response_model, version, context)
+        try:
+            cached = await self.redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"AI cache unavailable: {e}")
+            return None
+
+        await self._count(endpoint, "miss" if cached is None else "hit")
+        if cached is None:
+            return None
+        return response_model.model_validate_json(cached)
+
+    async def store(
+        self,
+        endpoint: str,
+        provider: AIProvider,
+        payload: BaseModel,
+        response: BaseModel,
+        version: str = "",
+        context: str = "",
+    ) -> None:
+        policy = POLICIES.get(endpoint)
+        if policy is None or not settings.AI_CACHE_ENABLED:
+            return
+        key = self.key(endpoint, provider, payload, type(response), version, context)
+        try:
+            await self.redis_client.set(
+                key, response.model_dump_json(), ex=policy.ttl_seconds
+            )
+        except RedisError as e:
+            logger.warning(f"AI cache write failed: {e}")
+
+    async def get_or_generate(
+        self,
+        endpoint: str,
+        provider: AIProvider,
+        payload: BaseModel,
+        response_model: Type[R],
+        generate: Callable[[], Awaitable[Dict[str, Any]]],
+        version: str = "",
+        context: str = "",
+    ) -> R:
+        """
+        Serve ``endpoint``'s answer for ``payload`` from the cache, or await
+        ``generate`` for the provider's raw JSON, validate it as
+        ``response_model`` and cache it. ``context`` is keyed alongside the
+        payload (see the module docstring).
+        """
+        cached = await self.lookup(
+            endpoint, provider, payload, response_model, version, context
+        )
+        if cached is not None:
+            return cached
+        response = response_model(**await generate())
+        await self.store(endpoint, provider, payload, response, version, context)
+        return response
+
+    async def _count(self, endpoint: str, outcome: str) -> None:
+        try:
+            await self.redis_client.hincrby(_STATS_KEY, f"{endpoint}:{outcome}", 1)
+        except RedisError:
+            pass
+
+    async def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hits, misses and hit ratio per endpoint (all workers)."""
+        raw = await self.redis_client.hgetall(_STATS_KEY)
+        stats: Dict[str, Dict[str, float]] = {}
+        for name, count in raw.items():
+            endpoint, _, outcome = name.rpartition(":")
+            stats.setdefault(endpoint, {"hit": 0, "miss": 0})[outcome] = int(count)
+        for counts in stats.values():
+            total = counts["hit"] + counts["miss"]
+            counts["hit_ratio"] = round(counts["hit"] / total, 3) if total else 0.0
+        return stats
+
+
+ai_cache = AIResponseCache()
@@ -0,0 +1,318 @@
+"""
+Deterministic local answers for the numeric AI endpoints.
+
+FCR, days to target weight and the profit-maximizing harvest day are
+arithmetic on the flock's numbers and the breed's growth curve
+(``app.core.growth_curves``), so they are computed here rather than by an
+LLM. Each function returns a complete response with templated advice; the
+endpoints serve it as is in fast mode (or with no provider configured), and
+otherwise ask the LLM only for the narrative fields listed in
+``LOCAL_ANSWERS`` and keep the figures computed here (``merge``).
+
+Curves are expanded to daily tables at import, so an answer costs a few
+table lookups.
+"""
+import bisect
+import json
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from pydantic import BaseModel
+
+from app.core.growth_curves import (BREED_CURVES, CURVE_INTERVAL_DAYS,
+                                    DAILY_MORTALITY, DEFAULT_BREED)
+from app.schemas.ai import (FcrInsightsRequest, FcrInsightsResponse,
+                            HarvestOptimizationRequest,
+                            HarvestOptimizationResponse,
+                            HarvestPredictionRequest,
+                            HarvestPredictionResponse)
+
+# Days ahead considered when looking for the best harvest day
+HARVEST_HORIZON_DAYS = 21
+# Growth relative to the curve counted as on track
+ON_TRACK_TOLERANCE = 0.05
+FCR_BENCHMARK = 1.6
+
+
+def _interpolate(values: List[float], x: float) -> float:
+    """Linear interpolation; extrapolates the last segment past the end."""
+    if x <= 0:
+        return values[0]
+    i = min(int(x), len(values) - 2)
+    return values[i] + (values[i + 1] - values[i]) * (x - i)
+
+
+@dataclass(frozen=True)
+class GrowthCurve:
+    breed: str
+    # Per day of age: body weight and cumulative feed eaten, kg per bird
+    weight_kg: List[float]
+    feed_kg: List[float]
+
+    @classmethod
+    def from_weekly(cls, breed: str, weight_g, cumulative_fcr) -> "GrowthCurve":
+        weekly_weight = [w / 1000 for w in weight_g]
+        weekly_feed = [w * fcr for w, fcr in zip(weekly_weight, cumulative_fcr)]
+        days = range((len(weight_g) - 1) * CURVE_INTERVAL_DAYS + 1)
+        return cls(
+            breed,
+            [_interpolate(weekly_weight, d / CURVE_INTERVAL_DAYS) for d in days],
+            [_interpolate(weekly_feed, d / CURVE_INTERVAL_DAYS) for d in days],
+        )
+
+    def weight_at(self, age: float) -> float:
+        return _interpolate(self.weight_kg, age)
+
+    def feed_at(self, age: float) -> float:
+        return _interpolate(self.feed_kg, age)
+
+    def daily_gain_g(self, age: float) -> float:
+        return (self.weight_at(age + 1) - self.weight_at(age)) * 1000
+
+    def age_for_weight(self, weight_kg: float) -> float:
+        """The (fractional) age at which the curve reaches ``weight_kg``."""
+        i = bisect.bisect_left(self.weight_kg, weight_kg)
+        i = min(max(i, 1), len(self.weight_kg) - 1)
+        low, high = self.weight_kg[i - 1], self.weight_kg[i]
+        return max(0.0, i - 1 + (weight_kg - low) / (high - low))
+
+
+CURVES: Dict[str, GrowthCurve] = {
+    breed: GrowthCurve.from_weekly(breed, **data)
+    for breed, data in BREED_CURVES.items()
+}
+
+
+def curve_for(breed: str) -> Tuple[GrowthCurve, bool]:
+    """The breed's curve, and whether it is the breed's own (not the default)."""
+    wanted = "".join(breed.lower().split())
+    for name, curve in CURVES.items():
+        key = "".join(name.lower().split())
+        if key in wanted or key.rstrip("0123456789") == wanted:
+            return curve, True
+    return CURVES[DEFAULT_BREED], False
+
+
+def _daily_mortality(age: float) -> float:
+    rate = DAILY_MORTALITY[0][1]
+    for from_age, daily in DAILY_MORTALITY:
+        if age >= from_age:
+            rate = daily
+    return rate
+
+
+def _curve_note(curve: GrowthCurve, known: bool, breed: str) -> List[str]:
+    if known:
+        return []
+    return [
+        f"Projection uses the {curve.breed} curve; '{breed}' has no reference curve."
+    ]
+
+
+def fcr_insights(payload: FcrInsightsRequest) -> FcrInsightsResponse:
+    mass = payload.current_avg_weight_kg * payload.current_bird_count
+    if mass <= 0:
+        raise ValueError("Current flock weight must be above zero to compute FCR")
+    fcr = payload.total_feed_consumed_kg / mass
+    if fcr < 1.6:
+        status = "EXCELLENT"
+    elif fcr <= 1.9:
+        status = "GOOD"
+    else:
+        status = "POOR"
+
+    difference = abs(fcr - FCR_BENCHMARK) * mass
+    explanation = (
+        f"Each kg of live weight took {fcr:.2f} kg of feed. At the "
+        f"{FCR_BENCHMARK} benchmark this flock's {mass:,.0f} kg would have needed "
+        f"{difference:,.0f} kg {'more' if fcr < FCR_BENCHMARK else 'less'} feed."
+    )
+
+    recommendations = []
+    if payload.initial_bird_count > 0:
+        mortality = 1 - payload.current_bird_count / payload.initial_bird_count
+        if mortality > 0.05:
+            recommendations.append(
+                f"Mortality is {mortality:.1%}: birds that died ate feed without "
+                "adding weight, which inflates FCR. Review the causes."
+            )
+    if status == "POOR":
+        recommendations += [
+            "Check feeders for spillage and set their height level with the "
+            "birds' backs.",
+            "Check feed quality and storage; mouldy or stale feed raises FCR.",
+            "FCR worsens as birds age; consider harvesting sooner.",
+        ]
+    elif status == "GOOD":
+        recommendations += [
+            "Cut feed wastage: fill feeders no more than one-third full.",
+            "Keep the house within the birds' comfort temperature so feed goes "
+            "to growth, not heat.",
+        ]
+    else:
+        recommendations.append(
+            "Feed efficiency is excellent; keep the current feeding routine."
+        )
+
+    return FcrInsightsResponse(
+        estimated_fcr=round(fcr, 2),
+        benchmark_status=status,
+        cost_impact_explanation=explanation,
+        recommendations=recommendations,
+    )
+
+
+def harvest_prediction(payload: HarvestPredictionRequest) -> HarvestPredictionResponse:
+    curve, known = curve_for(payload.breed)
+    expected = curve.weight_at(payload.flock_age_days)
+    ratio = payload.current_avg_weight_kg / expected
+    if ratio > 1 + ON_TRACK_TOLERANCE:
+        status = "AHEAD"
+    elif ratio < 1 - ON_TRACK_TOLERANCE:
+        status = "DELAYED"
+    else:
+        status = "ON_TRACK"
+
+    # Project from where the flock actually is on the curve, not its age
+    growth_age = curve.age_for_weight(payload.current_avg_weight_kg)
+    remaining = curve.age_for_weight(payload.target_weight_kg) - growth_age
+    days = max(0, math.ceil(round(remaining, 6)))
+
+    recommendations = []
+    if status == "DELAYED":
+        recommendations.append(
+            f"Birds are {1 - ratio:.0%} below the {curve.breed} curve for day "
+            f"{payload.flock_age_days} ({expected:.2f} kg): check feed and water "
+            "access and house temperature."
+        )
+    elif status == "AHEAD":
+        recommendations.append(
+            f"Birds are {ratio - 1:.0%} ahead of the {curve.breed} curve; watch "
+            "for leg problems and heat stress."
+        )
+    else:
+        recommendations.append(
+            f"Growth is on the {curve.breed} curve; keep the current programme."
+        )
+    if days == 0:
+        recommendations.append(
+            "Target weight reached: plan the harvest now, as every extra day "
+            "costs feed at a rising FCR."
+        )
+    else:
+        recommendations.append(
+            f"Weigh a sample of birds weekly to confirm the {days}-day finish."
+        )
+    recommendations += _curve_note(curve, known, payload.breed)
+
+    return HarvestPredictionResponse(
+        estimated_days_to_target=days,
+        daily_gain_estimate_g=round(curve.daily_gain_g(growth_age), 1),
+        status_flag=status,
+        recommendations=recommendations,
+    )
+
+
+def _profit_by_day(
+    payload: HarvestOptimizationRequest, curve: GrowthCurve
+) -> List[Tuple[int, float]]:
+    """
+    Per-bird profit of selling each day from today: expected sale value of a
+    surviving bird, minus the feed eaten from today until then.
+    """
+    growth_age = curve.age_for_weight(payload.current_avg_weight_kg)
+    feed_now = curve.feed_at(growth_age)
+    survival = 1.0
+    profits = []
+    for ahead in range(HARVEST_HORIZON_DAYS + 1):
+        if ahead:
+            survival *= 1 - _daily_mortality(payload.current_age_days + ahead)
+        age = growth_age + ahead
+        revenue = survival * curve.weight_at(age) * payload.expected_sale_price_per_kg
+        feed_cost = (curve.feed_at(age) - feed_now) * payload.feed_cost_per_kg
+        profits.append((payload.current_age_days + ahead, revenue - feed_cost))
+    return profits
+
+
+def harvest_optimization(
+    payload: HarvestOptimizationRequest,
+) -> HarvestOptimizationResponse:
+    curve, known = curve_for(payload.breed)
+    profits = _profit_by_day(payload, curve)
+    best_age, best_profit = max(profits, key=lambda p: p[1])
+    today = profits[0][1]
+
+    if best_age == payload.current_age_days:
+        reasoning = (
+            "Selling now maximizes profit: from here each day's feed costs more "
+            "than the weight it adds is worth."
+        )
+    else:
+        reasoning = (
+            f"Each day until day {best_age}, the weight gained is worth more than "
+            f"the feed it takes; selling then adds {best_profit - today:,.2f} KES "
+            f"per bird over selling today. Profit is per bird: sale value less the "
+            f"feed still to be eaten, at {payload.feed_cost_per_kg:g} KES/kg feed "
+            f"and {payload.expected_sale_price_per_kg:g} KES/kg live weight."
+        )
+
+    risk_factors = [
+        f"Sale price is assumed to hold at "
+        f"{payload.expected_sale_price_per_kg:g} KES/kg until harvest."
+    ]
+    if best_age > 42:
+        risk_factors.append(
+            "Mortality from heat stress and leg disorders rises after day 42."
+        )
+    if best_age > 49:
+        risk_factors.append(
+            "Very heavy birds may sell at a discount where buyers prefer smaller "
+            "birds."
+        )
+    risk_factors += _curve_note(curve, known, payload.breed)
+
+    return HarvestOptimizationResponse(
+        optimal_harvest_age_days=best_age,
+        projected_profit_at_optimal=round(best_profit, 2),
+        daily_profit_trend=[
+            {"age_days": age, "profit_per_bird": round(profit, 2)}
+            for age, profit in profits[1:8]
+        ],
+        reasoning=reasoning,
+        risk_factors=risk_factors,
+    )
+
+
+@dataclass(frozen=True)
+class LocalAnswer:
+    compute: Callable[[BaseModel], BaseModel]
+    # Fields the LLM may write; everything else comes from ``compute``
+    narrative: Tuple[str, ...]
+
+
+LOCAL_ANSWERS: Dict[str, LocalAnswer] = {
+    "fcr-insights": LocalAnswer(
+        fcr_insights, ("cost_impact_explanation", "recommendations")
+    ),
+    "harvest-prediction": LocalAnswer(harvest_prediction, ("recommendations",)),
+    "harvest-optimization": LocalAnswer(
+        harvest_optimization, ("reasoning", "risk_factors")
+    ),
+}
+
+
+def figures(endpoint: str, answer: BaseModel) -> str:
+    """The computed (non-narrative) fields, as lines for the user prompt."""
+    narrative = LOCAL_ANSWERS[endpoint].narrative
+    return "\n".join(
+        f"- {name}: {json.dumps(value)}"
+        for name, value in answer.model_dump(mode="json").items()
+        if name not in narrative
+    )
+
+
+def merge(endpoint: str, local: BaseModel, answer: BaseModel) -> BaseModel:
+    """``local`` with the LLM's narrative fields from ``answer``."""
+    narrative = LOCAL_ANSWERS[endpoint].narrative
+    return local.model_copy(update={name: getattr(answer, name) for name in narrative})
@@ -1,10 +1,11 @@
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 import httpx
 
 from app.config import settings
+from app.core.http_client import get_http_client
 
 from .base import AIProvider
 
@@ -12,10 +13,14 @@ logger = logging.getLogger(__name__)
 
 
 class GeminiProvider(AIProvider):
+    name = "gemini"
+    supports_batching = True
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or getattr(settings, "LLM_API_KEY", "")
         self.model = getattr(settings, "GEMINI_MODEL", "gemini-1.5-flash")
         self.base_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
+        self.stream_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:streamGenerateContent"
 
     async def generate_structured_response(
         self,
@@ -23,6 +28,7 @@ class GeminiProvider(AIProvider):
         user_prompt: str,
         json_schema: Dict[str, Any],
         image_base64: str = None,
+        cache_key: str = None,
     ) -> Dict[str, Any]:
         """
         Hit Google Gemini 1.5 using manual HTTP.
@@ -32,11 +38,74 @@ class GeminiProvider(AIProvider):
 
         url = f"{self.base_url}?key={self.api_key}"
         headers = {"Content-Type": "application/json"}
-        combined_text = (
-            f"SYSTEM INSTRUCTIONS:\n{system_prompt}\n\nUSER PROMPT:\n{user_prompt}"
-        )
+        payload = self._payload(system_prompt, user_prompt, image_base64)
+
+        client = get_http_client(url)
+        try:
+            response = await client.post(url, headers=headers, json=payload)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Gemini API Http Error: {e.response.status_code}")
+            raise ValueError(
+                f"Gemini API Error: HTTP {e.response.status_code}"
+            ) from None
+        except Exception as e:
+            logger.error(f"Gemini API Connection failed: {str(e)}")
+            raise ValueError("Gemini API connection failed") from None
+
+        data = response.json()
+
+        try:
+            raw_content = data["candidates"][0]["content"]["parts"][0]["text"]
+            return json.loads(raw_content)
+        except (KeyError, IndexError) as e:
+            logger.error(f"Gemini response structure mismatch: {data}")
+            raise ValueError("AI Provider returned malformed response tree") from e
+        except json.JSONDecodeError as e:
+            logger.error(f"Gemini returned invalid JSON: {data}")
+            raise ValueError("AI Provider returned invalid JSON string") from e
+
+    async def stream_structured_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: Dict[str, Any],
+        cache_key: str = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the JSON answer's text via streamGenerateContent (SSE).
+        """
+        if not self.api_key:
+            raise ValueError("LLM_API_KEY not configured for Gemini")
 
-        parts = [{"text": combined_text}]
+        url = f"{self.stream_url}?alt=sse&key={self.api_key}"
+        headers = {"Content-Type": "application/json"}
+        payload = self._payload(system_prompt, user_prompt)
+
+        client = get_http_client(url)
+        try:
+            async with client.stream(
+                "POST", url, headers=headers, json=payload
+            ) as response:
+                if response.is_error:
+                    logger.error(f"Gemini API Http Error: {response.status_code}")
+                    raise ValueError(f"Gemini API Error: HTTP {response.status_code}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = json.loads(line[len("data: ") :])
+                    for candidate in data.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+        except httpx.HTTPError as e:
+            logger.error(f"Gemini API Connection failed: {str(e)}")
+            raise ValueError("Gemini API connection failed") from None
+
+    def _payload(
+        self, system_prompt: str, user_prompt: str, image_base64: str = None
+    ) -> Dict[str, Any]:
+        parts = [{"text": user_prompt}]
         if image_base64:
             parts.append(
                 {
@@ -47,7 +116,9 @@ class GeminiProvider(AIProvider):
                 }
             )
 
-        payload = {
+        # A separate system instruction keeps the static prompt a cacheable prefix
+        return {
+            "systemInstruction": {"parts": [{"text": system_prompt}]},
             "contents": [{"role": "user", "parts": parts}],
             "generationConfig": {
                 "temperature": 0.2,
@@ -55,31 +126,6 @@ class GeminiProvider(AIProvider):
             },
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Gemini API Http Error: {e.response.status_code}")
-                raise ValueError(
-                    f"Gemini API Error: HTTP {e.response.status_code}"
-                ) from None
-            except Exception as e:
-                logger.error(f"Gemini API Connection failed: {str(e)}")
-                raise ValueError("Gemini API connection failed") from None
-
-            data = response.json()
-
-            try:
-                raw_content = data["candidates"][0]["content"]["parts"][0]["text"]
-                return json.loads(raw_content)
-            except (KeyError, IndexError) as e:
-                logger.error(f"Gemini response structure mismatch: {data}")
-                raise ValueError("AI Provider returned malformed response tree") from e
-            except json.JSONDecodeError as e:
-                logger.error(f"Gemini returned invalid JSON: {data}")
-                raise ValueError("AI Provider returned invalid JSON string") from e
-
     async def transcribe_audio(
         self, audio_bytes: bytes, filename: str = "audio.wav"
     ) -> str:
@@ -112,12 +158,14 @@ class GeminiProvider(AIProvider):
             "generationConfig": {"temperature": 0.0},
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
-                return data["candidates"][0]["content"]["parts"][0]["text"]
-            except Exception as e:
-                logger.error(f"Gemini Transcription Error: {e}")
-                raise ValueError(f"Gemini transcription failed: {str(e)}")
+        client = get_http_client(url)
+        try:
+            response = await client.post(
+                url, headers=headers, json=payload, timeout=60.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+        except Exception as e:
+            logger.error(f"Gemini Transcription Error: {e}")
+            raise ValueError(f"Gemini transcription failed: {str(e)}")
@@ -1,10 +1,11 @@
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 import httpx
 
 from app.config import settings
+from app.core.http_client import get_http_client
 
 from .base import AIProvider
 
@@ -12,6 +13,10 @@ logger = logging.getLogger(__name__)
 
 
 class OpenAIProvider(AIProvider):
+    name = "openai"
+    model = "gpt-4-turbo-preview"  # Using a robust model for reasoning
+    supports_batching = True
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or getattr(settings, "LLM_API_KEY", "")
         self.base_url = "https://api.openai.com/v1/chat/completions"
@@ -22,20 +27,85 @@ class OpenAIProvider(AIProvider):
         user_prompt: str,
         json_schema: Dict[str, Any],
         image_base64: str = None,
+        cache_key: str = None,
     ) -> Dict[str, Any]:
         """
         Hit OpenAI and force the JSON parser mapping to our payload constraints.
         """
+        headers = self._headers()
+        payload = self._payload(system_prompt, user_prompt, cache_key)
+
+        client = get_http_client(self.base_url)
+        try:
+            response = await client.post(self.base_url, headers=headers, json=payload)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"OpenAI API Http Error: {e.response.status_code}")
+            raise ValueError(
+                f"OpenAI API Error: HTTP {e.response.status_code}"
+            ) from None
+        except Exception as e:
+            logger.error(f"OpenAI API Connection failed: {str(e)}")
+            raise ValueError("OpenAI API connection failed") from None
+
+        data = response.json()
+        raw_content = data["choices"][0]["message"]["content"]
+
+        try:
+            return json.loads(raw_content)
+        except json.JSONDecodeError as e:
+            logger.error(f"OpenAI returned malformed JSON: {raw_content}")
+            raise ValueError("AI Provider returned invalid JSON") from e
+
+    async def stream_structured_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: Dict[str, Any],
+        cache_key: str = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the JSON answer's content deltas (chat completions SSE).
+        """
+        headers = self._headers()
+        payload = self._payload(system_prompt, user_prompt, cache_key)
+        payload["stream"] = True
+
+        client = get_http_client(self.base_url)
+        try:
+            async with client.stream(
+                "POST", self.base_url, headers=headers, json=payload
+            ) as response:
+                if response.is_error:
+                    logger.error(f"OpenAI API Http Error: {response.status_code}")
+                    raise ValueError(f"OpenAI API Error: HTTP {response.status_code}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: ") :]
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        except httpx.HTTPError as e:
+            logger.error(f"OpenAI API Connection failed: {str(e)}")
+            raise ValueError("OpenAI API connection failed") from None
+
+    def _headers(self) -> Dict[str, str]:
         if not self.api_key:
             raise ValueError("LLM_API_KEY not configured for OpenAI")
-
-        headers = {
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
+    def _payload(
+        self, system_prompt: str, user_prompt: str, cache_key: str = None
+    ) -> Dict[str, Any]:
         payload = {
-            "model": "gpt-4-turbo-preview",  # Using a robust model for reasoning
+            "model": self.model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
@@ -43,30 +113,10 @@ class OpenAIProvider(AIProvider):
             "response_format": {"type": "json_object"},
             "temperature": 0.2,
         }
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    self.base_url, headers=headers, json=payload
-                )
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"OpenAI API Http Error: {e.response.status_code}")
-                raise ValueError(
-                    f"OpenAI API Error: HTTP {e.response.status_code}"
-                ) from None
-            except Exception as e:
-                logger.error(f"OpenAI API Connection failed: {str(e)}")
-                raise ValueError("OpenAI API connection failed") from None
-
-            data = response.json()
-            raw_content = data["choices"][0]["message"]["content"]
-
-            try:
-                return json.loads(raw_content)
-            except json.JSONDecodeError as e:
-                logger.error(f"OpenAI returned malformed JSON: {raw_content}")
-                raise ValueError("AI Provider returned invalid JSON") from e
+        if cache_key:
+            # Routes requests sharing the system prompt to the same prefix cache
+            payload["prompt_cache_key"] = cache_key
+        return payload
 
     async def transcribe_audio(
         self, audio_bytes: bytes, filename: str = "audio.wav"
@@ -90,12 +140,14 @@ class OpenAIProvider(AIProvider):
             "model": (None, "whisper-1"),
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(url, headers=headers, files=files)
-                response.raise_for_status()
-                data = response.json()
-                return data.get("text", "")
-            except Exception as e:
-                logger.error(f"OpenAI Whisper Error: {e}")
-                raise ValueError(f"Transcription failed: {str(e)}")
+        client = get_http_client(url)
+        try:
+            response = await client.post(
+                url, headers=headers, files=files, timeout=60.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data.get("text", "")
+        except Exception as e:
+            logger.error(f"OpenAI Whisper Error: {e}")
+            raise ValueError(f"Transcription failed: {str(e)}")
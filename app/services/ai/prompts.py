@@ -0,0 +1,218 @@
+"""
+Registry of the AI endpoints' prompts, compiled once at import.
+
+Each ``PromptTemplate`` holds an endpoint's static system prompt (instructions
+plus the rendered JSON schema of its response model), the schema dict passed
+to the provider, and a ``str.format`` template for the variable user section.
+Per request, endpoints only call ``render``.
+
+Because the system prompt is byte-identical across requests it forms a stable
+prefix that providers can cache: ``cache_key`` is sent as OpenAI's
+``prompt_cache_key`` and Gemini receives the prompt as ``systemInstruction``.
+``version`` (a digest of the prompt texts) is part of the AI response cache
+key, so editing a prompt invalidates the answers it produced.
+
+Templates of endpoints answered by the local engine (``engine.py``) take the
+computed ``figures``; the LLM only writes the narrative around them.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel
+
+from app.schemas.ai import (ChatResponse, DiseaseRiskResponse,
+                            FcrInsightsResponse, FeedRecommendationResponse,
+                            HarvestOptimizationResponse,
+                            HarvestPredictionResponse,
+                            MortalityAnalysisResponse,
+                            VoiceObservationResponse)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    instructions: str
+    response_model: Type[BaseModel]
+    user_template: str
+    # Append the response schema to the system prompt
+    include_schema: bool = True
+    system_prompt: str = field(init=False)
+    json_schema: Dict[str, Any] = field(init=False)
+    version: str = field(init=False)
+
+    def __post_init__(self):
+        schema = self.response_model.model_json_schema()
+        system_prompt = self.instructions
+        if self.include_schema:
+            system_prompt += (
+                f"\n\nEXPECTED JSON SCHEMA:\n{json.dumps(schema, indent=2)}"
+            )
+        version = hashlib.sha256(
+            (system_prompt + self.user_template).encode()
+        ).hexdigest()[:12]
+        object.__setattr__(self, "json_schema", schema)
+        object.__setattr__(self, "system_prompt", system_prompt)
+        object.__setattr__(self, "version", version)
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the static prefix to provider-side prompt caches."""
+        return f"{self.name}:{self.version}"
+
+    def render(self, **fields: Any) -> str:
+        """The user section for one request."""
+        return self.user_template.format(**fields)
+
+
+_TEMPLATES = (
+    PromptTemplate(
+        name="chat",
+        instructions="""
+You are a helpful East African poultry farming expert.
+Provide safe, practical advice for raising broilers securely.
+Return response STRICTLY as a JSON object matching the requested schema.
+""",
+        response_model=ChatResponse,
+        user_template="{message}",
+    ),
+    PromptTemplate(
+        name="feed-recommendation",
+        instructions="""
+You are an expert East African poultry farming AI assistant specialized in broiler management.
+Given the following flock data, calculate the optimal daily feed requirement in kilograms for the entire flock.
+Compare the current average weight against standard growth curves for the provided breed.
+If the current weight implies significant underfeeding or overfeeding, flag it.
+Return your response STRICTLY as a JSON object matching the requested schema exactly.
+""",
+        response_model=FeedRecommendationResponse,
+        user_template="""
+Flock Parameters:
+- Age: {payload.flock_age_days} days
+- Current Avg Weight: {payload.current_avg_weight_kg} kg
+- Breed: {payload.breed}
+- Total Birds: {payload.bird_count}
+
+Please analyze and generate the optimal daily feed in kilograms.
+""",
+    ),
+    PromptTemplate(
+        name="mortality-analysis",
+        instructions="""
+You are an expert East African poultry farming AI assistant specialized in mortality diagnostics for broilers.
+Given the following daily mortality logs and flock state, analyze the cumulative and daily mortality rate.
+Compare against acceptable broiler industry benchmarks (e.g. cumulative < 5% by day 42, daily spikes < 0.1%).
+Identify any potential disease triggers, thermal shock risks, or management errors based on given causes.
+Flag it if a threshold was exceeded.
+Return your response STRICTLY as a JSON object matching the requested schema exactly.
+""",
+        response_model=MortalityAnalysisResponse,
+        user_template="""
+Flock State:
+- Breed: {payload.breed}
+- Initial Birds: {payload.initial_bird_count}
+- Current Birds: {payload.current_bird_count}
+
+Recent Daily Mortality Logs:
+{mortality_log}
+
+Please analyze the spikes and generate a structured analytics report.
+""",
+    ),
+    PromptTemplate(
+        name="harvest-prediction",
+        instructions="""
+You are an expert East African poultry farming AI assistant.
+Compare the flock's current average weight against the target weight for the provided breed.
+Calculate days remaining to target based on standard daily weight gain metrics (g/day) for this lifecycle stage.
+Return response STRICTLY as a JSON object matching the requested schema.
+""",
+        response_model=HarvestPredictionResponse,
+        user_template="""
+Flock State:
+- Breed: {payload.breed}
+- Age: {payload.flock_age_days} days
+- Current Weight: {payload.current_avg_weight_kg} kg
+- Target Weight: {payload.target_weight_kg} kg
+
+Computed figures (use exactly as given; explain them and advise):
+{figures}
+""",
+    ),
+    PromptTemplate(
+        name="disease-risk",
+        instructions="""
+You are an expert East African poultry vet AI assistant.
+Analyze observed symptoms against common East African broiler diseases (NDV, IBD, Coccidiosis).
+Evaluate risk level mapping vaccines reported.
+Return response STRICTLY as a JSON object matching the requested schema.
+""",
+        response_model=DiseaseRiskResponse,
+        user_template="""
+Diagnostics:
+- Symptoms: {symptoms}
+- Recent Vaccinations: {vaccinations}
+- Mortality Risk: {payload.mortality_alert_level}
+""",
+    ),
+    PromptTemplate(
+        name="fcr-insights",
+        instructions="""
+You are an expert East African poultry economics AI assistant.
+Calculate the FCR = (Total Feed Consumed / Total Weight of current flock).
+State whether FCR is EXCELLENT (<1.6), GOOD (1.6-1.9), or POOR (>1.9).
+Explain cost impact scaling.
+Return response STRICTLY as a JSON object matching the requested schema.
+""",
+        response_model=FcrInsightsResponse,
+        user_template="""
+Stats:
+- Total Feed Consumed: {payload.total_feed_consumed_kg} kg
+- Total Flock Mass (est): {total_estimated_mass} kg
+  ({payload.current_avg_weight_kg}kg * {payload.current_bird_count} birds)
+
+Computed figures (use exactly as given; explain them and advise):
+{figures}
+""",
+    ),
+    PromptTemplate(
+        name="voice-record",
+        instructions="""
+You are an expert East African poultry management assistant.
+Extract structured observations from the following transcript.
+Look for: mortality counts, bird symptoms, mentioned equipment, or feed issues.
+Return response STRICTLY as a JSON object matching the requested schema.
+""",
+        response_model=VoiceObservationResponse,
+        user_template="Transcript: {transcript}",
+        include_schema=False,
+    ),
+    PromptTemplate(
+        name="harvest-optimization",
+        instructions="""
+You are an expert East African poultry economist.
+Analyze the provided flock data and market prices.
+Predict the optimal harvest date (in days of age) where profit is maximized.
+Profit = (Weight * Price) - (Feed Consumed * Feed Cost) - Other Costs.
+Note that FCR increases and growth rate slows as birds age past 42 days.
+Return response STRICTLY as a JSON object matching the requested schema.
+""",
+        response_model=HarvestOptimizationResponse,
+        user_template="""
+Flock Data:
+- ID: {payload.flock_id}
+- Age: {payload.current_age_days} days
+- Weight: {payload.current_avg_weight_kg} kg
+- Breed: {payload.breed}
+- Feed Cost: {payload.feed_cost_per_kg} KES/kg
+- Expected Bird Price: {payload.expected_sale_price_per_kg} KES/kg
+
+Computed figures (use exactly as given; explain them and advise):
+{figures}
+""",
+        include_schema=False,
+    ),
+)
+
+PROMPTS: Dict[str, PromptTemplate] = {t.name: t for t in _TEMPLATES}
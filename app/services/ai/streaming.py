@@ -0,0 +1,86 @@
+"""
+Helpers for streaming structured AI answers as server-sent events.
+
+Providers stream the raw JSON text of their answer. ``JSONStringFieldReader``
+decodes one string field (e.g. the chat ``response``) out of that partial
+JSON as it arrives, so clients can render text before the object is
+complete; the whole buffer is validated against the response model once the
+stream ends.
+"""
+import json
+import re
+from typing import Dict
+
+_ESCAPES: Dict[str, str] = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+def sse_event(event: str, data: str) -> str:
+    """Format one server-sent event (``data`` must be a single line)."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class JSONStringFieldReader:
+    """
+    Incrementally decode the top-level string ``field`` of a JSON object
+    whose text arrives in chunks. ``feed`` returns the newly decoded part of
+    the field; ``buffer`` holds everything received so far.
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.buffer = ""
+        self._pos = None  # Index of the next undecoded char of the value
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        text = self.buffer
+        if self.done:
+            return ""
+        if self._pos is None:
+            head = text.lstrip()
+            if head and not head.startswith("{"):
+                raise ValueError("AI provider did not stream a JSON object")
+            match = self._key.search(text)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        i = self._pos
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(text):
+                break  # Escape split across chunks
+            escape = text[i + 1]
+            if escape != "u":
+                out.append(_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            # \uXXXX, or a surrogate pair \uXXXX\uXXXX
+            end = i + 6
+            if end <= len(text) and 0xD800 <= int(text[i + 2 : end], 16) < 0xDC00:
+                end += 6
+            if end > len(text):
+                break
+            out.append(json.loads(f'"{text[i:end]}"'))
+            i = end
+        self._pos = i
+        return "".join(out)
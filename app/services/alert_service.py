@@ -1,12 +1,18 @@
+import logging
 from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
-from fastapi import BackgroundTasks
+from kombu.exceptions import OperationalError
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.alert import Alert
-from app.services.email_service import EmailService
+from app.db.models.user import User
+from app.services.notification_service import (NotificationChannel,
+                                               NotificationService)
+
+logger = logging.getLogger(__name__)
 
 
 class AlertService:
@@ -62,11 +68,12 @@ class AlertService:
         item_name: str,
         current_qty: float,
         min_qty: float,
-        background_tasks: BackgroundTasks,
+        recipient: User,
         flock_id: Optional[UUID] = None,
     ):
         """
-        Checks if inventory item is below minimum stock.
+        Checks if inventory item is below minimum stock, and if so queues an
+        email to ``recipient`` (delivered by the notifications worker).
         """
         if current_qty <= min_qty:
             # Create Alert
@@ -78,11 +85,20 @@ class AlertService:
                 alert_type="low_stock",
             )
 
-            # Send Email via Background Task
-            subject = f"Alert: Low Stock for {item_name}"
-            content = f"<h3>Low Stock Warning</h3><p>Item <b>{item_name}</b> is running low.</p><p>Current Quantity: {current_qty}</p><p>Please purchase more.</p>"
-            recipients = ["farmer@example.com"]  # Placeholder
-
-            background_tasks.add_task(
-                EmailService.send_email, recipients, subject, content
-            )
+            if recipient.email:
+                subject = f"Alert: Low Stock for {item_name}"
+                content = f"<h3>Low Stock Warning</h3><p>Item <b>{item_name}</b> is running low.</p><p>Current Quantity: {current_qty}</p><p>Please purchase more.</p>"
+                # The alert is already committed; a Redis or broker outage
+                # must not fail the caller's request
+                try:
+                    await NotificationService().enqueue(
+                        NotificationChannel.EMAIL,
+                        recipient.email,
+                        subject,
+                        content,
+                        dedupe_key=f"low_stock:{recipient.id}:{item_name}",
+                    )
+                except (RedisError, OperationalError) as e:
+                    logger.error(
+                        f"Could not queue low stock email for {item_name}: {e}"
+                    )
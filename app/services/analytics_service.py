@@ -2,13 +2,14 @@ from datetime import date, timedelta
 from typing import Any, Dict, List
 from uuid import UUID
 
-from sqlalchemy import and_, desc, func, literal_column, select
+from sqlalchemy import desc, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.events import (FeedConsumptionEvent, MortalityEvent,
-                                  WeightMeasurementEvent)
+from app.db.fanout import fan_out
+from app.db.models.events import MortalityEvent
 from app.db.models.finance import Expenditure, Sale
 from app.db.models.flock import Flock
+from app.db.models.flock_stats import FlockStats
 from app.db.models.user import User
 
 
@@ -19,179 +20,131 @@ class AnalyticsService:
     async def get_dashboard_metrics(self, current_user: User) -> Dict[str, Any]:
         """
         Calculates all dashboard metrics using bulk SQL queries instead of per-flock loops.
+
+        The queries are independent of each other, so they are issued together
+        through ``fan_out`` and the endpoint waits only for the slowest one.
         """
-        # 1. Fetch all active flocks for this user
-        active_flocks_stmt = select(Flock).filter(
-            Flock.farmer_id == current_user.id, Flock.status == "active"
+        # 1. Active flocks with their running totals from flock_stats
+        # (primary-key join; no event-table scans on the request path)
+        active_flocks_stmt = (
+            select(Flock, FlockStats)
+            .outerjoin(FlockStats, FlockStats.flock_id == Flock.id)
+            .filter(Flock.farmer_id == current_user.id, Flock.status == "active")
         )
-        active_flocks_res = await self.db.execute(active_flocks_stmt)
-        active_flocks = active_flocks_res.scalars().all()
-        flock_ids = [f.id for f in active_flocks]
-        active_flocks_count = len(flock_ids)
-
-        if not flock_ids:
-            # Fallback for users with no active flocks, still want global stats
-            return await self._get_empty_dashboard_fallback(current_user)
 
-        # 2. Bulk Aggregates per flock
-        # We fetch totals for all active flocks in single group-by passes
-
-        mortality_stmt = (
-            select(
-                MortalityEvent.flock_id, func.sum(MortalityEvent.count).label("total")
-            )
-            .filter(MortalityEvent.flock_id.in_(flock_ids))
-            .group_by(MortalityEvent.flock_id)
+        # 2. Global Stats
+        total_revenue_stmt = select(func.sum(Sale.total_amount)).filter(
+            Sale.farmer_id == current_user.id
         )
-
-        sales_stmt = (
-            select(Sale.flock_id, func.sum(Sale.quantity).label("total"))
-            .filter(Sale.flock_id.in_(flock_ids))
-            .group_by(Sale.flock_id)
+        total_expenses_stmt = select(func.sum(Expenditure.amount)).filter(
+            Expenditure.farmer_id == current_user.id
         )
-
-        feed_stmt = (
-            select(
-                FeedConsumptionEvent.flock_id,
-                func.sum(FeedConsumptionEvent.quantity_kg).label("total"),
-            )
-            .filter(FeedConsumptionEvent.flock_id.in_(flock_ids))
-            .group_by(FeedConsumptionEvent.flock_id)
+        all_mortality_stmt = select(
+            func.sum(Flock.initial_count), func.sum(FlockStats.total_mortality)
+        ).outerjoin(FlockStats, FlockStats.flock_id == Flock.id).filter(
+            Flock.farmer_id == current_user.id
         )
 
-        # Execute these in semi-parallel (awaited independently here for simplicity but better than N+1)
-        mort_data = {r[0]: r[1] for r in (await self.db.execute(mortality_stmt)).all()}
-        sale_data = {r[0]: r[1] for r in (await self.db.execute(sales_stmt)).all()}
-        feed_data = {r[0]: r[1] for r in (await self.db.execute(feed_stmt)).all()}
-
-        # 3. Latest Weight per Flock (The "Hard" Query)
-        # We use a subquery to find the latest date per flock
-        latest_weight_date_sub = (
-            select(
-                WeightMeasurementEvent.flock_id,
-                func.max(WeightMeasurementEvent.event_date).label("max_date"),
-            )
-            .filter(WeightMeasurementEvent.flock_id.in_(flock_ids))
-            .group_by(WeightMeasurementEvent.flock_id)
-            .subquery()
+        (
+            active_flocks_res,
+            total_revenue_res,
+            total_expenses_res,
+            all_mortality_res,
+            *recent_res,
+        ) = await fan_out(
+            self.db,
+            active_flocks_stmt,
+            total_revenue_stmt,
+            total_expenses_stmt,
+            all_mortality_stmt,
+            *self._recent_activity_statements(current_user.id),
         )
 
-        # Join to get the weight for that date
-        latest_weight_stmt = select(
-            WeightMeasurementEvent.flock_id, WeightMeasurementEvent.average_weight_grams
-        ).join(
-            latest_weight_date_sub,
-            and_(
-                WeightMeasurementEvent.flock_id == latest_weight_date_sub.c.flock_id,
-                WeightMeasurementEvent.event_date == latest_weight_date_sub.c.max_date,
-            ),
+        active_flocks = active_flocks_res.all()
+        total_revenue = total_revenue_res.scalar() or 0
+        total_expenses = total_expenses_res.scalar() or 0
+        recent_activities = self._format_recent_activities(
+            *(res.scalars().all() for res in recent_res)
         )
-        weight_data = {
-            r[0]: r[1] for r in (await self.db.execute(latest_weight_stmt)).all()
-        }
 
-        # 4. Integrate results
+        if not active_flocks:
+            # Users with no active flocks still want global stats
+            return {
+                "active_flocks": 0,
+                "current_birds": 0,
+                "total_revenue": float(total_revenue),
+                "total_expenses": float(total_expenses),
+                "net_profit": float(total_revenue - total_expenses),
+                "mortality_rate": 0,
+                "fcr_rate": 0,
+                "recent_activities": recent_activities,
+            }
+
+        # 3. Integrate results
         total_current_birds = 0
         total_feed = 0
         total_live_weight_kg = 0
 
-        for flock in active_flocks:
-            morts = mort_data.get(flock.id, 0)
-            sales = sale_data.get(flock.id, 0)
-            feed = feed_data.get(flock.id, 0)
-            weight_g = weight_data.get(flock.id, 0)
+        for flock, stats in active_flocks:
+            if stats is None:
+                # Not rolled up yet (rebuild_flock_stats reconciles these)
+                total_current_birds += flock.initial_count
+                continue
 
-            current_birds = flock.initial_count - morts - sales
+            current_birds = stats.current_birds
             total_current_birds += current_birds
-            total_feed += float(feed)
+            total_feed += float(stats.total_feed_kg)
 
+            weight_g = stats.latest_weight_grams
             avg_weight_kg = float(weight_g) / 1000.0 if weight_g else 0
             total_live_weight_kg += current_birds * avg_weight_kg
 
         fcr_rate = total_feed / total_live_weight_kg if total_live_weight_kg > 0 else 0
 
-        # 5. Global Stats
-        total_revenue_res = await self.db.execute(
-            select(func.sum(Sale.total_amount)).filter(
-                Sale.farmer_id == current_user.id
-            )
-        )
-        total_expenses_res = await self.db.execute(
-            select(func.sum(Expenditure.amount)).filter(
-                Expenditure.farmer_id == current_user.id
-            )
-        )
-
-        total_revenue = total_revenue_res.scalar() or 0
-        total_expenses = total_expenses_res.scalar() or 0
-
         # mortality global
-        all_initial_res = await self.db.execute(
-            select(func.sum(Flock.initial_count)).filter(
-                Flock.farmer_id == current_user.id
-            )
-        )
-        all_mort_res = await self.db.execute(
-            select(func.sum(MortalityEvent.count))
-            .join(Flock)
-            .filter(Flock.farmer_id == current_user.id)
-        )
-
-        all_initial = all_initial_res.scalar() or 0
-        all_mort = all_mort_res.scalar() or 0
+        all_initial, all_mort = all_mortality_res.one()
+        all_initial = all_initial or 0
+        all_mort = all_mort or 0
         mortality_rate = (all_mort / all_initial * 100) if all_initial > 0 else 0
 
         return {
-            "active_flocks": active_flocks_count,
+            "active_flocks": len(active_flocks),
             "current_birds": max(0, total_current_birds),
             "total_revenue": float(total_revenue),
             "total_expenses": float(total_expenses),
             "net_profit": float(total_revenue - total_expenses),
             "mortality_rate": round(mortality_rate, 2),
             "fcr_rate": round(fcr_rate, 2),
-            "recent_activities": await self._get_recent_activities(current_user.id),
+            "recent_activities": recent_activities,
         }
 
-    async def _get_empty_dashboard_fallback(self, current_user: User) -> Dict[str, Any]:
-        """Returns global metrics only when no active flocks exist."""
-        # Simple implementation for fallback
-        rev = (
-            await self.db.execute(
-                select(func.sum(Sale.total_amount)).filter(
-                    Sale.farmer_id == current_user.id
-                )
-            )
-        ).scalar() or 0
-        exp = (
-            await self.db.execute(
-                select(func.sum(Expenditure.amount)).filter(
-                    Expenditure.farmer_id == current_user.id
-                )
-            )
-        ).scalar() or 0
-        return {
-            "active_flocks": 0,
-            "current_birds": 0,
-            "total_revenue": float(rev),
-            "total_expenses": float(exp),
-            "net_profit": float(rev - exp),
-            "mortality_rate": 0,
-            "fcr_rate": 0,
-            "recent_activities": await self._get_recent_activities(current_user.id),
-        }
+    @staticmethod
+    def _recent_activity_statements(user_id: UUID) -> List[Any]:
+        """Latest sales, expenses and mortalities feeding the activity feed."""
+        return [
+            select(Sale)
+            .filter(Sale.farmer_id == user_id)
+            .order_by(desc(Sale.date))
+            .limit(2),
+            select(Expenditure)
+            .filter(Expenditure.farmer_id == user_id)
+            .order_by(desc(Expenditure.date))
+            .limit(2),
+            select(MortalityEvent)
+            .join(Flock)
+            .filter(Flock.farmer_id == user_id)
+            .order_by(desc(MortalityEvent.event_date))
+            .limit(2),
+        ]
 
-    async def _get_recent_activities(self, user_id: UUID) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _format_recent_activities(
+        sales: List[Sale], expenses: List[Expenditure], mortalities: List[MortalityEvent]
+    ) -> List[Dict[str, Any]]:
         """Consolidates latest events across all domains into a feed."""
         activities = []
 
-        # Sales
-        res = await self.db.execute(
-            select(Sale)
-            .filter(Sale.farmer_id == user_id)
-            .order_by(desc(Sale.date))
-            .limit(2)
-        )
-        for s in res.scalars().all():
+        for s in sales:
             activities.append(
                 {
                     "title": "Sale Recorded",
@@ -201,14 +154,7 @@ class AnalyticsService:
                 }
             )
 
-        # Expenses
-        res = await self.db.execute(
-            select(Expenditure)
-            .filter(Expenditure.farmer_id == user_id)
-            .order_by(desc(Expenditure.date))
-            .limit(2)
-        )
-        for e in res.scalars().all():
+        for e in expenses:
             activities.append(
                 {
                     "title": "Expense Recorded",
@@ -218,15 +164,7 @@ class AnalyticsService:
                 }
             )
 
-        # Mortalities
-        res = await self.db.execute(
-            select(MortalityEvent)
-            .join(Flock)
-            .filter(Flock.farmer_id == user_id)
-            .order_by(desc(MortalityEvent.event_date))
-            .limit(2)
-        )
-        for m in res.scalars().all():
+        for m in mortalities:
             activities.append(
                 {
                     "title": "Mortality Recorded",
@@ -254,10 +192,10 @@ class AnalyticsService:
         if not user_ids:
             return {"fcr_avg": 0, "mortality_avg": 0, "sample_size": 0}
 
-        # 2. Mortality Average
+        # 2. Mortality Average (from the flock_stats rollup)
         mortality_stmt = (
-            select(func.sum(MortalityEvent.count), func.sum(Flock.initial_count))
-            .join(Flock, Flock.id == MortalityEvent.flock_id)
+            select(func.sum(FlockStats.total_mortality), func.sum(Flock.initial_count))
+            .join(FlockStats, FlockStats.flock_id == Flock.id)
             .filter(Flock.farmer_id.in_(user_ids))
         )
 
@@ -7,6 +7,12 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import Base
+from app.db.models.events import (FeedConsumptionEvent, MortalityEvent,
+                                  WeightMeasurementEvent)
+from app.services.flock_stats_service import FlockStatsService
+
+# Event types that feed the flock_stats rollup
+_STATS_MODELS = (MortalityEvent, FeedConsumptionEvent, WeightMeasurementEvent)
 
 T = TypeVar("T", bound=Base)
 
@@ -37,6 +43,7 @@ class BaseEventService(Generic[T]):
         try:
             event = self.model(**event_data)
             self.db.add(event)
+            await self._refresh_flock_stats(event)
             await self.db.commit()
             await self.db.refresh(event)
             return event
@@ -88,9 +95,15 @@ class BaseEventService(Generic[T]):
             return False
 
         await self.db.delete(event)
+        await self._refresh_flock_stats(event)
         await self.db.commit()
         return True
 
+    async def _refresh_flock_stats(self, event: T) -> None:
+        """Keep the flock's rollup in the same transaction as the event write."""
+        if issubclass(self.model, _STATS_MODELS):
+            await FlockStatsService(self.db).refresh(event.flock_id)
+
     async def count_by_flock(self, flock_id: UUID) -> int:
         """Count total events for a flock"""
         # Optimized count? For now, list len or simple query
@@ -1,15 +1,18 @@
-from datetime import date
+import logging
+import time
+from datetime import date, datetime, timezone
 from typing import Any, Dict, List
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.daily_check import DailyCheck
-from app.services.feed_service import FeedConsumptionService
-from app.services.mortality_service import MortalityEventService
-from app.services.vaccination_service import VaccinationService
-from app.services.weight_service import WeightMeasurementService
+from app.schemas.daily_check import EventType
+from app.services.event_ingest_service import EventIngestService, PendingEvent
+
+logger = logging.getLogger(__name__)
 
 
 class DailyCheckService:
@@ -17,10 +20,6 @@ class DailyCheckService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.mortality_service = MortalityEventService(db)
-        self.feed_service = FeedConsumptionService(db)
-        self.vaccination_service = VaccinationService(db)
-        self.weight_service = WeightMeasurementService(db)
 
     async def process_daily_check(
         self,
@@ -30,16 +29,20 @@ class DailyCheckService:
         events: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
         """
-        Process daily check submission:
-        1. Create/update daily check record
-        2. Process all events with idempotency
-        3. Return summary
+        Process daily check submission in a single transaction:
+        1. Upsert the daily check record (ON CONFLICT on flock + date)
+        2. Insert all events per type, skipping known event_ids
+        3. Commit once and return a summary with per-stage timings (ms)
+
+        A failure at any stage leaves nothing behind.
         """
-        # Create or update daily check
-        check = await self._upsert_daily_check(flock_id, check_date, observations)
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
 
-        # Process events
-        events_processed = 0
+        check_id = await self._upsert_daily_check(flock_id, check_date, observations)
+        timings["check"] = time.perf_counter() - started
+
+        pending: List[PendingEvent] = []
         for event in events:
             # Handle Pydantic model inputs
             if hasattr(event, "model_dump"):
@@ -50,57 +53,57 @@ class DailyCheckService:
                 event_type = event.get("type")
                 event_data = event.get("data")
 
-            if not event_type or not event_data:
+            if not event_type or not event_data or "event_id" not in event_data:
                 continue
+            try:
+                event_type = EventType(event_type)
+            except ValueError:
+                continue
+            pending.append((event_type, flock_id, check_date, event_data))
 
-            # Add common fields
-            event_data["flock_id"] = flock_id
-            event_data["event_date"] = check_date
-
-            # Force Primary Key to match Idempotency Key (event_id)
-            if "event_id" in event_data:
-                event_data["id"] = event_data["event_id"]
+        mark = time.perf_counter()
+        if pending:
+            await EventIngestService(self.db).insert_events(
+                farmer_id=None, events=pending, sync_expenditures=False
+            )
+        timings["events"] = time.perf_counter() - mark
 
-            # Route to appropriate service
-            if event_type == "mortality":
-                await self.mortality_service.create_event(event_data)
-                events_processed += 1
-            elif event_type == "feed_consumption":
-                await self.feed_service.create_event(event_data)
-                events_processed += 1
-            elif event_type == "vaccination":
-                await self.vaccination_service.create_event(event_data)
-                events_processed += 1
-            elif event_type == "weight_measurement":
-                await self.weight_service.create_event(event_data)
-                events_processed += 1
+        mark = time.perf_counter()
+        await self.db.commit()
+        timings["commit"] = time.perf_counter() - mark
+        timings["total"] = time.perf_counter() - started
 
-        return {"check_id": check.id, "events_processed": events_processed}
+        timings = {stage: round(secs * 1000, 2) for stage, secs in timings.items()}
+        logger.info(
+            f"Daily check {flock_id}/{check_date}: {len(pending)} events, "
+            + ", ".join(f"{stage}={ms}ms" for stage, ms in timings.items())
+        )
+        return {
+            "check_id": check_id,
+            "events_processed": len(pending),
+            "timings": timings,
+        }
 
     async def _upsert_daily_check(
         self, flock_id: UUID, check_date: date, observations: Dict[str, Any]
-    ) -> DailyCheck:
-        """Create or update daily check (idempotent)"""
-        # Check for existing
-        result = await self.db.execute(
-            select(DailyCheck).filter(
-                DailyCheck.flock_id == flock_id, DailyCheck.check_date == check_date
-            )
+    ) -> UUID:
+        """
+        Create or update the daily check in one statement (idempotent).
+        Observations sent as None keep the stored value.
+        """
+        stmt = insert(DailyCheck).values(
+            flock_id=flock_id, check_date=check_date, **observations
         )
-        existing = result.scalars().first()
-
-        if existing:
-            # Update existing
-            for key, value in observations.items():
-                if value is not None:
-                    setattr(existing, key, value)
-            await self.db.commit()
-            await self.db.refresh(existing)
-            return existing
-
-        # Create new
-        check = DailyCheck(flock_id=flock_id, check_date=check_date, **observations)
-        self.db.add(check)
-        await self.db.commit()
-        await self.db.refresh(check)
-        return check
+        table = DailyCheck.__table__
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_flock_daily_check",
+            set_={
+                **{
+                    key: func.coalesce(stmt.excluded[key], table.c[key])
+                    for key in observations
+                },
+                "updated_at": datetime.now(timezone.utc),
+            },
+        ).returning(DailyCheck.id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one()
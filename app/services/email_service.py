@@ -1,36 +1,244 @@
+"""
+Pooled SMTP transport.
+
+Connections are opened lazily, do STARTTLS and login once, and are then kept
+and reused for up to SMTP_MAX_MESSAGES_PER_CONNECTION messages or until idle
+for SMTP_POOL_IDLE_SECONDS. A batch of messages is split across at most
+SMTP_POOL_SIZE connections, each sending its share back to back in one
+session, so a burst of mail costs one TLS handshake per connection instead of
+one per message.
+
+smtplib is blocking, so each connection's work runs in a worker thread; the
+pool size bounds both open SMTP sessions and threads in use.
+"""
+import asyncio
+import logging
 import smtplib
-import sys
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import List
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Sequence
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Connection:
+    smtp: smtplib.SMTP
+    last_used: float = field(default_factory=time.monotonic)
+    sent: int = 0
+
+
+class SMTPPool:
+    """Bounded pool of authenticated SMTP sessions."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        size: int = 4,
+        idle_seconds: float = 60,
+        max_messages: int = 100,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._idle: List[_Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.metrics: Dict[str, float] = {
+            "connections_opened": 0,
+            "messages_sent": 0,
+            "messages_failed": 0,
+            "send_seconds": 0.0,
+        }
+
+    # Blocking helpers (run in threads) ------------------------------------
+
+    def _open(self) -> _Connection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        self.metrics["connections_opened"] += 1
+        return _Connection(smtp)
 
-class EmailService:
     @staticmethod
-    def send_email(recipients: List[str], subject: str, content: str):
+    def _close(conn: _Connection) -> None:
+        try:
+            conn.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.smtp.close()
+
+    def _usable(self, conn: _Connection) -> bool:
+        return (
+            conn.sent < self.max_messages
+            and time.monotonic() - conn.last_used < self.idle_seconds
+        )
+
+    def _send_all(
+        self, conn: Optional[_Connection], messages: Sequence[EmailMessage]
+    ) -> tuple:
         """
-        Sends an email using the configured SMTP server.
-        Assuming synchronous smtplib usage intended for background tasks.
+        Send ``messages`` over one session; returns (connection, failures).
+        When no session can be opened, the messages not yet sent count as
+        failed, so messages already accepted are never reported as failures.
         """
-        if not settings.SMTP_HOST or not settings.SMTP_USER:
-            print(f"MOCK EMAIL SENT TO {recipients}: {subject}")
-            print(content)
-            return
+        failures = 0
+        for n, message in enumerate(messages):
+            for attempt in (1, 2):
+                if conn is None or not self._usable(conn):
+                    if conn is not None:
+                        self._close(conn)
+                        conn = None
+                    try:
+                        conn = self._open()
+                    except OSError as e:  # Includes smtplib.SMTPException
+                        logger.error(f"Could not open SMTP session: {e}")
+                        return None, failures + len(messages) - n
+                try:
+                    conn.smtp.send_message(message)
+                    conn.sent += 1
+                    conn.last_used = time.monotonic()
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped an idle session: reconnect once
+                    conn = None
+                    if attempt == 2:
+                        failures += 1
+                except smtplib.SMTPException as e:
+                    logger.error(f"Failed to send email to {message['To']}: {e}")
+                    failures += 1
+                    break
+                except OSError as e:
+                    # Connection broke mid-session: reconnect once
+                    logger.warning(f"SMTP connection error, reconnecting: {e}")
+                    self._close(conn)
+                    conn = None
+                    if attempt == 2:
+                        failures += 1
+        return conn, failures
 
-        try:
-            msg = MIMEMultipart()
-            msg["From"] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
-            msg["To"] = ", ".join(recipients)
-            msg["Subject"] = subject
+    # Async API -------------------------------------------------------------
+
+    async def send(self, messages: Sequence[EmailMessage]) -> int:
+        """
+        Send ``messages`` using up to ``size`` pooled sessions concurrently.
+        Returns how many were accepted by the server.
+        """
+        if not messages:
+            return 0
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
 
-            msg.attach(MIMEText(content, "html"))
+        shares = min(self.size, len(messages))
+        chunks = [messages[i::shares] for i in range(shares)]
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._send_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        self.metrics["send_seconds"] += time.perf_counter() - started
 
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                server.starttls()
-                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                server.send_message(msg)
+        sent = 0
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.error(f"SMTP session failed: {result}")
+                failed = len(chunk)
+            else:
+                failed = result
+            sent += len(chunk) - failed
+            self.metrics["messages_failed"] += failed
+        self.metrics["messages_sent"] += sent
+        logger.debug(f"SMTP pool stats: {self.stats()}")
+        return sent
 
-        except Exception as e:
-            print(f"Failed to send email: {e}", file=sys.stderr)
+    async def _send_chunk(self, chunk: Sequence[EmailMessage]) -> int:
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            conn, failures = await asyncio.to_thread(self._send_all, conn, chunk)
+            if conn is not None:
+                self._idle.append(conn)
+            return failures
+
+    def stats(self) -> Dict[str, float]:
+        """Throughput counters since start."""
+        stats = dict(self.metrics)
+        seconds = stats["send_seconds"]
+        stats["messages_per_second"] = (
+            round(stats["messages_sent"] / seconds, 2) if seconds else 0.0
+        )
+        stats["idle_connections"] = len(self._idle)
+        return stats
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await asyncio.to_thread(self._close, conn)
+
+
+_pool: Optional[SMTPPool] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    """Process-wide pool built from settings."""
+    global _pool
+    if _pool is None:
+        _pool = SMTPPool(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            starttls=settings.SMTP_STARTTLS,
+            size=settings.SMTP_POOL_SIZE,
+            idle_seconds=settings.SMTP_POOL_IDLE_SECONDS,
+            max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        )
+    return _pool
+
+
+class EmailService:
+    @staticmethod
+    def build_message(
+        recipients: List[str], subject: str, content: str
+    ) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        msg["To"] = ", ".join(recipients)
+        msg["Subject"] = subject
+        msg.set_content(content, subtype="html")
+        return msg
+
+    @staticmethod
+    async def send_email(recipients: List[str], subject: str, content: str) -> bool:
+        """Sends one email through the pooled SMTP transport."""
+        sent = await EmailService.send_bulk(
+            [EmailService.build_message(recipients, subject, content)]
+        )
+        return sent == 1
+
+    @staticmethod
+    async def send_bulk(messages: Sequence[EmailMessage]) -> int:
+        """
+        Sends many emails, reusing pooled sessions. Returns the number sent.
+        Without SMTP configuration (no host, or no login for a STARTTLS
+        server) the messages are only logged.
+        """
+        if not settings.SMTP_HOST or (
+            settings.SMTP_STARTTLS and not settings.SMTP_USER
+        ):
+            for msg in messages:
+                logger.info(f"MOCK EMAIL SENT TO {msg['To']}: {msg['Subject']}")
+            return len(messages)
+        return await get_smtp_pool().send(messages)
@@ -0,0 +1,226 @@
+import logging
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models.events import (FeedConsumptionEvent, MortalityEvent,
+                                  VaccinationEvent, WeightMeasurementEvent)
+from app.db.models.finance import Expenditure
+from app.db.models.flock import Flock
+from app.schemas.daily_check import BulkEventItem, BulkEventStatus, EventType
+from app.services.flock_stats_service import FlockStatsService
+
+logger = logging.getLogger(__name__)
+
+EVENT_MODELS = {
+    EventType.MORTALITY: MortalityEvent,
+    EventType.FEED_CONSUMPTION: FeedConsumptionEvent,
+    EventType.VACCINATION: VaccinationEvent,
+    EventType.WEIGHT_MEASUREMENT: WeightMeasurementEvent,
+}
+
+# Event types whose cost is mirrored into an expenditure (as in events.py)
+_COSTED = {
+    EventType.FEED_CONSUMPTION: (
+        "feed",
+        "feed",
+        lambda data, flock: f"Feed: {data['feed_type']} for flock {flock}",
+    ),
+    EventType.VACCINATION: (
+        "medicine",
+        "vaccination",
+        lambda data, flock: f"Vaccination: {data['vaccine_name']} for flock {flock}",
+    ),
+}
+
+# (event type, flock id, event date, event payload incl. event_id)
+PendingEvent = Tuple[EventType, UUID, date, Dict[str, Any]]
+
+
+class EventIngestService:
+    """
+    Set-based event writes.
+
+    Events are inserted with one multi-row
+    ``INSERT ... ON CONFLICT (event_id) DO NOTHING RETURNING event_id`` per
+    event type, so already-synced events are skipped without a lookup and
+    the caller learns exactly which rows were new. Nothing here commits;
+    ``ingest`` commits once per batch and ``insert_events`` leaves that to
+    the caller.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def insert_events(
+        self,
+        farmer_id: Optional[UUID],
+        events: List[PendingEvent],
+        flock_names: Optional[Dict[UUID, str]] = None,
+        sync_expenditures: bool = True,
+    ) -> Set[UUID]:
+        """
+        Insert ``events`` (flocks already verified), refresh the rollup of
+        touched flocks, and return the event_ids that were newly created.
+
+        With ``sync_expenditures`` new costed events also get their linked
+        expenditure, as the single-event endpoints do.
+        """
+        flock_names = flock_names or {}
+        now = datetime.now(timezone.utc)
+        by_type: Dict[EventType, List[Dict[str, Any]]] = {}
+        for event_type, flock_id, event_date, data in events:
+            model = EVENT_MODELS[event_type]
+            columns = model.__table__.columns
+            row = {k: v for k, v in data.items() if k in columns}
+            row.update(
+                id=data["event_id"],
+                flock_id=flock_id,
+                event_date=event_date,
+                created_at=now,
+                updated_at=now,
+            )
+            row.setdefault("event_time", datetime.now().time())
+            by_type.setdefault(event_type, []).append(row)
+
+        created: Set[UUID] = set()
+        expenditures: List[Dict[str, Any]] = []
+        touched_flocks: Set[UUID] = set()
+
+        for event_type, rows in by_type.items():
+            model = EVENT_MODELS[event_type]
+            # Multi-row VALUES needs the same keys on every row
+            keys = set().union(*rows)
+            rows = [{k: row.get(k) for k in keys} for row in rows]
+            result = await self.db.execute(
+                insert(model)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["event_id"])
+                .returning(model.event_id)
+            )
+            new_ids = set(result.scalars().all())
+            created |= new_ids
+
+            for row in rows:
+                if row["event_id"] not in new_ids:
+                    continue
+                touched_flocks.add(row["flock_id"])
+                cost = row.get("cost_ksh")
+                if (
+                    sync_expenditures
+                    and event_type in _COSTED
+                    and cost
+                    and cost > 0
+                ):
+                    category, related_type, describe = _COSTED[event_type]
+                    expenditures.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "farmer_id": farmer_id,
+                            "flock_id": row["flock_id"],
+                            "date": row["event_date"],
+                            "category": category,
+                            "description": describe(
+                                row, flock_names.get(row["flock_id"], "")
+                            ),
+                            "amount": Decimal(str(cost)),
+                            "related_id": row["id"],
+                            "related_type": related_type,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    )
+
+        if expenditures:
+            await self.db.execute(insert(Expenditure).values(expenditures))
+        await FlockStatsService(self.db).refresh(*touched_flocks)
+        return created
+
+    async def ingest(
+        self, farmer_id: UUID, items: List[BulkEventItem]
+    ) -> Dict[str, Any]:
+        """
+        Ingest a backlog of events across the farmer's flocks.
+
+        Items on unknown flocks or repeating an event_id earlier in the same
+        request are rejected up front. The rest are written in batches of
+        BULK_INGEST_BATCH_SIZE, each committed once; a batch that fails is
+        rolled back and its items reported as rejected.
+        """
+        flock_ids = {item.flock_id for item in items}
+        result = await self.db.execute(
+            select(Flock.id, Flock.name).filter(
+                Flock.id.in_(flock_ids), Flock.farmer_id == farmer_id
+            )
+        )
+        flock_names = {fid: name for fid, name in result.all()}
+
+        outcomes: List[Optional[Tuple[BulkEventStatus, Optional[str]]]] = [
+            None
+        ] * len(items)
+        accepted: List[Tuple[int, PendingEvent]] = []
+        seen: Set[UUID] = set()
+        for index, item in enumerate(items):
+            data = item.data.model_dump()
+            if item.flock_id not in flock_names:
+                outcomes[index] = (BulkEventStatus.REJECTED, "Flock not found")
+            elif data["event_id"] in seen:
+                outcomes[index] = (
+                    BulkEventStatus.DUPLICATE,
+                    "Repeated in request",
+                )
+            else:
+                seen.add(data["event_id"])
+                accepted.append(
+                    (index, (item.type, item.flock_id, item.event_date, data))
+                )
+
+        batch_size = settings.BULK_INGEST_BATCH_SIZE
+        for start in range(0, len(accepted), batch_size):
+            batch = accepted[start : start + batch_size]
+            try:
+                created = await self.insert_events(
+                    farmer_id, [event for _, event in batch], flock_names
+                )
+                await self.db.commit()
+            except SQLAlchemyError as e:
+                await self.db.rollback()
+                logger.warning(f"Bulk event batch rejected: {e}")
+                for index, _ in batch:
+                    outcomes[index] = (
+                        BulkEventStatus.REJECTED,
+                        "Batch failed to save",
+                    )
+                continue
+
+            for index, (_, _, _, data) in batch:
+                if data["event_id"] in created:
+                    outcomes[index] = (BulkEventStatus.CREATED, None)
+                else:
+                    outcomes[index] = (BulkEventStatus.DUPLICATE, None)
+
+        results = [
+            {
+                "index": index,
+                "event_id": item.data.event_id,
+                "status": status,
+                "detail": detail,
+            }
+            for index, (item, (status, detail)) in enumerate(zip(items, outcomes))
+        ]
+        return {
+            "created": sum(r["status"] == BulkEventStatus.CREATED for r in results),
+            "duplicates": sum(
+                r["status"] == BulkEventStatus.DUPLICATE for r in results
+            ),
+            "rejected": sum(r["status"] == BulkEventStatus.REJECTED for r in results),
+            "results": results,
+        }
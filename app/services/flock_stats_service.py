@@ -0,0 +1,136 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.events import (FeedConsumptionEvent, MortalityEvent,
+                                  WeightMeasurementEvent)
+from app.db.models.finance import Sale
+from app.db.models.flock import Flock
+from app.db.models.flock_stats import FlockStats
+
+
+class FlockStatsService:
+    """
+    Maintains the ``flock_stats`` rollup.
+
+    Write paths call ``refresh`` with the affected flock ids before they
+    commit, so the rollup changes in the same transaction as the events.
+    Each refresh recomputes the flock's totals from its own rows (all indexed
+    by flock_id), which keeps updates and deletes as simple as inserts. It
+    first locks the flock rows, so concurrent writers to one flock refresh in
+    turn and each aggregate sees the other's committed events.
+    ``rebuild`` recomputes every flock to reconcile any drift.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _upsert_stmt(flock_filter=None):
+        """INSERT ... SELECT ... ON CONFLICT (flock_id) DO UPDATE for the flocks matched."""
+        mortality = (
+            select(func.coalesce(func.sum(MortalityEvent.count), 0))
+            .where(MortalityEvent.flock_id == Flock.id)
+            .scalar_subquery()
+        )
+        sold = (
+            select(func.coalesce(func.sum(Sale.quantity), 0))
+            .where(Sale.flock_id == Flock.id)
+            .scalar_subquery()
+        )
+        feed = (
+            select(func.coalesce(func.sum(FeedConsumptionEvent.quantity_kg), 0))
+            .where(FeedConsumptionEvent.flock_id == Flock.id)
+            .scalar_subquery()
+        )
+        latest_weight = (
+            select(WeightMeasurementEvent)
+            .where(WeightMeasurementEvent.flock_id == Flock.id)
+            .order_by(
+                WeightMeasurementEvent.event_date.desc(),
+                WeightMeasurementEvent.created_at.desc(),
+            )
+            .limit(1)
+        )
+
+        totals = select(
+            Flock.id.label("flock_id"),
+            Flock.initial_count.label("initial_count"),
+            mortality.label("total_mortality"),
+            sold.label("total_sold"),
+            feed.label("total_feed_kg"),
+            latest_weight.with_only_columns(
+                WeightMeasurementEvent.average_weight_grams
+            ).scalar_subquery().label("latest_weight_grams"),
+            latest_weight.with_only_columns(
+                WeightMeasurementEvent.event_date
+            ).scalar_subquery().label("latest_weight_date"),
+        )
+        if flock_filter is not None:
+            totals = totals.where(flock_filter)
+        totals = totals.subquery()
+
+        current_birds = (
+            totals.c.initial_count - totals.c.total_mortality - totals.c.total_sold
+        )
+        live_weight_kg = current_birds * totals.c.latest_weight_grams / 1000
+        rows = select(
+            totals.c.flock_id,
+            totals.c.initial_count,
+            totals.c.total_mortality,
+            totals.c.total_sold,
+            current_birds,
+            totals.c.total_feed_kg,
+            totals.c.latest_weight_grams,
+            totals.c.latest_weight_date,
+            totals.c.total_feed_kg / func.nullif(live_weight_kg, 0),
+            func.now(),
+        )
+
+        columns = [
+            "flock_id",
+            "initial_count",
+            "total_mortality",
+            "total_sold",
+            "current_birds",
+            "total_feed_kg",
+            "latest_weight_grams",
+            "latest_weight_date",
+            "fcr",
+            "refreshed_at",
+        ]
+        stmt = insert(FlockStats).from_select(columns, rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[FlockStats.flock_id],
+            set_={c: getattr(stmt.excluded, c) for c in columns[1:]},
+        )
+
+    async def refresh(self, *flock_ids: Optional[UUID]) -> None:
+        """
+        Recompute the rollup for the given flocks in the current transaction.
+        Pending ORM changes are flushed first so the new rows are counted.
+        """
+        ids = {fid for fid in flock_ids if fid is not None}
+        if not ids:
+            return
+        await self.db.flush()
+        # Lock before aggregating (sorted, so writers cannot deadlock); the
+        # upsert's own snapshot then includes events committed while we waited.
+        # FOR NO KEY UPDATE, not FOR UPDATE: the rows flushed above already
+        # hold FOR KEY SHARE on the flock through their foreign key, which
+        # FOR UPDATE would conflict with, deadlocking two concurrent writers.
+        await self.db.execute(
+            select(Flock.id)
+            .where(Flock.id.in_(ids))
+            .order_by(Flock.id)
+            .with_for_update(key_share=True)
+        )
+        await self.db.execute(self._upsert_stmt(Flock.id.in_(ids)))
+
+    async def rebuild(self) -> None:
+        """Recompute the rollup for every flock and commit."""
+        await self.db.execute(self._upsert_stmt())
+        await self.db.commit()
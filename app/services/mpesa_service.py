@@ -5,6 +5,7 @@ import httpx
 import structlog
 
 from app.config import settings
+from app.core.http_client import get_http_client
 
 logger = structlog.get_logger(__name__)
 
@@ -24,16 +25,16 @@ class MpesaService:
             f"{settings.MPESA_BASE_URL}/oauth/v1/generate?grant_type=client_credentials"
         )
         logger.info("Fetching M-Pesa OAuth token")
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                auth_url,
-                auth=(settings.MPESA_CONSUMER_KEY, settings.MPESA_CONSUMER_SECRET),
-            )
-            response.raise_for_status()
-            token = response.json().get("access_token")
-            if not token:
-                raise ValueError("M-Pesa auth response missing access_token")
-            return token
+        response = await get_http_client(auth_url).get(
+            auth_url,
+            auth=(settings.MPESA_CONSUMER_KEY, settings.MPESA_CONSUMER_SECRET),
+            timeout=10,
+        )
+        response.raise_for_status()
+        token = response.json().get("access_token")
+        if not token:
+            raise ValueError("M-Pesa auth response missing access_token")
+        return token
 
     async def initiate_stk_push(self, phone: str, amount: int, reference: str) -> dict:
         """
@@ -80,15 +81,14 @@ class MpesaService:
         try:
             token = await self._get_auth_token()
             headers = {"Authorization": f"Bearer {token}"}
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(
-                    f"{settings.MPESA_BASE_URL}/mpesa/stkpush/v1/processrequest",
-                    json=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
-                logger.info("STK Push accepted by Safaricom", extra={"ref": reference})
-                return response.json()
+            response = await get_http_client(settings.MPESA_BASE_URL).post(
+                f"{settings.MPESA_BASE_URL}/mpesa/stkpush/v1/processrequest",
+                json=payload,
+                headers=headers,
+            )
+            response.raise_for_status()
+            logger.info("STK Push accepted by Safaricom", extra={"ref": reference})
+            return response.json()
 
         except httpx.HTTPStatusError as e:
             error_body = e.response.text
@@ -126,22 +126,22 @@ class MpesaService:
         try:
             token = await self._get_auth_token()
             headers = {"Authorization": f"Bearer {token}"}
-            async with httpx.AsyncClient(timeout=15) as client:
-                response = await client.post(
-                    f"{settings.MPESA_BASE_URL}/mpesa/stkpushquery/v1/query",
-                    json=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
-                result = response.json()
-                logger.info(
-                    "STK Query result",
-                    extra={
-                        "checkout_id": checkout_request_id,
-                        "code": result.get("ResultCode"),
-                    },
-                )
-                return result
+            response = await get_http_client(settings.MPESA_BASE_URL).post(
+                f"{settings.MPESA_BASE_URL}/mpesa/stkpushquery/v1/query",
+                json=payload,
+                headers=headers,
+                timeout=15,
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info(
+                "STK Query result",
+                extra={
+                    "checkout_id": checkout_request_id,
+                    "code": result.get("ResultCode"),
+                },
+            )
+            return result
 
         except httpx.HTTPStatusError as e:
             error_body = e.response.text
@@ -0,0 +1,184 @@
+"""
+Notification pipeline: enqueue in the request/worker, deliver on the
+``notifications`` Celery queue.
+
+``NotificationService.enqueue`` drops a message into a per-recipient Redis
+list and schedules one ``send_notification_task`` for that recipient and
+channel, delayed by NOTIFICATION_BATCH_WINDOW_SECONDS. Everything queued for
+the recipient in the meantime goes out as one digest, so an outbreak across a
+farmer's flocks is one email, not twenty. A dedupe key suppresses the same
+notification (e.g. the same alert) for NOTIFICATION_DEDUPE_WINDOW_SECONDS.
+"""
+import json
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import List, Optional
+
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.redis_client import get_redis
+from app.db.models.alert import Alert
+from app.db.models.flock import Flock
+from app.db.models.user import User
+
+_PENDING_KEY = "notifications:pending:{channel}:{recipient}"
+_SCHEDULED_KEY = "notifications:scheduled:{channel}:{recipient}"
+_DEDUPE_KEY = "notifications:dedupe:{channel}:{recipient}:{key}"
+
+
+class NotificationDeliveryError(Exception):
+    """Raised when a recipient's digest could not be delivered."""
+
+
+class NotificationChannel(str, Enum):
+    EMAIL = "email"
+    SMS = "sms"
+
+
+@dataclass
+class Notification:
+    """One queued message; ``subject`` is ignored for SMS"""
+
+    subject: str
+    body: str
+
+
+class NotificationService:
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self.redis_client = redis_client or get_redis()
+
+    async def enqueue(
+        self,
+        channel: NotificationChannel,
+        recipient: str,
+        subject: str,
+        body: str,
+        dedupe_key: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue a notification. Returns False when it was suppressed as a
+        duplicate of one sent within the dedupe window.
+        """
+        channel = NotificationChannel(channel)
+        if dedupe_key:
+            fresh = await self.redis_client.set(
+                _DEDUPE_KEY.format(
+                    channel=channel.value, recipient=recipient, key=dedupe_key
+                ),
+                1,
+                nx=True,
+                ex=settings.NOTIFICATION_DEDUPE_WINDOW_SECONDS,
+            )
+            if not fresh:
+                return False
+
+        keys = {"channel": channel.value, "recipient": recipient}
+        await self.redis_client.rpush(
+            _PENDING_KEY.format(**keys),
+            json.dumps(asdict(Notification(subject=subject, body=body))),
+        )
+
+        # First message in the window schedules the delivery for the batch
+        window = settings.NOTIFICATION_BATCH_WINDOW_SECONDS
+        scheduled = await self.redis_client.set(
+            _SCHEDULED_KEY.format(**keys), 1, nx=True, ex=window + 60
+        )
+        if scheduled:
+            from app.workers.tasks import send_notification_task
+
+            send_notification_task.apply_async(
+                args=[channel.value, recipient], countdown=window
+            )
+        return True
+
+    async def notify_alerts(self, db: AsyncSession, alerts: List[Alert]) -> int:
+        """
+        Queue notifications for new or escalated flock alerts to each flock's
+        owner: email always, SMS for critical alerts. Returns how many were
+        queued (duplicates within the dedupe window are skipped).
+        """
+        flock_ids = {alert.flock_id for alert in alerts if alert.flock_id}
+        if not flock_ids:
+            return 0
+        result = await db.execute(
+            select(Flock.id, Flock.name, User.email, User.phone_number)
+            .join(User, User.id == Flock.farmer_id)
+            .filter(Flock.id.in_(flock_ids))
+        )
+        owners = {row.id: row for row in result.all()}
+
+        queued = 0
+        for alert in alerts:
+            owner = owners.get(alert.flock_id)
+            if owner is None:
+                continue
+            subject = f"{alert.title} - {owner.name}"
+            dedupe_key = f"alert:{alert.flock_id}:{alert.alert_type}:{alert.severity}"
+            if owner.email:
+                queued += await self.enqueue(
+                    NotificationChannel.EMAIL,
+                    owner.email,
+                    subject,
+                    f"<p>{alert.message}</p>",
+                    dedupe_key=dedupe_key,
+                )
+            if alert.severity == "critical" and owner.phone_number:
+                queued += await self.enqueue(
+                    NotificationChannel.SMS,
+                    owner.phone_number,
+                    subject,
+                    f"{settings.APP_NAME}: {subject}. {alert.message}",
+                    dedupe_key=dedupe_key,
+                )
+        return queued
+
+    async def take_pending(
+        self, channel: NotificationChannel, recipient: str
+    ) -> List[Notification]:
+        """Atomically take everything queued for the recipient on ``channel``."""
+        keys = {"channel": NotificationChannel(channel).value, "recipient": recipient}
+        pending_key = _PENDING_KEY.format(**keys)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.lrange(pending_key, 0, -1)
+            pipe.delete(pending_key)
+            # Later messages schedule a new batch
+            pipe.delete(_SCHEDULED_KEY.format(**keys))
+            items, _, _ = await pipe.execute()
+        return [Notification(**json.loads(item)) for item in items]
+
+    async def requeue(
+        self,
+        channel: NotificationChannel,
+        recipient: str,
+        notifications: List[Notification],
+    ) -> None:
+        """Put undelivered notifications back at the head of the queue."""
+        if not notifications:
+            return
+        keys = {"channel": NotificationChannel(channel).value, "recipient": recipient}
+        await self.redis_client.lpush(
+            _PENDING_KEY.format(**keys),
+            *[json.dumps(asdict(n)) for n in reversed(notifications)],
+        )
+
+
+def compose_digest(
+    channel: NotificationChannel, notifications: List[Notification]
+) -> Notification:
+    """Fold a recipient's batch into one message."""
+    if len(notifications) == 1:
+        return notifications[0]
+
+    subject = f"{len(notifications)} new alerts from {settings.APP_NAME}"
+    if NotificationChannel(channel) == NotificationChannel.SMS:
+        # Keep SMS short: titles only
+        body = f"{len(notifications)} alerts: " + "; ".join(
+            n.subject for n in notifications
+        )
+        return Notification(subject=subject, body=body)
+
+    body = "".join(f"<h3>{n.subject}</h3>{n.body}" for n in notifications)
+    return Notification(subject=subject, body=body)
@@ -1,57 +1,69 @@
-import asyncio
 import logging
+import math
 import random
+import time
+import uuid
+from typing import Optional
 
-import africastalking
 import redis.asyncio as redis
 
 from app.config import settings
+from app.core.redis_client import get_redis
+from app.services.sms_service import get_sms_dispatcher, normalize_phone
 
 logger = logging.getLogger(__name__)
 
+# KEYS: otp key, rate-limit key (sorted set of request timestamps)
+# ARGV: code, ttl seconds, now ms, window ms, limit (0 = off), unique member
+# Returns {1, 0} when the code was stored, {0, retry_after_ms} when limited.
+_ISSUE_OTP = """
+local now = tonumber(ARGV[3])
+local window = tonumber(ARGV[4])
+local limit = tonumber(ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], 0, now - window)
+if limit > 0 and redis.call('ZCARD', KEYS[2]) >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+    return {0, tonumber(oldest[2]) + window - now}
+end
+redis.call('ZADD', KEYS[2], now, ARGV[6])
+redis.call('PEXPIRE', KEYS[2], window)
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return {1, 0}
+"""
+
+# KEYS: otp key; ARGV: submitted code. Deletes the code on a match.
+_VERIFY_OTP = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
 
 class OTPDeliveryError(Exception):
     """Raised when an OTP cannot be delivered to the SMS provider."""
 
 
 class OTPService:
-    def __init__(self):
-        self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-
-        # Initialize Africa's Talking
-        self.sms = None
-        if (
-            settings.AFRICASTALKING_USERNAME
-            and settings.AFRICASTALKING_API_KEY
-            and settings.AFRICASTALKING_API_KEY != "place_holder"
-        ):
-            africastalking.initialize(
-                settings.AFRICASTALKING_USERNAME, settings.AFRICASTALKING_API_KEY
-            )
-            self.sms = africastalking.SMS
-        else:
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self.redis_client = redis_client or get_redis()
+        # EVALSHA, loading the script on first use per server
+        self._issue = self.redis_client.register_script(_ISSUE_OTP)
+        self._verify = self.redis_client.register_script(_VERIFY_OTP)
+        self.sms = get_sms_dispatcher()
+        if not self.sms.gateway.configured and not settings.DEBUG:
             logger.warning("Africa's Talking is not properly configured.")
 
     def _normalize_phone(self, phone_number: str) -> str:
-        """
-        Normalize phone number to E.164 format required by Africa's Talking.
-        Handles Kenyan numbers:  07XX → +254XX,  254XX → +254XX,  +254XX → +254XX
-        """
-        phone = phone_number.strip().replace(" ", "").replace("-", "")
-        if phone.startswith("0"):
-            phone = "+254" + phone[1:]
-        elif phone.startswith("254") and not phone.startswith("+"):
-            phone = "+" + phone
-        return phone
+        return normalize_phone(phone_number)
 
     async def _send_sms_async(self, phone_number: str, message: str) -> None:
-        """Helper to call synchronous Africa's Talking API without blocking the event loop."""
-        if not self.sms:
-            if settings.DEBUG:
-                logger.info(
-                    f"[DEBUG MODE] Skipping SMS delivery for {phone_number}. Use the code from logs."
-                )
-                return
+        """
+        Hand the OTP to the shared SMS dispatcher. Transient gateway failures
+        are retried from the SMS retry queue; permanent ones raise.
+        """
+        if not self.sms.gateway.configured and not settings.DEBUG:
             error_message = (
                 "Cannot send SMS: Africa's Talking SMS client not initialized. "
                 "Check AFRICASTALKING_USERNAME and AFRICASTALKING_API_KEY env vars."
@@ -59,63 +71,59 @@ class OTPService:
             logger.error(error_message)
             raise OTPDeliveryError(error_message)
 
-        def _send():
-            try:
-                if settings.DEBUG:
-                    logger.info(f"[DEBUG MODE] Mocking SMS delivery to {phone_number}")
-                    return
-                response = self.sms.send(message, [phone_number])
-                logger.info(f"Africa's Talking API Response: {response}")
-                # Inspect per-recipient delivery status for early failure detection
-                recipients = response.get("SMSMessageData", {}).get("Recipients", [])
-                for r in recipients:
-                    if r.get("status") != "Success":
-                        raise OTPDeliveryError(
-                            f"SMS delivery failed for {r.get('number')}: "
-                            f"{r.get('status')} (code: {r.get('statusCode')})"
-                        )
-                    logger.info(
-                        f"SMS delivered to {r.get('number')} (cost: {r.get('cost')})"
-                    )
-            except Exception as e:
-                logger.error(f"Africa's Talking SDK Error: {e}", exc_info=True)
-                if isinstance(e, OTPDeliveryError):
-                    raise
-                raise OTPDeliveryError(str(e)) from e
-
-        await asyncio.to_thread(_send)
+        result = await self.sms.send(message, phone_number)
+        if result.success:
+            logger.info(f"SMS delivered to {result.number}")
+        elif result.retryable:
+            logger.warning(
+                f"SMS to {result.number} deferred: {result.status} "
+                f"(code: {result.status_code}); queued for retry"
+            )
+        else:
+            raise OTPDeliveryError(
+                f"SMS delivery failed for {result.number}: "
+                f"{result.status} (code: {result.status_code})"
+            )
 
     async def send_otp(self, phone_number: str) -> str:
         """
-        Generate and save a 4-digit OTP code to Redis.
-        Expiry: 5 minutes (300 seconds).
-        Included: Rate limiting to prevent SMS bombing (max 3 reqs per 15 min).
+        Generate a 4-digit OTP, store it in Redis and send it by SMS.
+        Expiry: OTP_TTL_SECONDS (5 minutes).
+        Rate limited to prevent SMS bombing: at most OTP_RATE_LIMIT requests
+        per OTP_RATE_LIMIT_WINDOW_SECONDS (sliding window) per number.
         """
         # Normalize to E.164 before anything else
         phone_number = self._normalize_phone(phone_number)
         logger.info(f"Sending OTP to normalized number: {phone_number}")
-        rate_limit_key = f"rate_limit:otp:{phone_number}"
-        attempts = await self.redis_client.get(rate_limit_key)
-
-        if not settings.DEBUG and attempts and int(attempts) >= 3:
-            logger.warning(f"OTP rate limit exceeded for {phone_number}")
-            raise ValueError("Too many OTP requests. Please try again in 15 minutes.")
 
         # Generate 4-digit code
         code = f"{random.randint(1000, 9999)}"
 
-        # Save to Redis
-        key = f"otp:{phone_number}"
-        await self.redis_client.setex(key, 300, code)
-
-        # Update rate limits
-        if not attempts:
-            await self.redis_client.setex(rate_limit_key, 100, 1)  # 100 seconds window
-        else:
-            await self.redis_client.incr(rate_limit_key)
+        # Rate-limit check, window update and code save in one round trip
+        window_ms = settings.OTP_RATE_LIMIT_WINDOW_SECONDS * 1000
+        issued, retry_after_ms = await self._issue(
+            keys=[f"otp:{phone_number}", f"rate_limit:otp:{phone_number}"],
+            args=[
+                code,
+                settings.OTP_TTL_SECONDS,
+                int(time.time() * 1000),
+                window_ms,
+                0 if settings.DEBUG else settings.OTP_RATE_LIMIT,
+                uuid.uuid4().hex,
+            ],
+        )
+        if not issued:
+            logger.warning(f"OTP rate limit exceeded for {phone_number}")
+            minutes = max(1, math.ceil(retry_after_ms / 60000))
+            raise ValueError(
+                f"Too many OTP requests. Please try again in {minutes} minutes."
+            )
 
         # Avoid leaking OTPs to centralized logs in production.
-        message = f"Your KukuFiti verification code is {code}. It expires in 5 minutes."
+        message = (
+            f"Your KukuFiti verification code is {code}. "
+            f"It expires in {settings.OTP_TTL_SECONDS // 60} minutes."
+        )
 
         if settings.DEBUG:
             logger.info(f"[DEBUG] OTP for {phone_number} is {code}")
@@ -130,18 +138,8 @@ class OTPService:
     async def verify_otp(self, phone_number: str, code: str) -> bool:
         """
         Verify the OTP against the saved code in Redis.
-        If matches, delete the key and return True.
+        If it matches, the key is deleted in the same step so a code can only
+        be used once.
         """
         phone_number = self._normalize_phone(phone_number)
-        key = f"otp:{phone_number}"
-        saved_code = await self.redis_client.get(key)
-
-        if not saved_code:
-            return False
-
-        if saved_code == code:
-            # Delete key to prevent reuse
-            await self.redis_client.delete(key)
-            return True
-
-        return False
+        return bool(await self._verify(keys=[f"otp:{phone_number}"], args=[code]))
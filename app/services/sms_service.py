@@ -0,0 +1,289 @@
+"""
+SMS dispatch for OTPs and alert notifications.
+
+``SMSDispatcher.send`` holds each message for SMS_COALESCE_WINDOW_MS; every
+recipient of the same text in that window goes out in one multi-recipient
+gateway call (up to SMS_MAX_RECIPIENTS_PER_CALL). At most SMS_MAX_CONCURRENCY
+calls are in flight per process, and they are plain async HTTP, so a burst of
+OTPs does not tie up threads. Recipients that fail with a transient error are
+parked in a Redis sorted set and resent with exponential backoff by
+``retry_sms_task``.
+
+``FakeSMSGateway`` records messages instead of sending them; it is used in
+tests, in DEBUG, and when Africa's Talking is not configured.
+"""
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.core.http_client import get_http_client
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_RETRY_KEY = "sms:retry"
+
+# Africa's Talking per-recipient status codes worth retrying (provider or
+# gateway side); anything else (invalid number, blacklisted...) is final.
+_RETRYABLE_CODES = {500, 501, 502}
+_SUCCESS_CODES = {100, 101, 102}
+
+
+class SMSDeliveryError(Exception):
+    """Raised when Africa's Talking rejects or fails an SMS."""
+
+
+def normalize_phone(phone_number: str) -> str:
+    """
+    Normalize phone number to E.164 format required by Africa's Talking.
+    Handles Kenyan numbers:  07XX → +254XX,  254XX → +254XX,  +254XX → +254XX
+    """
+    phone = phone_number.strip().replace(" ", "").replace("-", "")
+    if phone.startswith("0"):
+        phone = "+254" + phone[1:]
+    elif phone.startswith("254") and not phone.startswith("+"):
+        phone = "+" + phone
+    return phone
+
+
+@dataclass
+class SMSResult:
+    """Delivery outcome for one recipient"""
+
+    number: str
+    status: str
+    status_code: int
+
+    @property
+    def success(self) -> bool:
+        return self.status_code in _SUCCESS_CODES
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code in _RETRYABLE_CODES
+
+
+class SMSGateway(ABC):
+    """Sends one text to many recipients in a single provider call."""
+
+    configured = True
+
+    @abstractmethod
+    async def send(self, message: str, recipients: List[str]) -> List[SMSResult]:
+        pass
+
+
+class AfricasTalkingGateway(SMSGateway):
+    """Africa's Talking bulk messaging REST API over the shared HTTP client."""
+
+    def __init__(self, username: str, api_key: str, timeout: float = 10):
+        self.username = username
+        self.api_key = api_key
+        host = (
+            "api.sandbox.africastalking.com"
+            if username == "sandbox"
+            else "api.africastalking.com"
+        )
+        self.url = f"https://{host}/version1/messaging"
+        self.timeout = timeout
+
+    async def send(self, message: str, recipients: List[str]) -> List[SMSResult]:
+        response = await get_http_client(self.url).post(
+            self.url,
+            headers={"apiKey": self.api_key, "Accept": "application/json"},
+            data={
+                "username": self.username,
+                "to": ",".join(recipients),
+                "message": message,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return [
+            SMSResult(
+                number=r.get("number"),
+                status=r.get("status"),
+                status_code=int(r.get("statusCode", 0)),
+            )
+            for r in response.json().get("SMSMessageData", {}).get("Recipients", [])
+        ]
+
+
+class FakeSMSGateway(SMSGateway):
+    """Records calls instead of sending; numbers in ``fail`` get ``fail_code``."""
+
+    def __init__(
+        self,
+        configured: bool = False,
+        fail: Iterable[str] = (),
+        fail_code: int = 501,
+    ):
+        self.configured = configured
+        self.fail = set(fail)
+        self.fail_code = fail_code
+        self.calls: List[Tuple[str, List[str]]] = []
+
+    async def send(self, message: str, recipients: List[str]) -> List[SMSResult]:
+        self.calls.append((message, list(recipients)))
+        logger.info(f"MOCK SMS to {recipients}: {message}")
+        return [
+            SMSResult(number, "Failed", self.fail_code)
+            if number in self.fail
+            else SMSResult(number, "Success", 101)
+            for number in recipients
+        ]
+
+
+class SMSDispatcher:
+    def __init__(
+        self,
+        gateway: SMSGateway,
+        redis_client: Optional[redis.Redis] = None,
+        window_ms: int = 50,
+        max_recipients: int = 100,
+        concurrency: int = 8,
+        max_attempts: int = 4,
+        backoff_seconds: float = 30,
+    ):
+        self.gateway = gateway
+        self._redis = redis_client
+        self.window = window_ms / 1000
+        self.max_recipients = max_recipients
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._concurrency = concurrency
+        self._slots: Optional[asyncio.Semaphore] = None
+        # message text -> [(recipient, future)] waiting for the next flush
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def send(
+        self, message: str, recipient: str, retry: bool = True, attempt: int = 1
+    ) -> SMSResult:
+        """
+        Send ``message`` to ``recipient``, coalesced with other sends of the
+        same text. With ``retry``, a transient failure is queued for a later
+        attempt (the returned result still reports the failure).
+        """
+        number = normalize_phone(recipient)
+        future = asyncio.get_running_loop().create_future()
+        waiting = self._pending.setdefault(message, [])
+        waiting.append((number, future))
+        if len(waiting) == 1:
+            task = asyncio.create_task(self._flush_after_window(message))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+        result = await future
+        if retry and result.retryable:
+            await self._schedule_retry(message, number, attempt)
+        return result
+
+    async def _flush_after_window(self, message: str) -> None:
+        await asyncio.sleep(self.window)
+        waiting = self._pending.pop(message, [])
+        futures: Dict[str, List[asyncio.Future]] = {}
+        for number, future in waiting:
+            futures.setdefault(number, []).append(future)
+
+        numbers = list(futures)
+        chunks = [
+            numbers[i : i + self.max_recipients]
+            for i in range(0, len(numbers), self.max_recipients)
+        ]
+        await asyncio.gather(
+            *(self._send_chunk(message, chunk, futures) for chunk in chunks)
+        )
+
+    async def _send_chunk(
+        self,
+        message: str,
+        numbers: List[str],
+        futures: Dict[str, List[asyncio.Future]],
+    ) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._concurrency)
+        async with self._slots:
+            try:
+                results = {r.number: r for r in await self.gateway.send(message, numbers)}
+            except Exception as e:
+                logger.error(f"SMS gateway call for {len(numbers)} recipients failed: {e}")
+                results = {}
+
+        for number in numbers:
+            # Missing from the response (or the call failed): transient
+            result = results.get(number) or SMSResult(number, "GatewayError", 501)
+            for future in futures[number]:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _schedule_retry(self, message: str, number: str, attempt: int) -> None:
+        if attempt >= self.max_attempts:
+            logger.error(f"Giving up on SMS to {number} after {attempt} attempts")
+            return
+        delay = self.backoff_seconds * 2 ** (attempt - 1)
+        payload = json.dumps(
+            {"message": message, "number": number, "attempt": attempt + 1}
+        )
+        await self.redis_client.zadd(_RETRY_KEY, {payload: time.time() + delay})
+
+    async def retry_due(self, limit: int = 500) -> int:
+        """Resend queued retries whose backoff has elapsed. Returns how many."""
+        due = await self.redis_client.zrangebyscore(
+            _RETRY_KEY, 0, time.time(), start=0, num=limit
+        )
+        claimed = []
+        for payload in due:
+            # ZREM is the claim: only one worker resends each entry
+            if await self.redis_client.zrem(_RETRY_KEY, payload):
+                claimed.append(json.loads(payload))
+
+        await asyncio.gather(
+            *(
+                self.send(item["message"], item["number"], attempt=item["attempt"])
+                for item in claimed
+            )
+        )
+        return len(claimed)
+
+
+_dispatcher: Optional[SMSDispatcher] = None
+
+
+def get_sms_dispatcher() -> SMSDispatcher:
+    """Process-wide dispatcher; fake gateway in DEBUG or when unconfigured."""
+    global _dispatcher
+    if _dispatcher is None:
+        if (
+            not settings.DEBUG
+            and settings.AFRICASTALKING_USERNAME
+            and settings.AFRICASTALKING_API_KEY
+            and settings.AFRICASTALKING_API_KEY != "place_holder"
+        ):
+            gateway: SMSGateway = AfricasTalkingGateway(
+                settings.AFRICASTALKING_USERNAME, settings.AFRICASTALKING_API_KEY
+            )
+        else:
+            gateway = FakeSMSGateway()
+        _dispatcher = SMSDispatcher(
+            gateway,
+            window_ms=settings.SMS_COALESCE_WINDOW_MS,
+            max_recipients=settings.SMS_MAX_RECIPIENTS_PER_CALL,
+            concurrency=settings.SMS_MAX_CONCURRENCY,
+            max_attempts=settings.SMS_MAX_ATTEMPTS,
+            backoff_seconds=settings.SMS_RETRY_BACKOFF_SECONDS,
+        )
+    return _dispatcher
@@ -3,7 +3,8 @@ from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (get_password_hash_async, password_needs_rehash,
+                               verify_password_async)
 from app.db.models.user import User
 
 
@@ -47,7 +48,7 @@ class UserService:
             raise ValueError(f"User with email {email} already exists")
 
         # Create user
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         user = User(email=email, hashed_password=hashed_password, **kwargs)
 
         try:
@@ -71,12 +72,17 @@ class UserService:
         if not user:
             return None
 
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
 
         if not user.is_active:
             return None
 
+        # Upgrade hashes made with an old cost now that we have the password
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = await get_password_hash_async(password)
+            await self.db.commit()
+
         return user
 
     async def update_user(self, user_id: str, **kwargs) -> Optional[User]:
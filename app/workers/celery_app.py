@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 
 from app.config import settings
 
@@ -26,6 +27,25 @@ celery_app.conf.update(
 # Task routes
 celery_app.conf.task_routes = {
     "app.workers.tasks.evaluate_alerts_task": {"queue": "alerts"},
+    "app.workers.tasks.sweep_alerts_task": {"queue": "alerts"},
+    "app.workers.tasks.sweep_alerts_shard_task": {"queue": "alerts"},
     "app.workers.tasks.refresh_flock_stats_task": {"queue": "stats"},
     "app.workers.tasks.send_notification_task": {"queue": "notifications"},
+    "app.workers.tasks.retry_sms_task": {"queue": "notifications"},
+}
+
+# Periodic tasks (run with `celery -A app.workers.celery_app beat`)
+celery_app.conf.beat_schedule = {
+    "prune-sync-tombstones": {
+        "task": "app.workers.tasks.prune_sync_tombstones_task",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "sweep-alerts": {
+        "task": "app.workers.tasks.sweep_alerts_task",
+        "schedule": crontab(minute=15),
+    },
+    "retry-sms": {
+        "task": "app.workers.tasks.retry_sms_task",
+        "schedule": crontab(),
+    },
 }
@@ -0,0 +1,80 @@
+"""
+Per-process async runtime for Celery tasks.
+
+Celery's prefork workers are synchronous, and ``asyncio.run()`` per task
+builds and tears down an event loop every time. The pooled asyncpg
+connections in ``app.db.session.engine`` are bound to the loop that opened
+them, so they cannot be reused across such loops. Instead each worker process
+keeps one event loop for its whole life, and the engine pool and the shared
+Redis pool (``app.core.redis_client``) live on that loop and are reused by
+every task the process runs.
+
+Requires a pool where each process runs one task at a time (prefork, the
+default, or solo), not the threads/gevent pools.
+"""
+import asyncio
+import logging
+from typing import Any, Coroutine, Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.core.http_client import close_http_clients, reset_http_clients
+from app.core.redis_client import close_redis, reset_redis
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class EventLoopRunningError(RuntimeError):
+    """``run_async`` was called from inside a running event loop."""
+
+
+def run_async(coro: Coroutine) -> Any:
+    """
+    Run ``coro`` to completion on this process's persistent event loop.
+
+    Raises EventLoopRunningError (after closing ``coro``) when called from a
+    running loop, e.g. eager tasks inside async tests, so callers can fall
+    back without also swallowing RuntimeErrors raised by ``coro`` itself.
+    """
+    global _loop
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise EventLoopRunningError("run_async() called from a running event loop")
+
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def _reset_after_fork(**kwargs):
+    """Drop connections inherited from the parent process (prefork)."""
+    global _loop
+    _loop = None
+    reset_redis()
+    reset_http_clients()
+    engine.sync_engine.dispose(close=False)
+
+
+@worker_process_shutdown.connect
+def _close_on_shutdown(**kwargs):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        _loop.run_until_complete(close_redis())
+        _loop.run_until_complete(close_http_clients())
+        _loop.run_until_complete(engine.dispose())
+    except Exception as e:
+        logger.warning(f"Error closing worker connections: {e}")
+    finally:
+        _loop.close()
+        _loop = None
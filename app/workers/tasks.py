@@ -1,8 +1,6 @@
-import asyncio
 import logging
 
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from app.workers.celery_app import celery_app
 
@@ -16,50 +14,97 @@ def test_task(message: str):
     return f"Processed: {message}"
 
 
-from app.db.models.daily_check import DailyCheck
-from app.db.models.events import MortalityEvent
-from app.db.models.flock import Flock
-from app.db.session import AsyncSessionLocal
-from app.schemas.daily_check import EventType
-from app.services.alert_service import AlertService
+from datetime import date
+from typing import Iterable, List, Optional
+from uuid import UUID
 
+from redis.exceptions import RedisError
 
-async def evaluate_alerts_async(flock_id: str, check_date: str):
-    async with AsyncSessionLocal() as db:
+from app.config import settings
+from app.core.alerts.context import AlertJob, load_contexts
+from app.core.alerts.engine import AlertEngine
+from app.core.redis_client import get_redis
+from app.db.session import AsyncSessionLocal
+from app.services.notification_service import (NotificationChannel,
+                                               NotificationDeliveryError,
+                                               NotificationService,
+                                               compose_digest)
+from app.workers.runtime import EventLoopRunningError, run_async
+
+# Redis set of "<flock_id>:<check_date>" jobs waiting for evaluation. Being a
+# set, repeated submissions for the same flock and day coalesce.
+ALERT_QUEUE_KEY = "alerts:pending"
+# Batches one task drains before leaving the rest to the next task
+_ALERT_MAX_BATCHES_PER_TASK = 10
+
+
+def _parse_alert_jobs(members: Iterable[str]) -> List[AlertJob]:
+    jobs = []
+    for member in members:
+        flock_id, _, check_date = member.partition(":")
         try:
-            alert_service = AlertService(db)
+            jobs.append((UUID(flock_id), date.fromisoformat(check_date)))
+        except ValueError:
+            logger.warning(f"Dropping malformed alert job {member!r}")
+    return jobs
 
-            # 1. Fetch Flock
-            result = await db.execute(select(Flock).filter(Flock.id == flock_id))
-            flock = result.scalars().first()
-            if not flock:
-                logger.error(f"Flock {flock_id} not found during alert eval")
-                return
-
-            # 2. Fetch DailyCheck
-            result = await db.execute(
-                select(DailyCheck)
-                .options(selectinload(DailyCheck.events))
-                .filter(
-                    DailyCheck.flock_id == flock_id, DailyCheck.check_date == check_date
-                )
-            )
-            daily_check = result.scalars().first()
 
-            if daily_check:
-                # Sum mortality events linked to this check
-                mortality_count = 0
-                for event in daily_check.events:
-                    if event.event_type == EventType.MORTALITY:
-                        mortality_count += event.count or 0
+async def evaluate_alert_jobs(jobs: List[AlertJob]) -> int:
+    """
+    Evaluate every alert rule for a batch of ``(flock_id, check_date)`` jobs:
+    one bulk context load, one commit. Returns the number of alerts raised.
+    """
+    async with AsyncSessionLocal() as db:
+        contexts = await load_contexts(db, jobs)
+        # Oldest day first so a later day's data wins for the same flock
+        ordered = sorted(contexts.items(), key=lambda item: item[0][1])
+        alerts = await AlertEngine(db).evaluate_batch(
+            [(flock_id, context) for (flock_id, _), context in ordered]
+        )
+        await _notify_alerts(db, alerts)
+        return len(alerts)
+
+
+async def _notify_alerts(db, alerts) -> None:
+    """Queue owner notifications; a Redis outage must not fail evaluation."""
+    if not alerts:
+        return
+    try:
+        await NotificationService(get_redis()).notify_alerts(db, alerts)
+    except RedisError as e:
+        logger.error(f"Could not queue notifications for {len(alerts)} alerts: {e}")
 
-                if mortality_count > 0:
-                    await alert_service.check_mortality(
-                        flock.id, mortality_count, flock.initial_count
-                    )
 
+async def evaluate_alerts_async(flock_id: str, check_date: str) -> dict:
+    """
+    Queue the job, then drain queued jobs in micro-batches of
+    ALERT_BATCH_SIZE. Under load, one task clears many submissions and the
+    tasks queued behind it find the set empty and return immediately.
+    """
+    redis_client = get_redis()
+    member = f"{flock_id}:{check_date}"
+    try:
+        await redis_client.sadd(ALERT_QUEUE_KEY, member)
+    except RedisError as e:
+        logger.warning(f"Alert queue unavailable, evaluating inline: {e}")
+        raised = await evaluate_alert_jobs(_parse_alert_jobs([member]))
+        return {"jobs": 1, "alerts": raised}
+
+    evaluated = raised = 0
+    for _ in range(_ALERT_MAX_BATCHES_PER_TASK):
+        members = await redis_client.spop(ALERT_QUEUE_KEY, settings.ALERT_BATCH_SIZE)
+        if not members:
+            break
+        try:
+            raised += await evaluate_alert_jobs(_parse_alert_jobs(members))
         except Exception as e:
-            logger.error(f"Error evaluating alerts: {e}")
+            # Put the batch back for the next task rather than losing it
+            logger.error(f"Error evaluating alert batch of {len(members)}: {e}")
+            await redis_client.sadd(ALERT_QUEUE_KEY, *members)
+            break
+        evaluated += len(members)
+
+    return {"jobs": evaluated, "alerts": raised}
 
 
 @celery_app.task
@@ -67,68 +112,250 @@ def evaluate_alerts_task(flock_id: str, check_date: str):
     """
     Evaluates daily data to generate alerts.
 
-    Uses ``asyncio.run()`` which always creates a fresh event loop per invocation.
-    This is the correct pattern for bridging sync Celery workers to async SQLAlchemy.
-    ``asyncio.get_event_loop()`` is deprecated in Python 3.10+ and will fail inside
-    Celery thread pools where no running loop exists.
+    Runs on the worker process's persistent event loop (see runtime.py), so
+    the DB pool and Redis connections are reused across tasks.
     """
     logger.info(f"Evaluating alerts for flock {flock_id} on {check_date}")
     coro = evaluate_alerts_async(flock_id, check_date)
     try:
-        asyncio.run(coro)
-    except RuntimeError:
+        result = run_async(coro)
+    except EventLoopRunningError:
         # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
-        # We close the coroutine to prevent "was never awaited" warnings.
-        coro.close()
-    return {"status": "evaluated", "flock_id": flock_id}
+        result = {}
+    return {"status": "evaluated", "flock_id": flock_id, **result}
 
 
-from app.db.models.finance import Sale
+# Last flock id dispatched by the current sweep ("done" once finished), so a
+# restarted dispatcher resumes instead of starting over
+_SWEEP_CURSOR_KEY = "alerts:sweep:{sweep_id}:cursor"
+_SWEEP_CURSOR_TTL = 24 * 3600
 
 
-async def _refresh_flock_stats_async() -> dict:
+async def _dispatch_alert_sweep_async(sweep_id: str, as_of: date) -> dict:
     """
-    Recompute and log a summary of current bird counts, mortality, and revenue
-    for all active flocks across the system. Designed to run periodically (e.g. hourly)
-    as a health-check snapshot to catch data drift and alert generation delays.
+    Page through active flocks in id (keyset) order and queue one shard task
+    per ALERT_SWEEP_SHARD_SIZE flocks. Only ids are read here; the shards do
+    the work in parallel across workers.
     """
-    from sqlalchemy import func
+    from app.db.models.flock import Flock
 
-    from app.db.models.flock import Flock as FlockModel
+    redis_client = get_redis()
+    cursor_key = _SWEEP_CURSOR_KEY.format(sweep_id=sweep_id)
+    cursor = await redis_client.get(cursor_key)
+    if cursor == "done":
+        return {"shards": 0, "resumed": False}
 
+    after = UUID(cursor) if cursor else None
+    shards = 0
     async with AsyncSessionLocal() as db:
-        try:
-            # Total active flocks
-            active_res = await db.execute(
-                select(func.count())
-                .select_from(FlockModel)
-                .filter(FlockModel.status == "active")
+        while True:
+            stmt = (
+                select(Flock.id)
+                .filter(Flock.status == "active")
+                .order_by(Flock.id)
+                .limit(settings.ALERT_SWEEP_SHARD_SIZE)
+            )
+            if after is not None:
+                stmt = stmt.filter(Flock.id > after)
+            ids = (await db.execute(stmt)).scalars().all()
+            if not ids:
+                break
+
+            sweep_alerts_shard_task.delay(
+                after_id=str(after) if after else None,
+                last_id=str(ids[-1]),
+                as_of=as_of.isoformat(),
             )
-            active_count = active_res.scalar_one() or 0
+            after = ids[-1]
+            await redis_client.set(cursor_key, str(after), ex=_SWEEP_CURSOR_TTL)
+            shards += 1
 
-            # Total initial birds in active flocks
-            initial_res = await db.execute(
-                select(func.sum(FlockModel.initial_count)).filter(
-                    FlockModel.status == "active"
+    await redis_client.set(cursor_key, "done", ex=_SWEEP_CURSOR_TTL)
+    return {"shards": shards, "resumed": cursor is not None}
+
+
+@celery_app.task(acks_late=True)
+def sweep_alerts_task():
+    """
+    Hourly fleet-wide alert sweep (Celery beat). Dispatches keyset shards of
+    active flocks to sweep_alerts_shard_task on the alerts queue.
+    """
+    from datetime import datetime
+
+    # Local dates, like the rules (date.today()) and the farm records
+    now = datetime.now()
+    sweep_id = now.strftime("%Y%m%d%H")
+    coro = _dispatch_alert_sweep_async(sweep_id, now.date())
+    try:
+        result = run_async(coro)
+    except EventLoopRunningError:
+        # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
+        result = {}
+    logger.info(f"Alert sweep {sweep_id} dispatched: {result}")
+    return {"status": "dispatched", "sweep_id": sweep_id, **result}
+
+
+async def _sweep_alerts_shard_async(
+    after_id: Optional[UUID], last_id: UUID, as_of: date
+) -> dict:
+    from app.db.models.flock import Flock
+
+    async with AsyncSessionLocal() as db:
+        stmt = select(Flock.id).filter(Flock.status == "active", Flock.id <= last_id)
+        if after_id is not None:
+            stmt = stmt.filter(Flock.id > after_id)
+        flock_ids = (await db.execute(stmt)).scalars().all()
+
+        contexts = await load_contexts(
+            db,
+            [(flock_id, as_of) for flock_id in flock_ids],
+            check_lookback_days=settings.ALERT_SWEEP_CHECK_LOOKBACK_DAYS,
+        )
+        alerts = await AlertEngine(db).evaluate_batch(
+            [(flock_id, context) for (flock_id, _), context in contexts.items()]
+        )
+        await _notify_alerts(db, alerts)
+        return {"flocks": len(flock_ids), "alerts": len(alerts)}
+
+
+@celery_app.task(
+    acks_late=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def sweep_alerts_shard_task(after_id: Optional[str], last_id: str, as_of: str):
+    """
+    Evaluate all alert rules for active flocks with ``after_id < id <=
+    last_id``. Shards are independent and idempotent (active alerts are
+    updated, not duplicated), so a failed or lost shard is simply retried or
+    redelivered (acks_late).
+    """
+    coro = _sweep_alerts_shard_async(
+        UUID(after_id) if after_id else None,
+        UUID(last_id),
+        date.fromisoformat(as_of),
+    )
+    try:
+        result = run_async(coro)
+    except EventLoopRunningError:
+        # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
+        result = {}
+    return {"status": "evaluated", **result}
+
+
+async def _send_notifications_async(channel: str, recipient: str) -> int:
+    """
+    Deliver everything queued for ``recipient`` on ``channel`` as one digest.
+    On failure the batch goes back on the queue and the error propagates so
+    the task retries.
+    """
+    from app.services.email_service import EmailService
+    from app.services.sms_service import SMSDeliveryError, get_sms_dispatcher
+
+    service = NotificationService(get_redis())
+    batch = await service.take_pending(channel, recipient)
+    if not batch:
+        return 0
+
+    message = compose_digest(channel, batch)
+    try:
+        if NotificationChannel(channel) == NotificationChannel.SMS:
+            # No SMS-level retry: this task requeues the batch and retries
+            result = await get_sms_dispatcher().send(
+                message.body, recipient, retry=False
+            )
+            if not result.success:
+                raise SMSDeliveryError(
+                    f"SMS to {recipient} failed: {result.status} "
+                    f"(code: {result.status_code})"
                 )
+        else:
+            sent = await EmailService.send_email(
+                [recipient], message.subject, message.body
             )
-            total_initial = initial_res.scalar() or 0
+            if not sent:
+                raise NotificationDeliveryError(
+                    f"SMTP server rejected mail to {recipient}"
+                )
+    except Exception:
+        await service.requeue(channel, recipient, batch)
+        raise
+    return len(batch)
 
-            # Total recorded mortalities across active flocks
-            mort_res = await db.execute(
-                select(func.sum(MortalityEvent.count))
-                .join(FlockModel, FlockModel.id == MortalityEvent.flock_id)
-                .filter(FlockModel.status == "active")
-            )
-            total_mort = mort_res.scalar() or 0
 
-            # Total birds sold from active flocks
-            sales_res = await db.execute(
-                select(func.sum(Sale.quantity))
-                .join(FlockModel, FlockModel.id == Sale.flock_id)
+@celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
+def send_notification_task(self, channel: str, recipient: str):
+    """
+    Deliver a recipient's batched notifications for one channel (email or
+    SMS). Scheduled by NotificationService.enqueue at the end of the batch
+    window.
+    """
+    coro = _send_notifications_async(channel, recipient)
+    try:
+        sent = run_async(coro)
+    except EventLoopRunningError:
+        # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
+        sent = 0
+    except Exception as e:
+        logger.warning(f"Notification delivery to {recipient} failed: {e}")
+        raise self.retry(exc=e)
+    logger.info(f"Sent {sent} {channel} notifications to {recipient}")
+    return {"status": "sent", "channel": channel, "count": sent}
+
+
+@celery_app.task
+def retry_sms_task():
+    """
+    Resend SMS whose retry backoff has elapsed (see SMSDispatcher). Runs every
+    minute from beat.
+    """
+    from app.services.sms_service import get_sms_dispatcher
+
+    coro = get_sms_dispatcher().retry_due()
+    try:
+        resent = run_async(coro)
+    except EventLoopRunningError:
+        # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
+        resent = 0
+    if resent:
+        logger.info(f"Retried {resent} SMS")
+    return {"status": "retried", "count": resent}
+
+
+async def _refresh_flock_stats_async() -> dict:
+    """
+    Rebuild the flock_stats rollup for every flock (reconciling any drift from
+    the per-write refreshes) and log a summary of current bird counts,
+    mortality, and sales for all active flocks across the system. Designed to
+    run periodically (e.g. hourly) as a health-check snapshot.
+    """
+    from sqlalchemy import func
+
+    from app.db.models.flock import Flock as FlockModel
+    from app.db.models.flock_stats import FlockStats
+    from app.services.flock_stats_service import FlockStatsService
+
+    async with AsyncSessionLocal() as db:
+        try:
+            await FlockStatsService(db).rebuild()
+
+            # One pass over the rollup rows of active flocks
+            totals_res = await db.execute(
+                select(
+                    func.count(),
+                    func.sum(FlockStats.initial_count),
+                    func.sum(FlockStats.total_mortality),
+                    func.sum(FlockStats.total_sold),
+                )
+                .select_from(FlockModel)
+                .join(FlockStats, FlockStats.flock_id == FlockModel.id)
                 .filter(FlockModel.status == "active")
             )
-            total_sold = sales_res.scalar() or 0
+            active_count, total_initial, total_mort, total_sold = totals_res.one()
+            total_initial = total_initial or 0
+            total_mort = total_mort or 0
+            total_sold = total_sold or 0
 
             current_birds = max(0, total_initial - total_mort - total_sold)
             mortality_rate = (
@@ -154,19 +381,58 @@ async def _refresh_flock_stats_async() -> dict:
 @celery_app.task
 def refresh_flock_stats_task():
     """
-    Periodically recomputes active flock stats (bird count, mortality rate, sales)
-    across all farmers and logs a system-wide snapshot.
+    Periodically rebuilds the flock_stats rollup and logs a system-wide snapshot
+    of active flock stats (bird count, mortality rate, sales).
 
-    Follows the same asyncio.run() bridging pattern as evaluate_alerts_task:
-    Celery workers are synchronous; asyncio.run() spawns a fresh event loop
-    per invocation so we can safely use AsyncSession inside a sync task.
+    Runs on the worker's persistent event loop, like evaluate_alerts_task.
     """
     logger.info("Starting flock stats refresh")
     coro = _refresh_flock_stats_async()
     try:
-        result = asyncio.run(coro)
-    except RuntimeError:
+        result = run_async(coro)
+    except EventLoopRunningError:
         # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
-        coro.close()
         result = {}
     return {"status": "success", **result}
+
+
+async def _prune_sync_tombstones_async() -> int:
+    """
+    Delete tombstones older than the delta-sync retention window. Clients with
+    a cursor that old are sent a full sync, so the rows are no longer needed.
+    """
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import delete
+
+    from app.config import settings
+    from app.db.models.sync import SyncTombstone
+
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    )
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.execute(
+                delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff)
+            )
+            await db.commit()
+            return result.rowcount or 0
+        except Exception as e:
+            logger.error(f"Error pruning sync tombstones: {e}")
+            return 0
+
+
+@celery_app.task
+def prune_sync_tombstones_task():
+    """
+    Daily cleanup of expired sync tombstones.
+    """
+    coro = _prune_sync_tombstones_async()
+    try:
+        pruned = run_async(coro)
+    except EventLoopRunningError:
+        # Fallback for when an event loop is already running (e.g., in tests with task_always_eager=True)
+        pruned = 0
+    logger.info(f"Pruned {pruned} sync tombstones")
+    return {"status": "success", "pruned": pruned}
@@ -0,0 +1,72 @@
+"""
+Compare per-context rule evaluation with the columnar batch path on a
+synthetic fleet, and check both give the same answers:
+
+    python scripts/benchmark_alert_rules.py [n_flocks]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.alerts.base import BatchAlertResult
+from app.core.alerts.rules import (HighMortalityAlert, LowTemperatureAlert,
+                                   PoorGrowthAlert)
+
+RULES = [LowTemperatureAlert(), HighMortalityAlert(), PoorGrowthAlert()]
+
+
+def synthetic_columns(n: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    return {
+        "days_old": [rng.randint(0, 45) for _ in range(n)],
+        "temperature_celsius": [
+            None if rng.random() < 0.2 else round(rng.uniform(18, 40), 1)
+            for _ in range(n)
+        ],
+        "mortality_rate_percent": [
+            None if rng.random() < 0.1 else round(rng.uniform(0, 10), 2)
+            for _ in range(n)
+        ],
+        "average_weight_grams": [
+            None if rng.random() < 0.5 else round(rng.uniform(120, 2500), 1)
+            for _ in range(n)
+        ],
+        "total_deaths": [rng.randint(0, 200) for _ in range(n)],
+    }
+
+
+def scalar(rule, contexts) -> BatchAlertResult:
+    results = [rule.evaluate(context) for context in contexts]
+    return BatchAlertResult(
+        triggered=[r is not None and r.should_alert for r in results],
+        severities=[r.severity if r is not None else None for r in results],
+    )
+
+
+def main(n: int):
+    columns = synthetic_columns(n)
+    contexts = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    print(f"{n} flocks")
+    for rule in RULES:
+        start = time.perf_counter()
+        expected = scalar(rule, contexts)
+        scalar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = rule.evaluate_batch(columns)
+        batch_s = time.perf_counter() - start
+
+        assert actual == expected, f"{rule.rule_name}: batch differs from scalar"
+        print(
+            f"  {rule.rule_name:<16} scalar {scalar_s * 1000:8.2f} ms"
+            f"  batch {batch_s * 1000:8.2f} ms"
+            f"  x{scalar_s / batch_s:5.1f}  ({sum(actual.triggered)} fired)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
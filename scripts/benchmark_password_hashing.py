@@ -0,0 +1,68 @@
+"""
+Show what a burst of logins does to one event loop, with bcrypt run inline
+(as before) versus on the bounded hashing pool:
+
+    python scripts/benchmark_password_hashing.py [logins] [rounds]
+
+A ticker coroutine stands in for the worker's other requests; its worst
+delay is how long they would have been stalled.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.security import (get_password_hash, verify_password,
+                               verify_password_async)
+
+
+async def inline_verify(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+
+async def run(verify, logins: int, hashed: str) -> tuple:
+    worst_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst_lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst_lag = max(worst_lag, time.perf_counter() - start - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(verify("correct horse battery staple", hashed) for _ in range(logins))
+    )
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    assert all(results)
+    return elapsed, worst_lag
+
+
+async def main(logins: int, rounds: int):
+    hashed = get_password_hash("correct horse battery staple", rounds=rounds)
+    print(f"{logins} concurrent logins, bcrypt cost {rounds}")
+    for name, verify in (("inline", inline_verify), ("pool", verify_password_async)):
+        elapsed, lag = await run(verify, logins, hashed)
+        print(
+            f"  {name:<7} total {elapsed * 1000:8.1f} ms"
+            f"  {logins / elapsed:6.1f} logins/s"
+            f"  worst loop stall {lag * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 12,
+        )
+    )
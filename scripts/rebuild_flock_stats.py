@@ -0,0 +1,26 @@
+"""
+Recompute the flock_stats rollup for every flock from the event and sale
+tables. Run after bulk imports or manual SQL edits to reconcile drift:
+
+    python scripts/rebuild_flock_stats.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the app directory to the python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import AsyncSessionLocal
+from app.services.flock_stats_service import FlockStatsService
+
+
+async def rebuild_flock_stats():
+    print("Rebuilding flock stats...")
+    async with AsyncSessionLocal() as session:
+        await FlockStatsService(session).rebuild()
+    print("Rebuild complete.")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_flock_stats())
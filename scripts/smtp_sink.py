@@ -0,0 +1,93 @@
+"""
+Minimal local SMTP sink for development and tests. Accepts every message
+(no TLS, no auth) and keeps it in memory; run standalone to print what the
+app sends:
+
+    python scripts/smtp_sink.py [port]    # then SMTP_HOST=localhost,
+                                          # SMTP_PORT=<port>, SMTP_STARTTLS=false
+"""
+import asyncio
+import sys
+from email import message_from_bytes
+from email.message import Message
+from typing import Callable, List, Optional
+
+
+class SMTPSink:
+    """In-process SMTP server recording messages and sessions."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        on_message: Optional[Callable[[Message], None]] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.messages: List[Message] = []
+        self.sessions = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "SMTPSink":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "SMTPSink":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader, writer) -> None:
+        self.sessions += 1
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 sink ESMTP")
+        try:
+            while line := await reader.readline():
+                verb = line[:4].decode(errors="replace").upper()
+                if verb == "EHLO":
+                    await reply("250-sink")
+                    await reply("250 8BITMIME")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while (data := await reader.readline()) not in (b".\r\n", b""):
+                        lines.append(data[1:] if data.startswith(b"..") else data)
+                    self.messages.append(message_from_bytes(b"".join(lines)))
+                    if self.on_message:
+                        self.on_message(self.messages[-1])
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+
+async def main(port: int) -> None:
+    sink = SMTPSink(
+        port=port,
+        on_message=lambda msg: print(f"--- {msg['Subject']} -> {msg['To']}"),
+    )
+    await sink.start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1025))
@@ -0,0 +1,118 @@
+"""Batch advisory: packing, fallback, bounded concurrency and streaming"""
+import asyncio
+import json
+
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_current_user, get_db, get_plan_type
+from app.config import settings
+from app.main import app
+from app.schemas.ai import FeedRecommendationRequest
+from app.services.ai.batch import advise_many
+
+_ANSWER = {
+    "recommended_daily_kg": 50.0,
+    "status_flag": "NORMAL",
+    "reasoning_explanation": "On curve.",
+    "confidence_level": "HIGH",
+}
+
+
+class _Provider:
+    name = "fake"
+    model = "fake-1"
+
+    def __init__(self, supports_batching=True, packed_ok=True):
+        self.supports_batching = supports_batching
+        self.packed_ok = packed_ok
+        self.calls = []
+        self.in_flight = self.peak = 0
+
+    async def generate_structured_response(
+        self, system_prompt, user_prompt, json_schema, image_base64=None, cache_key=None
+    ):
+        self.calls.append(user_prompt)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        items = user_prompt.count("ITEM ")
+        if not items:
+            return dict(_ANSWER)
+        return {"items": [dict(_ANSWER)] * (items if self.packed_ok else 1)}
+
+
+def _flocks(n):
+    return [
+        FeedRecommendationRequest(
+            flock_age_days=20 + i,
+            current_avg_weight_kg=1.0,
+            breed="Cobb 500",
+            bird_count=1000,
+        )
+        for i in range(n)
+    ]
+
+
+async def _run(provider, n):
+    return [r async for r in advise_many("feed-recommendation", provider, _flocks(n))]
+
+
+async def test_packs_items_and_bounds_concurrency(monkeypatch):
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "AI_BATCH_PACK_SIZE", 5)
+    monkeypatch.setattr(settings, "AI_BATCH_CONCURRENCY", 2)
+    provider = _Provider()
+
+    results = await _run(provider, 30)
+
+    assert sorted(r.index for r in results) == list(range(30))
+    assert all(r.result.recommended_daily_kg == 50.0 for r in results)
+    assert len(provider.calls) == 6
+    assert provider.peak == 2
+
+
+async def test_unusable_packed_answer_is_retried_per_item(monkeypatch):
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "AI_BATCH_PACK_SIZE", 3)
+    provider = _Provider(packed_ok=False)
+
+    results = await _run(provider, 3)
+
+    assert [r.error for r in results] == [None] * 3
+    assert len(provider.calls) == 1 + 3
+
+
+async def test_ndjson_batch_is_not_buffered_by_gzip(monkeypatch):
+    """GZipMiddleware would hold every line until the batch finished."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_db] = no_db
+    app.dependency_overrides[get_current_user] = lambda: object()
+    app.dependency_overrides[get_plan_type] = lambda: "STARTER"
+    item = {
+        "flock_age_days": 28,
+        "current_avg_weight_kg": 1.4,
+        "target_weight_kg": 2.2,
+        "breed": "Cobb 500",
+    }
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/api/v1/ai/batch/harvest-prediction?fast=true",
+                json={"items": [item] * 20},
+                headers={"Accept-Encoding": "gzip"},
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "identity"
+    assert response.headers["x-accel-buffering"] == "no"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 20
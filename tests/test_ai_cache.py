@@ -0,0 +1,120 @@
+"""Keying and read-through behaviour of the AI response cache"""
+from app.schemas.ai import (DiseaseRiskRequest, FcrInsightsRequest,
+                            FcrInsightsResponse, FeedRecommendationRequest,
+                            FeedRecommendationResponse)
+from app.services.ai.cache import AIResponseCache
+
+
+class _Provider:
+    name = "fake"
+    model = "fake-1"
+
+
+class _Redis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def hincrby(self, key, field, amount):
+        return amount
+
+
+def _feed(weight, breed="Ross 308", birds=503):
+    return FeedRecommendationRequest(
+        flock_age_days=21, current_avg_weight_kg=weight, breed=breed, bird_count=birds
+    )
+
+
+def test_near_identical_requests_share_a_key():
+    cache = AIResponseCache(_Redis())
+    a = _feed(0.912)
+    b = _feed(0.908, breed="ross  308", birds=498)
+
+    key = cache.key("feed-recommendation", _Provider(), a, FeedRecommendationResponse)
+    assert key == cache.key(
+        "feed-recommendation", _Provider(), b, FeedRecommendationResponse
+    )
+    assert key != cache.key(
+        "feed-recommendation", _Provider(), a, FeedRecommendationResponse, "v2"
+    )
+
+
+def test_small_values_are_not_bucketed_together():
+    """Buckets are relative: a 4-bird flock is not keyed as a 0-bird one."""
+    cache = AIResponseCache(_Redis())
+
+    def key(feed, weight, birds):
+        payload = FcrInsightsRequest(
+            total_feed_consumed_kg=feed,
+            current_avg_weight_kg=weight,
+            initial_bird_count=birds,
+            current_bird_count=birds,
+        )
+        return cache.key("fcr-insights", _Provider(), payload, FcrInsightsResponse)
+
+    assert key(12, 0.02, 4) != key(12, 0.02, 5)
+    assert key(12, 0.02, 4) != key(12, 0.03, 4)
+    assert key(12, 0.02, 4) != key(10, 0.02, 4)
+    assert key(1204, 2.01, 1003) == key(1196, 1.99, 998)
+
+
+def test_engine_figures_are_keyed_exactly():
+    """A cached narrative is only reused with the figures it was written for."""
+    cache = AIResponseCache(_Redis())
+
+    def key(figures):
+        return cache.key(
+            "feed-recommendation",
+            _Provider(),
+            _feed(0.912),
+            FeedRecommendationResponse,
+            context=figures,
+        )
+
+    assert key("- estimated_fcr: 2.04") == key("- estimated_fcr: 2.04")
+    assert key("- estimated_fcr: 2.04") != key("- estimated_fcr: 2.01")
+
+
+def test_symptom_order_is_ignored_but_images_are_not_folded():
+    cache = AIResponseCache(_Redis())
+
+    def key(symptoms, image=None):
+        payload = DiseaseRiskRequest(
+            symptoms=symptoms, recent_vaccinations=[], image_base64=image
+        )
+        return cache.key(
+            "disease-risk", _Provider(), payload, FeedRecommendationResponse
+        )
+
+    assert key(["Coughing", "lethargy"]) == key(["lethargy", "coughing"])
+    assert key([], image="aB") != key([], image="Ab")
+
+
+async def test_second_request_is_served_from_cache():
+    cache = AIResponseCache(_Redis())
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return {
+            "recommended_daily_kg": 52.0,
+            "status_flag": "NORMAL",
+            "reasoning_explanation": "On curve.",
+            "confidence_level": "HIGH",
+        }
+
+    for weight in (0.912, 0.908):
+        response = await cache.get_or_generate(
+            "feed-recommendation",
+            _Provider(),
+            _feed(weight),
+            FeedRecommendationResponse,
+            generate,
+        )
+        assert response.recommended_daily_kg == 52.0
+    assert len(calls) == 1
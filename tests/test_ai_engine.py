@@ -0,0 +1,108 @@
+"""Deterministic local answers for the numeric AI endpoints (no provider)"""
+import json
+import uuid
+
+import pytest
+
+from app.api.v1.ai import _advise_locally, _fcr_fields, _stream_batch
+from app.config import settings
+from app.schemas.ai import (FcrInsightsRequest, HarvestOptimizationRequest,
+                            HarvestPredictionRequest,
+                            HarvestPredictionResponse)
+from app.services.ai import engine
+
+
+def _fcr(feed=12, weight=0.42, birds=14):
+    return FcrInsightsRequest(
+        total_feed_consumed_kg=feed,
+        current_avg_weight_kg=weight,
+        initial_bird_count=birds,
+        current_bird_count=birds,
+    )
+
+
+def test_breed_curves_and_lookup():
+    ross, known = engine.curve_for("ross 308")
+    assert known and ross.weight_at(21) == pytest.approx(1.07)
+    assert ross.age_for_weight(1.07) == pytest.approx(21)
+    assert engine.curve_for("Cobb500")[0].breed == "Cobb 500"
+    assert engine.curve_for("Kuroiler") == (ross, False)
+
+
+def test_fcr_insights():
+    answer = engine.fcr_insights(
+        FcrInsightsRequest(
+            total_feed_consumed_kg=3000,
+            current_avg_weight_kg=2.0,
+            initial_bird_count=1000,
+            current_bird_count=750,
+        )
+    )
+    assert answer.estimated_fcr == 2.0
+    assert answer.benchmark_status == "POOR"
+    assert "Mortality is 25.0%" in answer.recommendations[0]
+
+
+def test_harvest_prediction_projects_from_growth_not_age():
+    answer = engine.harvest_prediction(
+        HarvestPredictionRequest(
+            flock_age_days=28,
+            current_avg_weight_kg=1.07,  # the Ross 308 weight at day 21
+            target_weight_kg=1.715,  # ... and at day 28
+            breed="Ross 308",
+        )
+    )
+    assert answer.status_flag == "DELAYED"
+    assert answer.estimated_days_to_target == 7
+
+
+def test_harvest_optimization_stops_when_feed_outweighs_gain():
+    payload = HarvestOptimizationRequest(
+        flock_id=uuid.uuid4(),
+        current_avg_weight_kg=2.0,
+        feed_cost_per_kg=150,
+        expected_sale_price_per_kg=300,
+        current_age_days=33,
+        breed="Ross 308",
+    )
+    answer = engine.harvest_optimization(payload)
+
+    assert 33 < answer.optimal_harvest_age_days < 33 + engine.HARVEST_HORIZON_DAYS
+    assert len(answer.daily_profit_trend) == 7
+    assert answer.projected_profit_at_optimal == max(
+        [answer.projected_profit_at_optimal]
+        + [day["profit_per_bird"] for day in answer.daily_profit_trend]
+    )
+
+
+async def test_endpoint_answers_locally_without_a_provider(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_API_KEY", None)
+    payload = HarvestPredictionRequest(
+        flock_age_days=21, current_avg_weight_kg=1.07, target_weight_kg=2.4, breed="x"
+    )
+
+    answer = await _advise_locally("harvest-prediction", None, payload, fast=False)
+
+    assert isinstance(answer, HarvestPredictionResponse)
+    assert answer.status_flag == "ON_TRACK"
+
+
+async def test_small_flock_figures_use_the_request_as_sent(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_API_KEY", None)
+
+    answer = await _advise_locally("fcr-insights", None, _fcr(), fast=False)
+
+    assert answer.estimated_fcr == 2.04
+
+
+async def test_batch_reports_unanswerable_items_per_line():
+    response = _stream_batch(
+        "fcr-insights", [_fcr(), _fcr(weight=0)], _fcr_fields, fast=True
+    )
+
+    lines = [json.loads(line) async for line in response.body_iterator]
+
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[0]["result"]["estimated_fcr"] == 2.04
+    assert by_index[1]["result"] is None
+    assert "above zero" in by_index[1]["error"]
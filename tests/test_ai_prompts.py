@@ -0,0 +1,26 @@
+"""The precompiled AI prompt registry"""
+from app.schemas.ai import (FeedRecommendationRequest,
+                            FeedRecommendationResponse)
+from app.services.ai.prompts import PROMPTS
+
+
+def test_system_prompt_is_static_and_carries_the_schema():
+    prompt = PROMPTS["feed-recommendation"]
+
+    assert prompt.response_model is FeedRecommendationResponse
+    assert prompt.json_schema == FeedRecommendationResponse.model_json_schema()
+    assert prompt.system_prompt.endswith('"type": "object"\n}')
+    assert prompt.cache_key == f"feed-recommendation:{prompt.version}"
+    # Voice and harvest optimization never sent the schema in the prompt
+    assert "EXPECTED JSON SCHEMA" not in PROMPTS["voice-record"].system_prompt
+
+
+def test_render_fills_only_the_user_section():
+    payload = FeedRecommendationRequest(
+        flock_age_days=21, current_avg_weight_kg=0.9, breed="Ross 308", bird_count=500
+    )
+
+    user_prompt = PROMPTS["feed-recommendation"].render(payload=payload)
+
+    assert "- Age: 21 days" in user_prompt
+    assert "- Total Birds: 500" in user_prompt
@@ -0,0 +1,54 @@
+"""Streaming (SSE) chat answers"""
+import json
+
+import pytest
+
+from app.api.v1.ai import _chat_events
+from app.services.ai.streaming import JSONStringFieldReader
+
+_ANSWER = (
+    '{"response": "Keep \\"brooder\\" at 32\\u00b0C\\nthen lower", '
+    '"actionable_highlights": ["Check heat"]}'
+)
+
+
+def test_reader_decodes_field_across_arbitrary_chunk_boundaries():
+    for size in (1, 2, 3, 7):
+        reader = JSONStringFieldReader("response")
+        text = "".join(
+            reader.feed(_ANSWER[i : i + size]) for i in range(0, len(_ANSWER), size)
+        )
+        assert text == 'Keep "brooder" at 32°C\nthen lower'
+        assert reader.done
+
+
+def test_reader_rejects_non_json_output():
+    with pytest.raises(ValueError):
+        JSONStringFieldReader("response").feed("Sure! Here is")
+
+
+class _Provider:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream_structured_response(self, *args, **kwargs):
+        for chunk in self.chunks:
+            yield chunk
+
+
+async def test_chat_events_stream_tokens_then_validated_answer():
+    chunks = [_ANSWER[i : i + 10] for i in range(0, len(_ANSWER), 10)]
+    events = [e async for e in _chat_events(_Provider(chunks), "Brooding tips?")]
+
+    assert events[0].startswith("event: token\n")
+    name, data = events[-1].split("\n")[:2]
+    assert name == "event: done"
+    assert json.loads(data[len("data: ") :])["actionable_highlights"] == [
+        "Check heat"
+    ]
+
+
+async def test_chat_events_report_invalid_answer():
+    events = [e async for e in _chat_events(_Provider(['{"response": "hi"}']), "x")]
+
+    assert events[-1].startswith("event: error\n")
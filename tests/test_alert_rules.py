@@ -0,0 +1,52 @@
+"""Columnar alert-rule evaluation must match the per-context path"""
+import random
+
+import pytest
+
+from app.core.alerts.base import AlertRule
+from app.core.alerts.rules import (HighMortalityAlert, LowTemperatureAlert,
+                                   PoorGrowthAlert)
+
+
+def _columns(n=2000, seed=7):
+    rng = random.Random(seed)
+    return {
+        "days_old": [rng.randint(0, 30) for _ in range(n)],
+        "temperature_celsius": [
+            rng.choice([None, round(rng.uniform(20, 40), 1)]) for _ in range(n)
+        ],
+        "mortality_rate_percent": [
+            rng.choice([None, round(rng.uniform(0, 10), 2)]) for _ in range(n)
+        ],
+        "average_weight_grams": [
+            rng.choice([None, 0, round(rng.uniform(120, 240), 1)]) for _ in range(n)
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "rule", [LowTemperatureAlert(), HighMortalityAlert(), PoorGrowthAlert()]
+)
+def test_batch_matches_scalar(rule):
+    """Vectorized overrides give the same masks and severities as evaluate()."""
+    columns = _columns()
+    assert rule.evaluate_batch(columns) == AlertRule.evaluate_batch(rule, columns)
+
+
+def test_threshold_boundaries():
+    """Week boundaries and rate thresholds are exclusive as in the scalar rules."""
+    temps = LowTemperatureAlert().evaluate_batch(
+        {"days_old": [7, 8, 21, 22], "temperature_celsius": [31.9, 31.9, 26.5, 26.5]}
+    )
+    assert temps.triggered == [True, False, True, False]
+
+    mortality = HighMortalityAlert().evaluate_batch(
+        {"days_old": [3, 10, 10, 10], "mortality_rate_percent": [1.0, 5.0, 6.0, 8.5]}
+    )
+    assert mortality.triggered == [False, False, True, True]
+    assert [s and s.value for s in mortality.severities] == [
+        None,
+        None,
+        "warning",
+        "critical",
+    ]
@@ -0,0 +1,50 @@
+"""Tests for the in-process TTL cache used by the auth dependency"""
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_get_returns_value_until_expiry(monkeypatch):
+    """Entries are served until their TTL elapses."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    cache = TTLCache(ttl_seconds=30)
+    cache.set("user-1", {"role": "FARMER"})
+    assert cache.get("user-1") == {"role": "FARMER"}
+
+    now[0] += 31
+    assert cache.get("user-1") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_drops_entry():
+    """invalidate() removes a single key."""
+    cache = TTLCache(ttl_seconds=30)
+    cache.set("user-1", "a")
+    cache.set("user-2", "b")
+
+    cache.invalidate("user-1")
+
+    assert cache.get("user-1") is None
+    assert cache.get("user-2") == "b"
+
+
+def test_lru_eviction_when_full():
+    """The least recently used key is evicted past maxsize."""
+    cache = TTLCache(ttl_seconds=30, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # touch "a" so "b" is the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_zero_ttl_disables_cache():
+    """A TTL of 0 turns the cache into a no-op."""
+    cache = TTLCache(ttl_seconds=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
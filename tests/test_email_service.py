@@ -0,0 +1,68 @@
+"""Pooled SMTP transport against the local SMTP sink"""
+from app.services.email_service import EmailService, SMTPPool
+from scripts.smtp_sink import SMTPSink
+
+
+async def test_pool_reuses_sessions_across_messages():
+    """A burst is spread over at most `size` sessions, which are then reused."""
+    async with SMTPSink() as sink:
+        pool = SMTPPool("127.0.0.1", sink.port, starttls=False, size=2)
+        messages = [
+            EmailService.build_message(
+                [f"farmer{i}@example.com"], f"Alert {i}", "<p>!</p>"
+            )
+            for i in range(10)
+        ]
+
+        assert await pool.send(messages) == 10
+        assert await pool.send(messages[:3]) == 3
+        await pool.close()
+
+    assert len(sink.messages) == 13
+    assert sink.sessions == 2
+    stats = pool.stats()
+    assert stats["connections_opened"] == 2
+    assert stats["messages_failed"] == 0
+
+
+async def test_pool_recycles_session_after_max_messages():
+    """Sessions are replaced once they have sent `max_messages`."""
+    async with SMTPSink() as sink:
+        pool = SMTPPool(
+            "127.0.0.1", sink.port, starttls=False, size=1, max_messages=2
+        )
+        messages = [
+            EmailService.build_message(["farmer@example.com"], f"Alert {i}", "x")
+            for i in range(5)
+        ]
+
+        assert await pool.send(messages) == 5
+        await pool.close()
+
+    assert sink.sessions == 3
+
+
+async def test_pool_counts_partial_send_when_reconnect_fails():
+    """Messages sent before a session could not be reopened still count."""
+    async with SMTPSink() as sink:
+        pool = SMTPPool(
+            "127.0.0.1", sink.port, starttls=False, size=1, max_messages=2
+        )
+        open_session = pool._open
+
+        def open_once():
+            if pool.metrics["connections_opened"]:
+                raise ConnectionRefusedError("SMTP server went away")
+            return open_session()
+
+        pool._open = open_once
+        messages = [
+            EmailService.build_message(["farmer@example.com"], f"Alert {i}", "x")
+            for i in range(5)
+        ]
+
+        assert await pool.send(messages) == 2
+        await pool.close()
+
+    assert len(sink.messages) == 2
+    assert pool.stats()["messages_failed"] == 3
@@ -0,0 +1,92 @@
+"""Streaming CSV / NDJSON exports"""
+import json
+from datetime import date
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.deps import get_current_admin_user, get_db
+from app.config import settings
+from app.core.export import _csv_chunks, _ndjson_chunks, date_window
+from app.db.models.finance import Sale
+from app.main import app
+
+_FIELDS = [("sale_date", "Date"), ("total_amount", "Amount (KES)")]
+
+
+async def _rows(n):
+    for i in range(n):
+        yield (date(2026, 1, 1 + i), 100 * i)
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+async def test_csv_starts_with_header_and_chunks_by_rows(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", 2)
+
+    chunks = await _collect(_csv_chunks(_FIELDS, _rows(5)))
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "Date,Amount (KES)"
+    assert lines[1:] == [f"2026-01-0{i + 1},{100 * i}" for i in range(5)]
+    # The first chunk holds the header plus EXPORT_CHUNK_ROWS rows
+    assert chunks[0].count("\n") == 3
+
+
+async def test_ndjson_writes_one_object_per_line(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", 2)
+
+    chunks = await _collect(_ndjson_chunks(_FIELDS, _rows(5)))
+
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert records[0] == {"sale_date": "2026-01-01", "total_amount": 0}
+    assert [r["total_amount"] for r in records] == [0, 100, 200, 300, 400]
+
+
+async def test_ndjson_of_nothing_is_empty():
+    assert await _collect(_ndjson_chunks(_FIELDS, _rows(0))) == []
+
+
+def test_date_window_bounds_are_inclusive_and_ordered():
+    stmt = date_window(
+        select(Sale.id), Sale.date, date(2026, 1, 1), date(2026, 1, 31)
+    )
+
+    sql = str(
+        stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    assert "sales.date >= '2026-01-01'" in sql
+    assert "sales.date <= '2026-01-31'" in sql
+    assert sql.endswith("ORDER BY sales.date")
+
+    open_ended = str(date_window(select(Sale.id), Sale.date))
+    assert "WHERE" not in open_ended and "ORDER BY sales.date" in open_ended
+
+
+@pytest.fixture
+def admin_client():
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_db] = no_db
+    app.dependency_overrides[get_current_admin_user] = lambda: object()
+    yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+async def test_unknown_export_format_is_rejected(admin_client):
+    async with admin_client as client:
+        response = await client.get(
+            f"{settings.API_V1_PREFIX}/audit/export", params={"file_format": "xlsx"}
+        )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["query", "file_format"]
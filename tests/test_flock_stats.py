@@ -0,0 +1,31 @@
+"""Locking of the flock_stats rollup refresh (statements only, no database)"""
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.flock_stats_service import FlockStatsService
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+
+    async def flush(self):
+        pass
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+
+async def test_refresh_locks_flocks_without_blocking_fk_key_share():
+    """
+    The events just flushed hold FOR KEY SHARE on their flock (foreign key);
+    FOR UPDATE would conflict with it and deadlock two writers to one flock.
+    """
+    db = _Session()
+
+    await FlockStatsService(db).refresh(uuid4(), uuid4(), None)
+
+    lock, upsert = db.statements
+    assert lock.endswith("ORDER BY flocks.id FOR NO KEY UPDATE")
+    assert upsert.startswith("INSERT INTO flock_stats")
@@ -0,0 +1,202 @@
+"""SSO token verification and provider key caching (no network)"""
+import asyncio
+import base64
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.core import jwks as jwks_module
+from app.core.jwks import (JWKSCache, JWKSUnavailableError,
+                           UnknownSigningKeyError)
+
+
+def _b64(n: int) -> str:
+    data = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    numbers = key.public_key().public_numbers()
+    jwk = {"kty": "RSA", "kid": "k1", "e": _b64(numbers.e), "n": _b64(numbers.n)}
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return pem, {"keys": [jwk]}
+
+
+def _token(pem, kid="k1", **claims):
+    payload = {
+        "iss": "https://appleid.apple.com",
+        "aud": "com.example.app",
+        "exp": int(time.time()) + 300,
+        "email": "farmer@example.com",
+        **claims,
+    }
+    return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+
+async def test_verifies_token_without_network(signing_key):
+    pem, jwks = signing_key
+    cache = JWKSCache(
+        "Apple", "https://invalid.example/keys", ["https://appleid.apple.com"]
+    )
+    cache.load_fixture(jwks)
+
+    claims = await cache.verify(_token(pem), "com.example.app")
+    assert claims["email"] == "farmer@example.com"
+
+    with pytest.raises(JWTError):
+        await cache.verify(_token(pem, aud="someone-else"), "com.example.app")
+    with pytest.raises(UnknownSigningKeyError):
+        await cache.verify(_token(pem, kid="rotated"), "com.example.app")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _JWKSServer:
+    """MockTransport handler serving queued responses and recording requests."""
+
+    def __init__(self, jwks):
+        self.jwks = jwks
+        self.requests = []
+        self.responses = []
+
+    def reply(self, status=200, etag=None, max_age=None):
+        headers = {}
+        if etag:
+            headers["ETag"] = etag
+        if max_age is not None:
+            headers["Cache-Control"] = f"public, max-age={max_age}"
+        self.responses.append((status, headers))
+
+    def __call__(self, request):
+        self.requests.append(request)
+        status, headers = self.responses.pop(0) if self.responses else (200, {})
+        if status == 599:
+            raise httpx.ConnectError("unreachable", request=request)
+        body = self.jwks if status == 200 else None
+        return httpx.Response(status, json=body, headers=headers)
+
+
+@pytest.fixture
+def fetching(monkeypatch, signing_key):
+    """A fetching cache on a fake clock, backed by a mock JWKS endpoint."""
+    pem, jwks = signing_key
+    clock, server = _Clock(), _JWKSServer(jwks)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    monkeypatch.setattr(jwks_module, "time", clock)
+    monkeypatch.setattr(jwks_module, "get_http_client", lambda url: client)
+    monkeypatch.setattr(settings, "JWKS_DEFAULT_TTL_SECONDS", 3600)
+    monkeypatch.setattr(settings, "JWKS_REFRESH_MARGIN_SECONDS", 10)
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_INTERVAL_SECONDS", 60)
+    cache = JWKSCache(
+        "Apple", "https://appleid.example/keys", ["https://appleid.apple.com"]
+    )
+    return cache, clock, server
+
+
+async def test_keys_live_for_cache_control_max_age(fetching):
+    cache, clock, server = fetching
+    server.reply(max_age=100)
+    server.reply()
+
+    await cache.get_key("k1")
+    clock.now += 50
+    await cache.get_key("k1")
+    assert len(server.requests) == 1
+
+    clock.now += 51  # Past max-age: the next lookup refetches
+    await cache.get_key("k1")
+    assert len(server.requests) == 2
+    # No Cache-Control on that response: JWKS_DEFAULT_TTL_SECONDS applies
+    clock.now += 3000
+    await cache.get_key("k1")
+    assert len(server.requests) == 2
+
+
+async def test_expired_keys_are_revalidated_with_if_none_match(fetching):
+    cache, clock, server = fetching
+    server.reply(etag='"v1"', max_age=100)
+    server.reply(status=304, max_age=200)
+
+    await cache.get_key("k1")
+    clock.now += 101
+    assert await cache.get_key("k1") is not None
+
+    assert "If-None-Match" not in server.requests[0].headers
+    assert server.requests[1].headers["If-None-Match"] == '"v1"'
+    clock.now += 150  # The 304's max-age renewed the keys
+    await cache.get_key("k1")
+    assert len(server.requests) == 2
+
+
+async def test_keys_near_expiry_refresh_in_background(fetching):
+    cache, clock, server = fetching
+    server.reply(max_age=100)
+    server.reply(max_age=100)
+
+    await cache.get_key("k1")
+    clock.now += 95  # Inside JWKS_REFRESH_MARGIN_SECONDS of expiry
+    assert await cache.get_key("k1") is not None
+    assert len(server.requests) == 1  # Served without waiting for the fetch
+
+    await asyncio.gather(*cache._background)
+    assert len(server.requests) == 2
+    clock.now += 99
+    await cache.get_key("k1")
+    assert len(server.requests) == 2
+
+
+async def test_unknown_kid_forces_one_refresh_per_interval(fetching):
+    cache, clock, server = fetching
+    await cache.get_key("k1")
+    clock.now += 61
+
+    with pytest.raises(UnknownSigningKeyError):
+        await cache.get_key("rotated")
+    assert len(server.requests) == 2
+    with pytest.raises(UnknownSigningKeyError):
+        await cache.get_key("rotated")
+    assert len(server.requests) == 2  # Within JWKS_MIN_REFRESH_INTERVAL_SECONDS
+
+    clock.now += 60
+    with pytest.raises(UnknownSigningKeyError):
+        await cache.get_key("rotated")
+    assert len(server.requests) == 3
+
+
+async def test_failed_fetch_keeps_serving_cached_keys(fetching):
+    cache, clock, server = fetching
+    server.reply(max_age=100)
+    server.reply(status=599)
+    server.reply(status=503)
+
+    await cache.get_key("k1")
+    clock.now += 101
+    assert await cache.get_key("k1") is not None  # Connection error
+    clock.now += 61  # Failures retry after a minute
+    assert await cache.get_key("k1") is not None  # HTTP 503
+    assert len(server.requests) == 3
+
+
+async def test_no_keys_and_failed_fetch_is_unavailable(fetching):
+    cache, clock, server = fetching
+    server.reply(status=599)
+
+    with pytest.raises(JWKSUnavailableError):
+        await cache.get_key("k1")
@@ -0,0 +1,139 @@
+"""Token-bucket rate limiting, with an in-memory stand-in for the Lua script"""
+import json
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api import rate_limit
+from app.api.rate_limit import RateLimit, client_ip
+
+
+class FakeBuckets:
+    """Counts tokens taken per bucket key and denies past ``capacity``."""
+
+    def __init__(self):
+        self.taken = {}
+
+    def register_script(self, script):
+        return self.take
+
+    async def take(self, keys, args):
+        capacity, _, cost = args
+        taken = self.taken.get(keys[0], 0) + cost
+        if taken > capacity:
+            return [0, 30_000, capacity - self.taken.get(keys[0], 0)]
+        self.taken[keys[0]] = taken
+        return [1, 0, capacity - taken]
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    fake = FakeBuckets()
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: fake)
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_ENABLED", True)
+    return fake
+
+
+def json_request(
+    path: str, payload: dict, ip: str, forwarded_for: Optional[str] = None
+) -> Request:
+    body = json.dumps(payload).encode()
+    headers = [(b"content-type", b"application/json")]
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "query_string": b"",
+            "headers": headers,
+            "client": (ip, 50000),
+        },
+        receive,
+    )
+
+
+def login_request(ip: str, email: str, forwarded_for: Optional[str] = None) -> Request:
+    payload = {"email": email, "password": "secret"}
+    return json_request("/api/v1/auth/login", payload, ip, forwarded_for)
+
+
+async def test_rejects_with_429_once_bucket_is_empty(buckets):
+    limit = RateLimit("login", 2, by_plan=False, body_field="email")
+    for _ in range(2):
+        await limit(login_request("41.90.1.1", "farmer@example.com"))
+
+    with pytest.raises(HTTPException) as exc:
+        await limit(login_request("41.90.1.1", "farmer@example.com"))
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "30"
+    assert exc.value.headers["X-RateLimit-Limit"] == "2"
+
+
+async def test_login_buckets_are_per_ip_and_email(buckets):
+    """Farmers behind one NAT address do not exhaust each other's logins."""
+    limit = RateLimit("login", 1, by_plan=False, body_field="email")
+    await limit(login_request("41.90.1.1", "Farmer@Example.com"))
+
+    await limit(login_request("41.90.1.1", "neighbour@example.com"))
+    await limit(login_request("41.90.1.2", "farmer@example.com"))
+    with pytest.raises(HTTPException):
+        await limit(login_request("41.90.1.1", "farmer@example.com "))
+
+
+async def test_per_ip_limit_stops_email_spraying(buckets):
+    per_ip = RateLimit("login_ip", 3, by_plan=False)
+    for n in range(3):
+        await per_ip(login_request("41.90.1.1", f"farmer{n}@example.com"))
+
+    with pytest.raises(HTTPException):
+        await per_ip(login_request("41.90.1.1", "farmer3@example.com"))
+
+
+def test_client_ip_ignores_client_supplied_forwarded_entries(monkeypatch):
+    """Behind one proxy only the entry it appended (the rightmost) counts."""
+    monkeypatch.setattr(rate_limit.settings, "TRUSTED_PROXY_HOPS", 1)
+
+    spoofed = login_request("10.0.0.7", "x", forwarded_for="1.2.3.4, 41.90.1.1")
+    assert client_ip(spoofed) == "41.90.1.1"
+    assert client_ip(login_request("10.0.0.7", "x", "41.90.1.1")) == "41.90.1.1"
+    # No header (not via the proxy): fall back to the peer address
+    assert client_ip(login_request("10.0.0.7", "x")) == "10.0.0.7"
+
+
+def test_client_ip_uses_peer_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "TRUSTED_PROXY_HOPS", 0)
+
+    assert client_ip(login_request("41.90.1.1", "x", "1.2.3.4")) == "41.90.1.1"
+
+
+async def test_batch_items_are_charged_one_token_each(buckets):
+    """A batch cannot be used to get around the per-minute AI quota."""
+    limit = RateLimit("ai", 5, by_plan=False, cost_field="items")
+    path = "/api/v1/ai/batch/harvest-prediction"
+    await limit(json_request(path, {"items": [{}] * 3}, "41.90.1.1"))
+    await limit(json_request("/api/v1/ai/chat", {"message": "hi"}, "41.90.1.1"))
+
+    assert buckets.taken == {"rate_limit:ai:ip:41.90.1.1": 4}
+    with pytest.raises(HTTPException) as exc:
+        await limit(json_request(path, {"items": [{}] * 2}, "41.90.1.1"))
+    assert exc.value.status_code == 429
+
+
+async def test_batch_larger_than_the_quota_is_rejected_up_front(buckets):
+    limit = RateLimit("ai", 5, by_plan=False, cost_field="items")
+    path = "/api/v1/ai/batch/fcr-insights"
+    with pytest.raises(HTTPException) as exc:
+        await limit(json_request(path, {"items": [{}] * 6}, "41.90.1.1"))
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["X-RateLimit-Limit"] == "5"
+    assert buckets.taken == {}
@@ -0,0 +1,17 @@
+"""Shared Redis pool configuration"""
+import redis.asyncio as redis
+
+from app.config import settings
+from app.core import redis_client
+
+
+def test_shared_pool_queues_callers_when_exhausted(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_MAX_CONNECTIONS", 3)
+    monkeypatch.setattr(settings, "REDIS_POOL_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(redis_client, "_client", None)
+
+    pool = redis_client.get_redis().connection_pool
+
+    assert isinstance(pool, redis.BlockingConnectionPool)
+    assert pool.max_connections == 3
+    assert pool.timeout == 0.5
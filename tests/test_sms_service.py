@@ -0,0 +1,56 @@
+"""SMS dispatcher coalescing and retries against the fake gateway"""
+import asyncio
+
+from app.services.sms_service import FakeSMSGateway, SMSDispatcher
+
+
+class _SortedSet:
+    """Just enough of a Redis sorted set for the retry queue."""
+
+    def __init__(self):
+        self.items = {}
+
+    async def zadd(self, key, mapping):
+        self.items.update(mapping)
+
+    async def zrangebyscore(self, key, low, high, start=0, num=None):
+        return [m for m, score in sorted(self.items.items(), key=lambda i: i[1])
+                if low <= score <= high][start:num]
+
+    async def zrem(self, key, member):
+        return int(self.items.pop(member, None) is not None)
+
+
+async def test_identical_messages_share_gateway_calls():
+    gateway = FakeSMSGateway()
+    dispatcher = SMSDispatcher(gateway, window_ms=10, max_recipients=2)
+
+    results = await asyncio.gather(
+        dispatcher.send("Flock alert", "0711000001", retry=False),
+        dispatcher.send("Flock alert", "0711000002", retry=False),
+        dispatcher.send("Flock alert", "+254711000003", retry=False),
+        dispatcher.send("Your code is 1234", "0711000001", retry=False),
+    )
+
+    assert all(r.success for r in results)
+    assert sorted(gateway.calls) == [
+        ("Flock alert", ["+254711000001", "+254711000002"]),
+        ("Flock alert", ["+254711000003"]),
+        ("Your code is 1234", ["+254711000001"]),
+    ]
+
+
+async def test_transient_failure_is_retried_after_backoff():
+    gateway = FakeSMSGateway(fail=["+254711000001"])
+    queue = _SortedSet()
+    dispatcher = SMSDispatcher(
+        gateway, redis_client=queue, window_ms=1, backoff_seconds=0
+    )
+
+    result = await dispatcher.send("Flock alert", "0711000001")
+    assert result.retryable and len(queue.items) == 1
+
+    gateway.fail.clear()
+    assert await dispatcher.retry_due() == 1
+    assert not queue.items
+    assert len(gateway.calls) == 2